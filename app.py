@@ -1,199 +1,588 @@
-from flask import Flask, render_template, request, jsonify
-from flask_socketio import SocketIO, emit
 import os
 from dotenv import load_dotenv
-import openai
+
+# Load environment variables (before the modules below read their settings at import)
+load_dotenv()
+
+# Green-thread server modes must patch the standard library before anything else imports it;
+# every blocking handler, parse worker and order worker then runs as a cheap green thread
+SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading').lower()
+try:
+    if SOCKETIO_ASYNC_MODE in ('eventlet', 'gevent'):
+        # httpcore probes for trio at import, and trio needs the select.epoll that patching removes
+        import httpcore  # noqa: F401
+    if SOCKETIO_ASYNC_MODE == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif SOCKETIO_ASYNC_MODE == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+    elif SOCKETIO_ASYNC_MODE != 'threading':
+        raise ValueError(f"unknown SOCKETIO_ASYNC_MODE '{SOCKETIO_ASYNC_MODE}'")
+except (ImportError, ValueError) as e:
+    print(f"⚠️ Can't use async mode {SOCKETIO_ASYNC_MODE} ({e}), falling back to threading")
+    SOCKETIO_ASYNC_MODE = 'threading'
+
+from flask import Flask, render_template, request, jsonify
+from flask_socketio import SocketIO, emit, join_room
 import json
 import re
-from blinkit_automation_clean import BlinkitAutomation
 import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
-# Load environment variables
-load_dotenv()
+from browser_pool import BrowserPool
+from blinkit_automation_clean import search_timings
+from page_waits import wait_stats
+from selector_registry import selector_registry
+from parse_queue import ParseQueue, ParseQueueFull, PARSE_OK
+from order_queue import OrderQueue, OrderQueueFull
+from order_state import PENDING, QUEUED, PROCESSING, COMPLETED, FAILED, CANCELLED
+from order_store import open_order_store, DEFAULT_DRAFT_TTL, DEFAULT_RETENTION
+from parse_cache import parse_cache, line_cache
+from parse_batcher import ParseBatcher, estimate_tokens
+from stream_json import JSONArrayStream
+from latency_stats import LatencyStats
+from llm_client import LLMClient, RetryBudget
+from prompt_examples import ExampleIndex, DEFAULT_EXAMPLE_COUNT
+from entity_extractor import ParseExampleLog, load_model
+import entity_extractor
+import local_parser
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'kirana-tap-secret-key-2024'
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE)
+
+# Pooled OpenAI client (keep-alive connections, connect/read timeouts, budgeted retries)
+llm_client = LLMClient(
+    api_key=os.getenv('OPENAI_API_KEY'),
+    base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+    model=os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo'),
+    connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', '5')),
+    read_timeout=float(os.getenv('LLM_READ_TIMEOUT', '15')),
+    pool_size=int(os.getenv('LLM_POOL_SIZE', '10')),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+    retry_budget=RetryBudget(ratio=float(os.getenv('LLM_RETRY_BUDGET_RATIO', '0.2')))
+)
+
+# Orders by id, status and session (SQLite in WAL mode; empty ORDER_STORE_PATH keeps them in memory).
+# Status changes go through the store as compare-and-set so each one happens exactly once.
+order_store = open_order_store(
+    os.getenv('ORDER_STORE_PATH', 'orders.sqlite3'),
+    draft_ttl=float(os.getenv('ORDER_DRAFT_TTL', str(DEFAULT_DRAFT_TTL))),
+    retention=float(os.getenv('ORDER_RETENTION', str(DEFAULT_RETENTION)))
+)
+
+# Each Socket.IO connection is bound to a browser session id and joins that session's room;
+# order events go to the owning session's room only, never to every connected client
+connection_sessions = {}
+SESSION_ID = re.compile(r'^[0-9a-f]{32}$')
+
+# Warm Chrome sessions shared by all orders (browsers are launched lazily or by warm() at startup)
+browser_pool = BrowserPool(
+    size=int(os.getenv('BROWSER_POOL_SIZE', '1')),
+    max_uses=int(os.getenv('BROWSER_MAX_USES', '20'))
+)
+
+# Confirmed orders are placed by one worker per pooled browser, first come first served
+order_queue = OrderQueue(
+    workers=int(os.getenv('ORDER_WORKERS', str(browser_pool.size))),
+    max_pending=int(os.getenv('ORDER_MAX_PENDING', '10')),
+    estimate_seconds=float(os.getenv('ORDER_ESTIMATE_SECONDS', '120'))
+)
+
+# Seconds before a parse is answered with the fallback parser instead of the LLM
+PARSE_TIMEOUT = float(os.getenv('PARSE_TIMEOUT', '20'))
+
+# Lines the local parser is at least this sure about skip the AI
+LOCAL_PARSE_THRESHOLD = float(os.getenv('LOCAL_PARSE_THRESHOLD', str(local_parser.DEFAULT_THRESHOLD)))
+
+# On-box entity model trained from logged AI parses (see entity_extractor.py); lines it is sure about skip the AI
+ENTITY_MODEL_PATH = os.getenv('ENTITY_MODEL_PATH', 'entity_model.json')
+ENTITY_MODEL_THRESHOLD = float(os.getenv('ENTITY_MODEL_THRESHOLD', str(entity_extractor.DEFAULT_THRESHOLD)))
+entity_model = load_model(ENTITY_MODEL_PATH)
+
+# Every line the AI parses is logged here as training data for the entity model; empty disables the log
+parse_example_log = ParseExampleLog(os.getenv('PARSE_EXAMPLE_LOG', 'parse_examples.jsonl'))
+
+# Per-line latency of each parse tier (local / memo / model / ai)
+parse_tier_timings = LatencyStats()
+
+# Stream AI parses of at least this many lines to the client item by item
+PARSE_STREAMING = os.getenv('PARSE_STREAMING', 'true').lower() == 'true'
+PARSE_STREAM_MIN_LINES = int(os.getenv('PARSE_STREAM_MIN_LINES', '4'))
+
+# Time to first streamed item vs the whole completion
+stream_timings = LatencyStats()
+
+# Output budget per AI request; longer lists are split into line-aligned chunks that fit it
+PARSE_MAX_TOKENS = int(os.getenv('PARSE_MAX_TOKENS', '500'))
+PARSE_TOKENS_PER_LINE = int(os.getenv('PARSE_TOKENS_PER_LINE', '40'))
+PARSE_CHUNK_LINES = int(os.getenv('PARSE_CHUNK_LINES', str(max(1, PARSE_MAX_TOKENS // PARSE_TOKENS_PER_LINE))))
+PARSE_CHUNK_RETRIES = int(os.getenv('PARSE_CHUNK_RETRIES', '1'))
+
+# Chunks of every parse share this bounded pool
+chunk_executor = ThreadPoolExecutor(max_workers=int(os.getenv('PARSE_CHUNK_FANOUT', '4')), thread_name_prefix='parse-chunk')
+chunk_timings = LatencyStats()
+
+# Seconds to wait for the AI before answering with the local parse; 0 waits for the AI (up to PARSE_TIMEOUT)
+PARSE_DEADLINE = float(os.getenv('PARSE_DEADLINE', '5'))
+# Whether a late AI result replaces the items of a still-pending order
+PARSE_UPGRADE_LATE = os.getenv('PARSE_UPGRADE_LATE', 'true').lower() == 'true'
+
+# AI tiers of hedged parses run here so they can finish after the caller has moved on
+PARSE_AI_WORKERS = int(os.getenv('PARSE_AI_WORKERS', '8'))
+ai_executor = ThreadPoolExecutor(max_workers=PARSE_AI_WORKERS, thread_name_prefix='parse-ai')
+# Hedged AI parses running or queued, late ones included. The executor's own queue has no limit, so past
+# this a parse answers locally at once instead of queueing more LLM calls nobody may wait for
+PARSE_AI_MAX_PENDING = max(1, int(os.getenv('PARSE_AI_MAX_PENDING', str(PARSE_AI_WORKERS))))
+ai_slots = threading.BoundedSemaphore(PARSE_AI_MAX_PENDING)
+hedge_timings = LatencyStats()
+
+# System prompt for grocery parsing: instructions, worked examples (see prompt_examples.py), then reminders
+GROCERY_PARSE_HEADER = """You are a grocery assistant. Parse the user's grocery list into structured items.
+Return ONLY a JSON array with objects containing: name, quantity, unit, category, line.
 
-# Initialize OpenAI client
-openai.api_key = os.getenv('OPENAI_API_KEY')
+IMPORTANT: The 'name' field should be the search term for the grocery store, without quantity/unit.
 
-# Store pending orders (in production, use a proper database)
-pending_orders = {}
+CRITICAL: When the user provides multiple lines (separated by line breaks), treat each line as a SEPARATE item.
+The 'line' field is the 1-based number of the input line the item came from."""
 
-def parse_grocery_list(user_message):
+GROCERY_PARSE_FOOTER = """Keep categories simple: vegetables, fruits, dairy, grains, bakery, snacks, beverages, household, personal_care
+
+Handle simple formats like "one packet milk" or "2 kg potatoes" correctly.
+
+The 'name' field should be clean and searchable (e.g., "amul toned milk" not "one packet amul toned milk").
+
+REMEMBER: Each line break means a NEW ITEM!"""
+
+# Per request, only the examples closest to the message are sent (PARSE_DYNAMIC_EXAMPLES=false sends them all)
+PARSE_DYNAMIC_EXAMPLES = os.getenv('PARSE_DYNAMIC_EXAMPLES', 'true').lower() == 'true'
+example_index = ExampleIndex(k=int(os.getenv('PARSE_EXAMPLE_COUNT', str(DEFAULT_EXAMPLE_COUNT))))
+GROCERY_PARSE_PROMPT = example_index.full_prompt(GROCERY_PARSE_HEADER, GROCERY_PARSE_FOOTER)
+
+def build_parse_prompt(text):
     """
-    Parse user's grocery list using AI to extract structured items
+    System prompt for parsing text: the few most similar examples, or all of them when dynamic examples are off
     """
-    try:
-        print(f"🔍 Parsing grocery list: '{user_message}'")
-        print(f"📝 Number of lines: {len(user_message.split(chr(10)))}")
-        
-        # Create a system prompt for grocery parsing
-        system_prompt = """You are a grocery assistant. Parse the user's grocery list into structured items.
-        Return ONLY a JSON array with objects containing: name, quantity, unit, category.
+    if not PARSE_DYNAMIC_EXAMPLES:
+        return GROCERY_PARSE_PROMPT
+    return example_index.build_prompt(GROCERY_PARSE_HEADER, GROCERY_PARSE_FOOTER, text)
+
+# Appended to the system prompt when several users' lists share one request
+BATCH_PARSE_INSTRUCTIONS = """
+
+BATCH MODE: The user message contains several separate grocery lists. Each starts with a header line like "### LIST 1".
+Parse each list on its own (its 'line' numbers start at 1) and return ONLY a JSON object mapping each list number to that list's JSON array, e.g. {"1": [...], "2": [...]}."""
+
+def call_ai(system_prompt, user_content, max_tokens=PARSE_MAX_TOKENS):
+    """
+    One chat completion; returns the response text
+    """
+    return llm_client.chat(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.1
+    )
+
+def call_ai_stream(system_prompt, user_content, max_tokens=PARSE_MAX_TOKENS):
+    """
+    Streamed chat completion; yields the response text piece by piece
+    """
+    yield from llm_client.stream_chat(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.1
+    )
+
+def request_ai_parse_stream(text, on_item):
+    """
+    Stream one list through the AI parser, calling on_item(item) as each item object completes.
+    Returns (items, complete); items is None if no JSON array came back.
+    """
+    stream = JSONArrayStream()
+    items = []
+    start = time.monotonic()
+    for delta in call_ai_stream(build_parse_prompt(text), text):
+        for item in stream.feed(delta):
+            if not items:
+                stream_timings.record('first_item', time.monotonic() - start)
+            items.append(item)
+            on_item(item)
+    stream_timings.record('complete', time.monotonic() - start, ok=stream.closed)
+    
+    if not stream.started:
+        return None, False
+    return items, stream.closed
+
+def request_ai_parse_single(text):
+    """
+    Send one list to the AI parser; returns the parsed item list, or None if no JSON came back
+    """
+    ai_response = call_ai(build_parse_prompt(text), text)
+    print(f"🤖 AI Response: {ai_response}")
+    
+    # Clean the response to extract just the JSON
+    json_match = re.search(r'\[.*\]', ai_response, re.DOTALL)
+    if not json_match:
+        return None
+    return json.loads(json_match.group())
+
+def request_ai_parse_batch(texts):
+    """
+    Send several lists as tagged sections of one request; returns one result per list (None where missing)
+    """
+    if len(texts) == 1:
+        return [request_ai_parse_single(texts[0])]
+    
+    sections = '\n\n'.join(f"### LIST {n}\n{text}" for n, text in enumerate(texts, start=1))
+    ai_response = call_ai(build_parse_prompt('\n'.join(texts)) + BATCH_PARSE_INSTRUCTIONS, sections, max_tokens=PARSE_MAX_TOKENS * len(texts))
+    print(f"🤖 AI Batch Response ({len(texts)} lists): {ai_response}")
+    
+    json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
+    if not json_match:
+        return [None] * len(texts)
+    by_list = json.loads(json_match.group())
+    if not isinstance(by_list, dict):
+        return [None] * len(texts)
+    
+    results = []
+    for n in range(1, len(texts) + 1):
+        items = by_list.get(str(n))
+        results.append(items if isinstance(items, list) else None)
+    return results
+
+# Parse requests arriving within the window share one AI request (window 0 disables batching)
+parse_batcher = ParseBatcher(
+    request_ai_parse_batch,
+    window=float(os.getenv('PARSE_BATCH_WINDOW_MS', '50')) / 1000.0,
+    max_batch=int(os.getenv('PARSE_BATCH_MAX', '8')),
+    prompt_tokens=estimate_tokens(example_index.compact_prompt(GROCERY_PARSE_HEADER, GROCERY_PARSE_FOOTER, '')[0]
+                                  if PARSE_DYNAMIC_EXAMPLES else GROCERY_PARSE_PROMPT),
+    batch_overhead_tokens=estimate_tokens(BATCH_PARSE_INSTRUCTIONS)
+)
+
+def request_ai_parse(text):
+    """
+    Send text to the AI parser (batched with concurrent requests); returns the item list or None
+    """
+    return parse_batcher.submit(text)
+
+def assign_items_to_lines(items, line_count):
+    """
+    Group AI items by the input line they came from (list of lists, one per line).
+    Returns None when the items can't be attributed to lines.
+    """
+    line_numbers = [item.pop('line', None) if isinstance(item, dict) else None for item in items]
+    
+    if all(isinstance(n, int) and 1 <= n <= line_count for n in line_numbers):
+        grouped = [[] for _ in range(line_count)]
+        for item, n in zip(items, line_numbers):
+            grouped[n - 1].append(item)
+        return grouped
+    
+    # Without usable line numbers, one item per line is the only safe mapping
+    if len(items) == line_count:
+        return [[item] for item in items]
+    return None
+
+def split_into_chunks(count, chunk_lines):
+    """
+    Split count lines into (start, end) ranges of at most chunk_lines, as evenly sized as possible
+    """
+    chunk_count = max(1, -(-count // max(1, chunk_lines)))
+    base, extra = divmod(count, chunk_count)
+    chunks = []
+    start = 0
+    for n in range(chunk_count):
+        end = start + base + (1 if n < extra else 0)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+def parse_chunk(chunk_lines, stream=False, on_item=None, reset=None, batched=True):
+    """
+    Parse one line-aligned chunk with the AI, retrying on failure.
+    Returns (grouped, complete, parsed): items per line or None, whether the answer was complete, and the raw items.
+    """
+    text = '\n'.join(chunk_lines)
+    grouped, complete, parsed = None, False, None
+    for attempt in range(1 + PARSE_CHUNK_RETRIES):
+        if attempt:
+            print(f"🔁 Retrying AI parse for {len(chunk_lines)} lines (attempt {attempt + 1})")
+            if reset:
+                reset()
         
-        IMPORTANT: The 'name' field should be the search term for the grocery store, without quantity/unit.
+        start = time.monotonic()
+        try:
+            if stream:
+                parsed, complete = request_ai_parse_stream(text, on_item)
+            elif batched:
+                # A single chunk can share a request with other users' lists
+                parsed, complete = request_ai_parse(text), True
+            else:
+                parsed, complete = request_ai_parse_single(text), True
+        except Exception as e:
+            print(f"❌ AI parsing error: {e}")
+            parsed, complete = None, False
         
-        CRITICAL: When the user provides multiple lines (separated by line breaks), treat each line as a SEPARATE item.
+        grouped = assign_items_to_lines(parsed, len(chunk_lines)) if parsed is not None else None
+        ok = grouped is not None and complete
+        chunk_timings.record('retry' if attempt else 'chunk', time.monotonic() - start, ok=ok)
+        if ok:
+            break
+    return grouped, complete, parsed
+
+def parse_unknown_lines(lines, line_items, unknown, progress=None):
+    """
+    Tier 3: fill line_items[i] for every escalated line i from the AI.
+    Long lists are split into chunks parsed in parallel. Returns False if any line needed the fallback parser.
+    """
+    all_from_ai = True
+    stream = progress is not None and PARSE_STREAMING and len(unknown) >= PARSE_STREAM_MIN_LINES
+    streamed = [[] for _ in unknown]
+    streamed_lock = threading.Lock()
+    position = {i: k for k, i in enumerate(unknown)}
+    
+    def send_progress():
+        # Known lines plus whatever has streamed in so far, in line order
+        with streamed_lock:
+            partial = [item for i, items in enumerate(line_items)
+                       for item in (items if items is not None else streamed[position[i]])]
+        progress(partial)
+    
+    def run_chunk(chunk_start, chunk_end):
+        def on_item(item):
+            n = item.get('line')
+            if isinstance(n, int) and 1 <= n <= chunk_end - chunk_start:
+                with streamed_lock:
+                    streamed[chunk_start + n - 1].append({key: value for key, value in item.items() if key != 'line'})
+                send_progress()
         
-        Examples:
-        - "I need 2 kg potatoes, 1 dozen eggs, and 3 packets of bread"
-        - Output: [{"name": "potatoes", "quantity": 2, "unit": "kg", "category": "vegetables"}, {"name": "eggs", "quantity": 1, "unit": "dozen", "category": "dairy"}, {"name": "bread", "quantity": 3, "unit": "packets", "category": "bakery"}]
+        def reset_streamed():
+            with streamed_lock:
+                for k in range(chunk_start, chunk_end):
+                    streamed[k] = []
         
-        - "milk 1 liter, bananas 5 pieces, rice 2 kg"
-        - Output: [{"name": "milk", "quantity": 1, "unit": "liter", "category": "dairy"}, {"name": "bananas", "quantity": 5, "unit": "pieces", "category": "fruits"}, {"name": "rice", "quantity": 2, "unit": "kg", "category": "grains"}]
+        return parse_chunk([lines[i] for i in unknown[chunk_start:chunk_end]], stream=stream,
+                           on_item=on_item, reset=reset_streamed, batched=len(chunks) == 1)
+    
+    chunks = split_into_chunks(len(unknown), PARSE_CHUNK_LINES)
+    if len(chunks) > 1:
+        print(f"✂️ Splitting {len(unknown)} lines into {len(chunks)} chunks of up to {PARSE_CHUNK_LINES}")
+    if stream:
+        print(f"📡 Streaming AI parse for {len(unknown)} lines")
+        send_progress()
+    
+    start = time.monotonic()
+    if len(chunks) == 1:
+        results = [run_chunk(*chunks[0])]
+    else:
+        # Bounded fan-out shared by all parses; results are merged in chunk order
+        futures = [chunk_executor.submit(run_chunk, chunk_start, chunk_end) for chunk_start, chunk_end in chunks]
+        results = [future.result() for future in futures]
+    ai_seconds = time.monotonic() - start
+    
+    for (chunk_start, chunk_end), (grouped, complete, parsed) in zip(chunks, results):
+        chunk_unknown = unknown[chunk_start:chunk_end]
+        for _ in chunk_unknown:
+            parse_tier_timings.record('ai', ai_seconds, ok=grouped is not None)
         
-        - "one packet amul toned milk"
-        - Output: [{"name": "amul toned milk", "quantity": 1, "unit": "packet", "category": "dairy"}]
+        if grouped is not None:
+            print(f"✅ AI Parsing successful: {sum(len(items) for items in grouped)} items found for {len(chunk_unknown)} new lines")
+            # A cut-off answer may have stopped part way through its last line; don't memoize that one
+            answered = [k for k, items in enumerate(grouped) if items]
+            last_answered = answered[-1] if answered and not complete else None
+            for k, (i, items) in enumerate(zip(chunk_unknown, grouped)):
+                if not items and not complete:
+                    # The stream was cut off before reaching this line
+                    line_items[i] = fallback_parsing(lines[i])
+                    all_from_ai = False
+                    continue
+                line_items[i] = items
+                if items and k != last_answered:
+                    line_cache.put(lines[i], items)
+                    parse_example_log.record(lines[i], items)
+        elif parsed:
+            # Items that can't be matched to lines are kept in place of the chunk's first line, but not memoized
+            print("⚠️ AI items could not be matched to lines, not memoizing them")
+            for i in chunk_unknown:
+                line_items[i] = []
+            line_items[chunk_unknown[0]] = parsed
+        else:
+            print("🔄 Using fallback parsing for lines the AI could not parse")
+            all_from_ai = False
+            for i in chunk_unknown:
+                line_items[i] = fallback_parsing(lines[i])
+    return all_from_ai
+
+def finish_parse(user_message, line_items, unknown, all_from_ai):
+    """
+    Reassemble items in the original line order and cache lists the AI fully parsed
+    """
+    grocery_items = [item for items in line_items for item in items]
+    if unknown and all_from_ai and grocery_items:
+        # Only AI results are cached; fallback results are cheap and should not stick
+        parse_cache.put(user_message, grocery_items)
+    return grocery_items
+
+def parse_grocery_list(user_message, progress=None, deadline=None, on_upgrade=None):
+    """
+    Parse user's grocery list into structured items, cheapest tier first:
+    the on-box entity model (when one is loaded) and the local parser for simple lines, then the line memo,
+    then one AI request for the rest.
+    With a progress callback, long lists are streamed and progress(items_so_far) is called as items arrive.
+    The AI is hedged: if it has not answered within deadline seconds (default PARSE_DEADLINE), the local
+    parse is returned instead and on_upgrade(items), if given, is called when the late AI result arrives.
+    """
+    try:
+        print(f"🔍 Parsing grocery list: '{user_message}'")
+        print(f"📝 Number of lines: {len(user_message.split(chr(10)))}")
         
-        - "2 kg onions, 1 kg tomatoes"
-        - Output: [{"name": "onions", "quantity": 2, "unit": "kg", "category": "vegetables"}, {"name": "tomatoes", "quantity": 1, "unit": "kg", "category": "vegetables"}]
+        # Repeated lists are answered from the cache without calling the AI
+        cached_items = parse_cache.get(user_message)
+        if cached_items is not None:
+            print(f"⚡ Parse cache hit: {len(cached_items)} items")
+            return cached_items
         
-        - "three packets heritage milk"
-        - Output: [{"name": "heritage milk", "quantity": 3, "unit": "packets", "category": "dairy"}]
+        lines = [line.strip() for line in user_message.split('\n') if line.strip()]
+        line_items = [None] * len(lines)
         
-        MULTI-LINE EXAMPLES (each line is a separate item):
-        - "one packet amul toned milk
-          banana"
-        - Output: [{"name": "amul toned milk", "quantity": 1, "unit": "packet", "category": "dairy"}, {"name": "banana", "quantity": 1, "unit": "pieces", "category": "fruits"}]
+        # Tier 1: confident lines never leave the box. The entity model answers first when one is loaded:
+        # it learned the Hinglish and odd-unit lines the local parser can only guess at.
+        model = entity_model
+        for i, line in enumerate(lines):
+            start = time.monotonic()
+            if model is not None:
+                items, confidence = model.parse_line(line)
+                if items and confidence >= ENTITY_MODEL_THRESHOLD:
+                    line_items[i] = items
+                    parse_tier_timings.record('model', time.monotonic() - start)
+                    continue
+            items, confidence = local_parser.parse_line(line)
+            if items and confidence >= LOCAL_PARSE_THRESHOLD:
+                line_items[i] = items
+                parse_tier_timings.record('local', time.monotonic() - start)
         
-        - "2 kg potatoes
-          1 dozen eggs
-          3 packets bread"
-        - Output: [{"name": "potatoes", "quantity": 2, "unit": "kg", "category": "vegetables"}, {"name": "eggs", "quantity": 1, "unit": "dozen", "category": "dairy"}, {"name": "bread", "quantity": 3, "unit": "packets", "category": "bakery"}]
+        # Tier 2: lines the AI has parsed before
+        for i, line in enumerate(lines):
+            if line_items[i] is None:
+                start = time.monotonic()
+                line_items[i] = line_cache.get(line)
+                if line_items[i] is not None:
+                    parse_tier_timings.record('memo', time.monotonic() - start)
         
-        Keep categories simple: vegetables, fruits, dairy, grains, bakery, snacks, beverages, household, personal_care
+        unknown = [i for i, items in enumerate(line_items) if items is None]
+        print(f"🧠 {len(lines) - len(unknown)}/{len(lines)} lines parsed by the model, locally or from memo, {len(unknown)} escalated to AI")
         
-        Handle simple formats like "one packet milk" or "2 kg potatoes" correctly.
+        if not unknown:
+            return finish_parse(user_message, line_items, unknown, True)
         
-        The 'name' field should be clean and searchable (e.g., "amul toned milk" not "one packet amul toned milk").
+        if deadline is None:
+            deadline = PARSE_DEADLINE
+        if deadline <= 0:
+            return finish_parse(user_message, line_items, unknown, parse_unknown_lines(lines, line_items, unknown, progress))
         
-        REMEMBER: Each line break means a NEW ITEM!"""
+        # Hedge: the AI works on its own copy while the local answer is prepared here
+        ai_line_items = list(line_items)
+        start = time.monotonic()
         
-        # Get AI response
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=500,
-            temperature=0.1
-        )
+        def run_ai():
+            all_from_ai = parse_unknown_lines(lines, ai_line_items, unknown, progress)
+            return finish_parse(user_message, ai_line_items, unknown, all_from_ai)
         
-        # Extract and parse JSON response
-        ai_response = response.choices[0].message.content.strip()
-        print(f"🤖 AI Response: {ai_response}")
+        slots = ai_slots
+        if not slots.acquire(blocking=False):
+            # Earlier AI parses (late ones too) still hold every slot: answer now rather than queue behind them
+            print(f"🚦 {PARSE_AI_MAX_PENDING} AI parses already pending, answering with the local parse")
+            hedge_timings.record('shed', 0.0, ok=False)
+            for i in unknown:
+                line_items[i] = fallback_parsing(lines[i])
+            return [item for items in line_items for item in items]
+        future = ai_executor.submit(run_ai)
+        future.add_done_callback(lambda done: slots.release())
+        for i in unknown:
+            line_items[i] = fallback_parsing(lines[i])
+        local_items = [item for items in line_items for item in items]
         
-        # Clean the response to extract just the JSON
-        json_match = re.search(r'\[.*\]', ai_response, re.DOTALL)
-        if json_match:
-            grocery_items = json.loads(json_match.group())
-            print(f"✅ AI Parsing successful: {len(grocery_items)} items found")
+        try:
+            grocery_items = future.result(timeout=max(0, deadline - (time.monotonic() - start)))
+            hedge_timings.record('parse', time.monotonic() - start)
             return grocery_items
-        else:
-            print("⚠️ AI parsing failed, using fallback parsing")
-            # Fallback parsing for simple cases
-            return fallback_parsing(user_message)
+        except FutureTimeout:
+            pass
+        
+        print(f"⏱️ AI missed the {deadline}s parse deadline, answering with the local parse")
+        hedge_timings.record('parse', time.monotonic() - start, ok=False)
+        if on_upgrade is None and future.cancel():
+            # Nobody takes a late result and the LLM call hasn't started: drop it
+            hedge_timings.record('cancelled', time.monotonic() - start, ok=False)
+            return local_items
+        
+        def on_late_result(done):
+            hedge_timings.record('late_ai', time.monotonic() - start, ok=done.exception() is None)
+            if done.exception() is not None or on_upgrade is None:
+                return
+            late_items = done.result()
+            if late_items and late_items != local_items:
+                print(f"⬆️ Late AI parse arrived after {time.monotonic() - start:.2f}s, upgrading {len(late_items)} items")
+                try:
+                    on_upgrade(late_items)
+                except Exception as e:
+                    print(f"❌ Parse upgrade failed: {e}")
+        
+        future.add_done_callback(on_late_result)
+        return local_items
             
     except Exception as e:
         print(f"❌ AI parsing error: {e}")
         print("🔄 Using fallback parsing")
         return fallback_parsing(user_message)
 
+def parse_tier_summary():
+    """
+    Per-tier latency plus the share of lines that had to go to the AI
+    """
+    tiers = parse_tier_timings.summary()
+    total = sum(tier['count'] for tier in tiers.values())
+    escalated = tiers.get('ai', {}).get('count', 0)
+    return {
+        'tiers': tiers,
+        'lines': total,
+        'escalation_rate': round(escalated / total, 4) if total else None,
+        'threshold': LOCAL_PARSE_THRESHOLD
+    }
+
 def fallback_parsing(user_message):
     """
     Simple fallback parsing when AI fails
     """
     print(f"🔄 Using fallback parsing for: '{user_message}'")
-    items = []
     
-    # Split by lines and process each line separately
-    lines = [line.strip() for line in user_message.split('\n') if line.strip()]
-    print(f"📝 Fallback parsing found {len(lines)} lines: {lines}")
-    
-    # Basic pattern matching for common formats (ordered by specificity)
-    patterns = [
-        # Most specific: "one packet amul toned milk" or "1 packet milk"
-        r'^(one|two|three|four|five|six|seven|eight|nine|ten)\s+(packet|packets|kg|g|liter|liters|piece|pieces|dozen)\s+([a-zA-Z\s]+)$',
-        r'^(\d+)\s*(packet|packets|kg|g|liters?|pieces?|dozen)\s+of?\s+([a-zA-Z\s]+)$',
-        # Less specific: "one milk" or "1 milk"
-        r'^(one|two|three|four|five|six|seven|eight|nine|ten)\s+([a-zA-Z\s]+)$',
-        r'^(\d+)\s+([a-zA-Z\s]+)$'
-    ]
-    
-    # Convert word numbers to digits
-    word_to_num = {
-        'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
-    }
-    
-    # Process each line as a separate item
-    for i, line in enumerate(lines):
-        print(f"🔍 Processing line {i+1}: '{line}'")
-        line_items = []
-        
-        # Try to match patterns for this line
-        for pattern in patterns:
-            match = re.match(pattern, line, re.IGNORECASE)
-            if match:
-                groups = match.groups()
-                if len(groups) == 3:
-                    if groups[0].lower() in word_to_num:
-                        # Handle "one packet milk" format
-                        quantity = word_to_num[groups[0].lower()]
-                        unit = groups[1].lower()
-                        name = groups[2].strip().lower()
-                    else:
-                        # Handle "1 packet milk" format
-                        quantity = int(groups[0])
-                        unit = groups[1].lower()
-                        name = groups[2].strip().lower()
-                    
-                    line_items.append({
-                        "name": name,
-                        "quantity": quantity,
-                        "unit": unit,
-                        "category": "general"
-                    })
-                    break  # Found a match, don't try other patterns for this line
-                elif len(groups) == 2:
-                    if groups[0].lower() in word_to_num:
-                        # Handle "one milk" format
-                        quantity = word_to_num[groups[0].lower()]
-                        name = groups[1].strip().lower()
-                    else:
-                        # Handle "1 milk" format
-                        quantity = int(groups[0])
-                        name = groups[1].strip().lower()
-                    
-                    line_items.append({
-                        "name": name,
-                        "quantity": quantity,
-                        "unit": "pieces",
-                        "category": "general"
-                    })
-                    break  # Found a match, don't try other patterns for this line
-        
-        # If no patterns matched for this line, treat the entire line as a single item
-        if not line_items and line.strip():
-            # Simple case: just the item name (assume quantity 1, unit pieces)
-            print(f"✅ Line {i+1}: No pattern match, treating as simple item: '{line.strip()}'")
-            items.append({
-                "name": line.strip().lower(),
-                "quantity": 1,
-                "unit": "pieces",
-                "category": "general"
-            })
-        else:
-            # Add items found in this line (should only be one per line now)
-            print(f"✅ Line {i+1}: Pattern match found, adding {len(line_items)} items")
-            items.extend(line_items)
+    # One pass over the message: newlines, commas and "and" separate items
+    items = local_parser.tokenize_items(user_message)
+    for item in items:
+        print(f"✅ Fallback item: {item['quantity']} {item['unit']} {item['name']}")
     
     print(f"🎯 Fallback parsing complete: {len(items)} total items found")
     return items
 
+# LLM parsing runs here, off the Socket.IO handlers (workers start on first message)
+parse_queue = ParseQueue(
+    parse_grocery_list,
+    fallback=fallback_parsing,
+    workers=int(os.getenv('PARSE_WORKERS', '4')),
+    max_pending=int(os.getenv('PARSE_MAX_PENDING', '32')),
+    timeout=PARSE_TIMEOUT
+)
+
 def generate_order_summary(grocery_items):
     """
     Generate a human-readable summary of the order
@@ -227,6 +616,44 @@ def generate_order_summary(grocery_items):
     summary += "\nReady to place your order? Click the Confirm Order button below or Cancel if you'd like to make changes."
     return summary
 
+def start_browser_pool_warmup(debug_mode=False):
+    """Launch pooled browsers in the background so the first order doesn't pay Chrome startup"""
+    if os.environ.get('BROWSER_POOL_WARM', 'true').lower() != 'true':
+        return
+    # With the debug reloader only the child process serves requests
+    if debug_mode and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return
+    threading.Thread(target=browser_pool.warm, daemon=True).start()
+
+def recover_interrupted_orders(debug_mode=False):
+    """Reset orders a previous run left queued or half-placed; they can't still be running.
+    Only called when the server starts, so importing the app never touches stored orders."""
+    # With the debug reloader only the child process serves requests
+    if debug_mode and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return 0
+    recovered = order_store.recover()
+    if recovered:
+        print(f"♻️ Recovered {recovered} orders interrupted by the last shutdown")
+    return recovered
+
+_server_prepared = False
+_server_prepared_lock = threading.Lock()
+
+def prepare_server(debug_mode=False):
+    """
+    Startup work for every way of serving the app: python app.py, start.py and gunicorn
+    (gunicorn.conf.py calls this once the worker is up). Recovers interrupted orders, then
+    warms the browser pool. Runs once per process; returns the number of recovered orders.
+    """
+    global _server_prepared
+    with _server_prepared_lock:
+        if _server_prepared:
+            return 0
+        _server_prepared = True
+    recovered = recover_interrupted_orders(debug_mode)
+    start_browser_pool_warmup(debug_mode)
+    return recovered
+
 @app.route('/')
 def index():
     """Main chat interface page"""
@@ -238,112 +665,161 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Kirana Tap backend is running!',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'async_mode': SOCKETIO_ASYNC_MODE,
+        'browser_pool': browser_pool.stats(),
+        'orders': order_queue.stats(),
+        'order_store': order_store.stats(),
+        'connections': {
+            'connected': len(connection_sessions),
+            'sessions': len(set(connection_sessions.values()))
+        },
+        'waits': wait_stats.summary(),
+        'selectors': selector_registry.stats(),
+        'search': search_timings.summary(),
+        'parsing': parse_queue.stats(),
+        'parse_cache': parse_cache.stats(),
+        'line_cache': line_cache.stats(),
+        'parse_tiers': parse_tier_summary(),
+        'parse_batching': parse_batcher.stats(),
+        'parse_streaming': stream_timings.summary(),
+        'parse_chunks': chunk_timings.summary(),
+        'parse_hedging': {
+            'deadline': PARSE_DEADLINE,
+            'upgrade_late': PARSE_UPGRADE_LATE,
+            'ai_max_pending': PARSE_AI_MAX_PENDING,
+            'timings': hedge_timings.summary()
+        },
+        'llm': llm_client.stats(),
+        'parse_prompt': example_index.stats() if PARSE_DYNAMIC_EXAMPLES else {'dynamic': False},
+        'entity_model': {
+            'loaded': entity_model is not None,
+            'threshold': ENTITY_MODEL_THRESHOLD,
+            'model': entity_model.stats() if entity_model is not None else None,
+            'example_log': parse_example_log.stats()
+        }
     })
 
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
     """Handle client connection"""
-    print('Client connected')
+    # A reconnecting tab sends the session id it was given so it keeps hearing about its orders
+    session = auth.get('session') if isinstance(auth, dict) else None
+    if not isinstance(session, str) or not SESSION_ID.match(session):
+        session = uuid.uuid4().hex
+    connection_sessions[request.sid] = session
+    join_room(session)
+    print(f'Client connected (session {session[:8]})')
+    emit('session', {'session': session})
     emit('status', {'message': 'Connected to Kirana Tap!'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    connection_sessions.pop(request.sid, None)
     print('Client disconnected')
 
+def connection_session():
+    """Session id the current connection is bound to"""
+    return connection_sessions.get(request.sid, request.sid)
+
+def owns_order(order):
+    """Whether the current connection may confirm or cancel an order"""
+    return order.get('session') in (None, connection_session())
+
+def order_room(order):
+    """Room that hears an order's updates: its owner's session, else the connection handling it"""
+    return order.get('session') or request.sid
+
 @socketio.on('confirm_order')
 def handle_order_confirmation(data):
     """Handle order confirmation from user"""
     try:
         order_id = data.get('order_id')
-        grocery_items = pending_orders.get(order_id, {}).get('items', [])
+        order = order_store.get(order_id)
         
-        if not grocery_items:
+        # Other sessions' orders are reported as missing, not refused, so ids can't be probed
+        if not order or not order.get('items') or not owns_order(order):
             emit('order_update', {
                 'status': 'error',
                 'message': 'Order not found or already processed'
             })
             return
         
-        # Start order placement in background thread
+        # Only one confirmation can move the order out of pending; repeats and retries stop here
+        claimed, previous = order_store.transition(order_id, QUEUED)
+        if not claimed:
+            print(f"🔁 Order {order_id} is already {previous}, ignoring repeated confirmation")
+            emit('order_update', build_duplicate_update(order_id, previous))
+            return
+        # Read again now that it is claimed: a late upgrade may have replaced the items just before
+        grocery_items = order_store.get(order_id)['items']
+        
+        # Every order event goes to the owning session's room only
+        room = order_room(order)
+        
+        def send_queue_position(job, position, eta_seconds):
+            socketio.emit('order_update', build_queue_update(order_id, position, eta_seconds), to=room)
+        
+        # Placed by an order worker once one is free
         def place_order_background():
+            started, previous = order_store.transition(order_id, PROCESSING)
+            if not started:
+                # Cancelled while it waited in line
+                print(f"⏭️ Order {order_id} was {previous} before a worker reached it, skipping it")
+                return
+            socketio.emit('order_update', {
+                'order_id': order_id,
+                'status': PROCESSING,
+                'message': 'Starting to place your order on Blinkit... This may take a few minutes.'
+            }, to=room)
+            
             try:
-                blinkit = BlinkitAutomation()
-                success, message = blinkit.place_order(grocery_items)
+                # Check out a warm browser; alternatives are looked up before it goes back to the pool
+                with browser_pool.session() as blinkit:
+                    success, message = blinkit.place_order(grocery_items, keep_browser=True)
+                    
+                    alternatives = None
+                    if not success and ("not available" in message.lower() or "not found" in message.lower()):
+                        try:
+                            alternatives = blinkit.check_alternatives(grocery_items[0]['name'])
+                        except:
+                            alternatives = None
                 
                 if success:
-                    # Update order status
-                    pending_orders[order_id]['status'] = 'completed'
-                    pending_orders[order_id]['message'] = message
-                    
-                    # Notify user
-                    socketio.emit('order_update', {
-                        'order_id': order_id,
-                        'status': 'completed',
-                        'message': message
-                    })
+                    finish_order(order_id, COMPLETED, message, room)
                 else:
                     # Check if it's a product availability issue
                     if "not available" in message.lower() or "not found" in message.lower():
-                        # Try to suggest alternatives
-                        try:
-                            alternatives = blinkit.check_alternatives(grocery_items[0]['name'])
-                            if alternatives:
-                                alt_message = f"{message}\n\nAlternative options available:\n"
-                                for alt in alternatives[:3]:  # Show top 3 alternatives
-                                    alt_message += f"• {alt}\n"
-                                alt_message += "\nWould you like me to try one of these alternatives?"
-                            else:
-                                alt_message = f"{message}\n\nNo alternatives found. Please try a different search term."
-                        except:
+                        # Suggest alternatives found while the browser was still checked out
+                        if alternatives:
+                            alt_message = f"{message}\n\nAlternative options available:\n"
+                            for alt in alternatives[:3]:  # Show top 3 alternatives
+                                alt_message += f"• {alt}\n"
+                            alt_message += "\nWould you like me to try one of these alternatives?"
+                        elif alternatives is not None:
+                            alt_message = f"{message}\n\nNo alternatives found. Please try a different search term."
+                        else:
                             alt_message = message
                         
-                        # Update order status
-                        pending_orders[order_id]['status'] = 'failed'
-                        pending_orders[order_id]['message'] = alt_message
-                        
-                        # Notify user
-                        socketio.emit('order_update', {
-                            'order_id': order_id,
-                            'status': 'failed',
-                            'message': alt_message
-                        })
+                        finish_order(order_id, FAILED, alt_message, room)
                     else:
                         # Regular failure
-                        pending_orders[order_id]['status'] = 'failed'
-                        pending_orders[order_id]['message'] = message
-                        
-                        socketio.emit('order_update', {
-                            'order_id': order_id,
-                            'status': 'failed',
-                            'message': message
-                        })
+                        finish_order(order_id, FAILED, message, room)
                     
             except Exception as e:
-                error_msg = f"Order placement failed: {str(e)}"
-                pending_orders[order_id]['status'] = 'failed'
-                pending_orders[order_id]['message'] = error_msg
-                
-                socketio.emit('order_update', {
-                    'order_id': order_id,
-                    'status': 'failed',
-                    'message': error_msg
-                })
-        
-        # Start background thread
-        thread = threading.Thread(target=place_order_background)
-        thread.daemon = True
-        thread.start()
-        
-        # Update order status to processing
-        pending_orders[order_id]['status'] = 'processing'
+                finish_order(order_id, FAILED, f"Order placement failed: {str(e)}", room)
         
-        emit('order_update', {
-            'order_id': order_id,
-            'status': 'processing',
-            'message': 'Starting to place your order on Blinkit... This may take a few minutes.'
-        })
+        try:
+            order_queue.submit(order_id, place_order_background, on_update=send_queue_position)
+        except OrderQueueFull:
+            print(f"🚦 Order queue full, turning away order {order_id}")
+            order_store.transition(order_id, PENDING)
+            emit('order_update', {
+                'order_id': order_id,
+                'status': 'error',
+                'message': "We're placing a lot of orders right now. Please confirm again in a few minutes."
+            })
         
     except Exception as e:
         emit('order_update', {
@@ -351,6 +827,58 @@ def handle_order_confirmation(data):
             'message': f'Failed to process order confirmation: {str(e)}'
         })
 
+def finish_order(order_id, status, message, room):
+    """
+    Record the outcome of a browser run and tell the order's room
+    """
+    order_store.transition(order_id, status, message=message)
+    socketio.emit('order_update', {
+        'order_id': order_id,
+        'status': status,
+        'message': message
+    }, to=room)
+
+def build_duplicate_update(order_id, status):
+    """
+    order_update payload for a confirmation of an order that has already left pending
+    """
+    messages = {
+        QUEUED: "Your order is already in line, I'll let you know when it starts.",
+        PROCESSING: "Your order is already being placed on Blinkit.",
+        COMPLETED: "This order has already been placed.",
+        FAILED: "This order could not be placed.",
+        CANCELLED: "This order was cancelled. Send your list again to start a new one.",
+    }
+    return {
+        'order_id': order_id,
+        'status': 'duplicate',
+        'order_status': status,
+        'message': messages.get(status, f"This order is already {status}.")
+    }
+
+@socketio.on('cancel_order')
+def handle_order_cancellation(data):
+    """Cancel an order that has not started yet"""
+    order_id = data.get('order_id')
+    order = order_store.get(order_id)
+    if not order or not owns_order(order):
+        emit('order_update', {'status': 'error', 'message': 'Order not found'})
+        return
+    cancelled, previous = order_store.transition(order_id, CANCELLED)
+    if cancelled:
+        print(f"🗑️ Order {order_id} cancelled while {previous}")
+        emit('order_update', {'order_id': order_id, 'status': CANCELLED, 'message': 'Your order was cancelled.'},
+             to=order_room(order))
+    elif previous is None:
+        emit('order_update', {'status': 'error', 'message': 'Order not found'})
+    else:
+        emit('order_update', {
+            'order_id': order_id,
+            'status': 'duplicate',
+            'order_status': previous,
+            'message': f"This order is already {previous} and can't be cancelled."
+        })
+
 @socketio.on('chat_message')
 def handle_chat_message(data):
     """Handle incoming chat messages"""
@@ -362,18 +890,12 @@ def handle_chat_message(data):
     
     # Check if this is an order confirmation
     if message.lower() in ['yes', 'confirm', 'proceed', 'place order', 'order now']:
-        # Find the latest pending order for this user
-        # For simplicity, we'll use the first available order
-        # In production, you'd track user sessions properly
-        pending_order = None
-        for order_id, order_data in pending_orders.items():
-            if order_data.get('status') == 'pending':
-                pending_order = order_id
-                break
+        # Latest pending order of this session, straight from the (session, status) index
+        pending_order = order_store.latest(PENDING, session=connection_session())
         
         if pending_order:
             # Trigger order confirmation
-            handle_order_confirmation({'order_id': pending_order})
+            handle_order_confirmation({'order_id': pending_order['id']})
             return
         else:
             response = "I don't see any pending orders to confirm. Please start by telling me what groceries you need."
@@ -384,20 +906,118 @@ def handle_chat_message(data):
             })
             return
     
-    # Parse the grocery list using AI
-    grocery_items = parse_grocery_list(message)
+    # Parse the grocery list in the background; the reply goes to this client only
+    sid = request.sid
+    session = connection_session()
+    
+    answered = {}
+    
+    def send_parse_result(grocery_items, status):
+        if status != PARSE_OK:
+            print(f"⚠️ Parse finished with status '{status}', replying with fallback items")
+        response = build_chat_response(grocery_items, session=session)
+        answered['order_id'] = response['order_id']
+        socketio.emit('chat_response', response, to=sid)
+    
+    def send_upgraded_items(grocery_items):
+        response = build_upgrade_response(answered.get('order_id'), grocery_items, session=session)
+        if response is not None:
+            socketio.emit('chat_response', response, to=sid)
+    
+    def send_partial_items(grocery_items):
+        socketio.emit('chat_response', build_partial_response(grocery_items), to=sid)
     
-    # Generate response
+    # Acknowledge first so a fast result can never arrive before the acknowledgement
+    emit('chat_status', {
+        'status': 'parsing',
+        'message': 'Reading your grocery list...'
+    })
+    
+    try:
+        parse_queue.submit(message, send_parse_result, progress=send_partial_items,
+                           upgrade=send_upgraded_items if PARSE_UPGRADE_LATE else None)
+    except ParseQueueFull:
+        print("🚦 Parse queue full, rejecting message")
+        emit('chat_response', {
+            'message': "I'm handling a lot of orders right now. Please send your list again in a few seconds.",
+            'timestamp': 'now',
+            'grocery_items': [],
+            'order_id': None
+        })
+
+def format_wait(seconds):
+    """Human-readable wait for queue messages"""
+    if seconds < 60:
+        return "less than a minute"
+    minutes = round(seconds / 60)
+    return f"about {minutes} minute{'s' if minutes != 1 else ''}"
+
+def build_queue_update(order_id, position, eta_seconds):
+    """
+    order_update payload telling a user where their confirmed order is in line
+    """
+    ahead = position - 1
+    if ahead:
+        waiting = f"{ahead} order{'s' if ahead != 1 else ''} ahead of yours"
+    else:
+        waiting = "Your order is next"
+    return {
+        'order_id': order_id,
+        'status': 'queued',
+        'position': position,
+        'eta_seconds': eta_seconds,
+        'message': f"{waiting}. Expected to start in {format_wait(eta_seconds)}."
+    }
+
+def build_partial_response(grocery_items):
+    """
+    chat_response payload for items found so far while a long list is still streaming
+    """
+    lines = [f"• {item.get('quantity', 1)} {item.get('unit', '')} of {str(item.get('name', '')).title()}"
+             for item in grocery_items]
+    return {
+        'partial': True,
+        'message': "Reading your list...\n\n" + '\n'.join(lines) if lines else "Reading your list...",
+        'timestamp': 'now',
+        'grocery_items': grocery_items,
+        'order_id': None
+    }
+
+def build_upgrade_response(order_id, grocery_items, session=None):
+    """
+    Swap a late AI parse into the order created from the local parse, if it has not been confirmed yet.
+    Returns the chat_response payload, or None when the order has moved on.
+    """
+    if order_id is None:
+        # The local parse found nothing, so there is no order yet; the AI result becomes a new one
+        response = build_chat_response(grocery_items, session=session)
+        response['upgraded'] = True
+        return response
+    
+    if not order_store.update_if(order_id, PENDING, items=grocery_items):
+        order = order_store.get(order_id)
+        print(f"⏭️ Order {order_id} already {order['status'] if order else 'gone'}, not upgrading it")
+        return None
+    
+    print(f"⬆️ Upgraded order {order_id} with late AI items: {grocery_items}")
+    return {
+        'message': "I took a closer look at your list and updated it.\n\n" + generate_order_summary(grocery_items),
+        'timestamp': 'now',
+        'grocery_items': grocery_items,
+        'order_id': order_id,
+        'upgraded': True
+    }
+
+def build_chat_response(grocery_items, session=None):
+    """
+    Create a pending order (owned by session) from parsed items and build the chat_response payload
+    """
+    order_id = None
     if grocery_items:
         # Create a new order
-        import uuid
         order_id = str(uuid.uuid4())[:8]
         
-        pending_orders[order_id] = {
-            'items': grocery_items,
-            'status': 'pending',
-            'timestamp': 'now'
-        }
+        order_store.create(order_id, grocery_items, session=session)
         
         response = generate_order_summary(grocery_items)
         
@@ -408,12 +1028,12 @@ def handle_chat_message(data):
     else:
         response = "I'm having trouble understanding your grocery list. Could you please rephrase it? For example: 'I need 2 kg potatoes, 1 dozen eggs, and 3 packets of bread'"
     
-    emit('chat_response', {
+    return {
         'message': response,
         'timestamp': 'now',
         'grocery_items': grocery_items if grocery_items else [],
-        'order_id': order_id if grocery_items else None
-    })
+        'order_id': order_id
+    }
 
 if __name__ == '__main__':
     print("🚀 Starting Kirana Tap Backend...")
@@ -426,4 +1046,6 @@ if __name__ == '__main__':
     # Use production settings for Render
     debug_mode = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
     
+    prepare_server(debug_mode)
+    
     socketio.run(app, debug=debug_mode, host='0.0.0.0', port=port)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Held-out accuracy, coverage and latency of the on-box entity extractor.
+
+The recorded parses (benchmarks/corpus/llm_responses_v1.json, plus any JSONL
+parse logs passed with --data) are split into --folds folds; each fold is held
+out once while the model trains on the rest, so every line is scored by a model
+that never saw it. A line counts as correct when its items match the recorded
+AI answer on (name, quantity, unit).
+
+Per confidence threshold the table shows coverage (share of lines the model
+would answer instead of the AI) and accuracy on those lines; everything below
+the threshold still goes to the AI.
+
+    python benchmarks/bench_entity_extractor.py --folds 5
+    python benchmarks/bench_entity_extractor.py --data parse_examples.jsonl benchmarks/corpus/llm_responses_v1.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from entity_extractor import DEFAULT_EPOCHS, EntityExtractor, evaluate, load_examples, split_examples  # noqa: E402
+from latency_stats import percentile  # noqa: E402
+
+RECORDINGS_PATH = os.path.join(ROOT, 'benchmarks', 'corpus', 'llm_responses_v1.json')
+THRESHOLDS = (0.5, 0.7, 0.8, 0.9, 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated accuracy of the on-box entity extractor")
+    parser.add_argument('--data', nargs='+', default=[RECORDINGS_PATH], help="Recorded-answer JSON files / JSONL parse logs")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    examples = load_examples(args.data)
+    # Shuffle once, then cut into folds
+    ordered = split_examples(examples, 0.0, args.seed)[0]
+    folds = [ordered[k::args.folds] for k in range(args.folds)]
+
+    reports = []
+    train_seconds = []
+    for k, held_out in enumerate(folds):
+        train_set = [example for j, fold in enumerate(folds) if j != k for example in fold]
+        start = time.monotonic()
+        model = EntityExtractor.train(train_set, epochs=args.epochs, seed=args.seed)
+        train_seconds.append(time.monotonic() - start)
+        reports.append((len(held_out), evaluate(model, held_out, THRESHOLDS)))
+
+    # Latency of every line under the last model, many times over
+    samples = []
+    for _ in range(20):
+        for line, _ in examples:
+            start = time.perf_counter()
+            model.parse_line(line)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    total = sum(lines for lines, _ in reports)
+
+    def weighted(get):
+        values = [(lines, get(report)) for lines, report in reports if get(report) is not None]
+        weight = sum(lines for lines, _ in values)
+        return round(sum(lines * value for lines, value in values) / weight, 3) if weight else None
+
+    results = {
+        'lines': total,
+        'folds': args.folds,
+        'accuracy': weighted(lambda report: report['accuracy']),
+        'fields': {field: weighted(lambda report, field=field: report['fields'][field]) for field in ('name', 'quantity', 'unit')},
+        'thresholds': {threshold: {
+            'coverage': weighted(lambda report, threshold=threshold: report['thresholds'][threshold]['coverage']),
+            'accuracy': weighted(lambda report, threshold=threshold: report['thresholds'][threshold]['accuracy']),
+        } for threshold in THRESHOLDS},
+        'train_seconds_avg': round(sum(train_seconds) / len(train_seconds), 3),
+        'p50_us': round(percentile(samples, 50) * 1e6, 1),
+        'p99_us': round(percentile(samples, 99) * 1e6, 1),
+    }
+
+    print(f"📚 {total} recorded lines, {args.folds}-fold cross-validation, {args.epochs} epochs "
+          f"({results['train_seconds_avg']}s per training run)")
+    print(f"🎯 Every line: accuracy {results['accuracy']} (name {results['fields']['name']}, "
+          f"quantity {results['fields']['quantity']}, unit {results['fields']['unit']})")
+    print(f"\n{'threshold':>9s} {'coverage':>9s} {'accuracy':>9s}")
+    for threshold, result in results['thresholds'].items():
+        accuracy = f"{result['accuracy']:9.3f}" if result['accuracy'] is not None else f"{'-':>9s}"
+        print(f"{threshold:9.2f} {result['coverage']:9.3f} {accuracy}")
+    print(f"\n⏱️ parse_line: p50 {results['p50_us']}µs, p99 {results['p99_us']}µs")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
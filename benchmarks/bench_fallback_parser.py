@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Per-line cost of the no-AI fallback parser, old vs new.
+
+  legacy    - the previous fallback_parsing: four patterns passed to re.match per
+              line (compiled through re's cache on every call), word_to_num rebuilt
+              per call, newline splitting only
+  tokenizer - local_parser.tokenize_items: one precompiled token regex, single pass,
+              splits on newlines, commas and "and"
+
+The legacy copy below has its print() calls removed so both sides time parsing only.
+No network or browser needed:
+    python benchmarks/bench_fallback_parser.py --repeat 2000
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_parser import tokenize_items  # noqa: E402
+
+SAMPLE_LINES = [
+    "2 kg potatoes",
+    "one packet amul toned milk",
+    "three packets heritage milk",
+    "1 dozen eggs",
+    "banana",
+    "500 g paneer",
+    "milk 1 liter",
+    "2 kg onions, 1 kg tomatoes and 6 eggs",
+    "I need 2 kg potatoes, 1 dozen eggs, and 3 packets of bread",
+    "tata sampann unpolished toor dal",
+]
+
+
+def legacy_fallback_parsing(user_message):
+    """The previous fallback_parsing, minus logging"""
+    items = []
+    lines = [line.strip() for line in user_message.split('\n') if line.strip()]
+    patterns = [
+        r'^(one|two|three|four|five|six|seven|eight|nine|ten)\s+(packet|packets|kg|g|liter|liters|piece|pieces|dozen)\s+([a-zA-Z\s]+)$',
+        r'^(\d+)\s*(packet|packets|kg|g|liters?|pieces?|dozen)\s+of?\s+([a-zA-Z\s]+)$',
+        r'^(one|two|three|four|five|six|seven|eight|nine|ten)\s+([a-zA-Z\s]+)$',
+        r'^(\d+)\s+([a-zA-Z\s]+)$'
+    ]
+    word_to_num = {
+        'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
+    }
+    for line in lines:
+        line_items = []
+        for pattern in patterns:
+            match = re.match(pattern, line, re.IGNORECASE)
+            if match:
+                groups = match.groups()
+                if len(groups) == 3:
+                    quantity = word_to_num[groups[0].lower()] if groups[0].lower() in word_to_num else int(groups[0])
+                    line_items.append({"name": groups[2].strip().lower(), "quantity": quantity,
+                                       "unit": groups[1].lower(), "category": "general"})
+                    break
+                elif len(groups) == 2:
+                    quantity = word_to_num[groups[0].lower()] if groups[0].lower() in word_to_num else int(groups[0])
+                    line_items.append({"name": groups[1].strip().lower(), "quantity": quantity,
+                                       "unit": "pieces", "category": "general"})
+                    break
+        if not line_items and line.strip():
+            items.append({"name": line.strip().lower(), "quantity": 1, "unit": "pieces", "category": "general"})
+        else:
+            items.extend(line_items)
+    return items
+
+
+def per_line_microseconds(parser, lines, repeat):
+    seconds = timeit.timeit(lambda: [parser(line) for line in lines], number=repeat)
+    return seconds / (repeat * len(lines)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-line cost of the legacy and tokenizer fallback parsers")
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'line':60s} {'legacy':>8s} {'tokens':>8s}  items (legacy -> tokenizer)")
+    for line in SAMPLE_LINES:
+        legacy_us = per_line_microseconds(legacy_fallback_parsing, [line], args.repeat)
+        tokenizer_us = per_line_microseconds(tokenize_items, [line], args.repeat)
+        print(f"{line[:60]:60s} {legacy_us:7.2f}µ {tokenizer_us:7.2f}µ  "
+              f"{len(legacy_fallback_parsing(line))} -> {len(tokenize_items(line))}")
+
+    legacy_us = per_line_microseconds(legacy_fallback_parsing, SAMPLE_LINES, args.repeat)
+    tokenizer_us = per_line_microseconds(tokenize_items, SAMPLE_LINES, args.repeat)
+    print(f"\n📊 Mean per line: legacy {legacy_us:.2f}µs, tokenizer {tokenizer_us:.2f}µs "
+          f"({legacy_us / tokenizer_us:.1f}x)")
+
+    # Multi-item lines yield more items from the tokenizer, so also compare per item produced
+    legacy_items = sum(len(legacy_fallback_parsing(line)) for line in SAMPLE_LINES)
+    tokenizer_items = sum(len(tokenize_items(line)) for line in SAMPLE_LINES)
+    legacy_per_item = legacy_us * len(SAMPLE_LINES) / legacy_items
+    tokenizer_per_item = tokenizer_us * len(SAMPLE_LINES) / tokenizer_items
+    print(f"📊 Mean per item:  legacy {legacy_per_item:.2f}µs ({legacy_items} items), "
+          f"tokenizer {tokenizer_per_item:.2f}µs ({tokenizer_items} items)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline parse throughput load test against the local fake OpenAI server.
+
+Starts fake_openai_server in-process, points the app's LLM client at it, then
+keeps --concurrency clients busy sending grocery lists through the parse queue
+(the same path a chat message takes) for --requests parses in total. Reports
+parses per second, end-to-end latency percentiles, how parses finished
+(ok / timeout / error) and what the fake server saw.
+
+The parse caches are disabled and every line goes to the AI unless --local is
+given, so each parse costs a completion. No network or API key needed:
+    python benchmarks/bench_parse_throughput.py --requests 200 --concurrency 16 --latency lognormal:0.8:0.4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Caches are created when parse_cache is first imported (fake_openai_server imports it too);
+# the entity model, AI parse log and order store stay off disk
+os.environ.update({'PARSE_CACHE_PATH': '', 'PARSE_CACHE_SIZE': '0', 'BROWSER_POOL_WARM': 'false',
+                   'ENTITY_MODEL_PATH': '', 'PARSE_EXAMPLE_LOG': '', 'ORDER_STORE_PATH': ''})
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from latency_stats import LatencyStats  # noqa: E402
+
+MESSAGES = [
+    "2 kg potatoes\n1 dozen eggs\n3 packets bread",
+    "one packet amul toned milk\nbanana",
+    "I need 2 kg onions, 1 kg tomatoes and some coriander",
+    "get the usual atta\nsome of that green chutney\npaneer for tonight\na few lemons maybe",
+    "milk 1 liter, bananas 5 pieces, rice 2 kg",
+    "tata sampann toor dal\nsurf excel matic 1 kg\ncolgate strong teeth 200 g\nmaggi 4 pack\nbrown bread",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test grocery-list parsing against a local fake OpenAI server")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', default='lognormal:0.8:0.4')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--hang-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--local', action='store_true', help="Let the local parser answer simple lines")
+    parser.add_argument('--verbose', action='store_true', help="Show the app's parse logging")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(latency=args.latency, error_rate=args.error_rate,
+                              rate_limit_rate=args.rate_limit_rate, hang_rate=args.hang_rate,
+                              hang_seconds=120, seed=args.seed).start()
+
+    # The app reads its configuration at import time
+    os.environ.update({'OPENAI_BASE_URL': server.base_url, 'OPENAI_API_KEY': 'fake'})
+    if not args.local:
+        os.environ['LOCAL_PARSE_THRESHOLD'] = '1.1'
+    import app  # noqa: E402
+
+    timings = LatencyStats(max_samples=args.requests)
+    statuses = {}
+    lock = threading.Lock()
+    remaining = [args.requests]
+
+    def client():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+                n = remaining[0]
+            done = threading.Event()
+            start = time.monotonic()
+
+            def on_result(items, status):
+                timings.record('parse', time.monotonic() - start, ok=status == app.PARSE_OK)
+                with lock:
+                    statuses[status] = statuses.get(status, 0) + 1
+                done.set()
+
+            try:
+                app.parse_queue.submit(MESSAGES[n % len(MESSAGES)], on_result)
+            except app.ParseQueueFull:
+                with lock:
+                    statuses['rejected'] = statuses.get('rejected', 0) + 1
+                time.sleep(0.05)
+                continue
+            done.wait()
+
+    print(f"🏁 {args.requests} parses, {args.concurrency} concurrent clients, fake LLM latency {args.latency}")
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.monotonic()
+    with output:
+        threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.monotonic() - start
+
+    parse = timings.summary().get('parse', {})
+    print(f"\n📊 {args.requests / elapsed:.1f} parses/s over {elapsed:.1f}s")
+    print(f"📊 Latency avg {parse.get('avg')}s  p50 {parse.get('p50')}s  p95 {parse.get('p95')}s  "
+          f"p99 {parse.get('p99')}s  max {parse.get('max')}s")
+    print(f"📊 Finished: {statuses}")
+    print(f"📊 Fake server: {server.stats}")
+    llm = app.llm_client.stats()
+    print(f"📊 LLM client: {llm['calls']} calls, {llm['attempts']} attempts, {llm['retries']} retries, "
+          f"{llm['failures']} failures, retry budget {llm['retry_budget']}")
+    print(f"📊 Batching: {app.parse_batcher.stats()['avg_batch_size']} lists per AI request")
+    server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
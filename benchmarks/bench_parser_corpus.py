@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Latency, allocations and accuracy of each parser tier on the grocery corpus.
+
+  local    - local_parser.parse_line; only lines at or above LOCAL_PARSE_THRESHOLD count
+  fallback - fallback_parsing (single-pass tokenizer) on the whole message
+  ai       - parse_grocery_list with every line sent to the AI
+  pipeline - parse_grocery_list as deployed (local tier first, AI for the rest)
+  summary  - generate_order_summary on the expected items (latency and allocations only)
+
+The corpus (benchmarks/corpus/grocery_corpus_v1.json) holds single-line, multi-line,
+Hinglish and 50+ item messages with expected items. The AI is the fake OpenAI server
+replaying recorded per-line answers (benchmarks/corpus/llm_responses_v1.json), so runs
+are offline and repeatable; AI accuracy therefore measures the recorded answers plus
+the pipeline's chunking and line attribution. Caches, batching and the parse deadline
+are off so every run does the same work.
+
+Accuracy matches items on (name, quantity, unit) with units normalised (packets ->
+packet, litre -> liter, ...); name recall ignores quantity and unit.
+
+    python benchmarks/bench_parser_corpus.py --repeat 5 --json results.json
+    python benchmarks/bench_parser_corpus.py --record   # re-record AI answers (needs OPENAI_API_KEY)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Repeatable runs: no caches, no batching window, no hedging deadline, and nothing read from or written to
+# the entity model, the AI parse log or the order store on disk (read when the modules are imported)
+os.environ.update({
+    'PARSE_CACHE_PATH': '',
+    'PARSE_CACHE_SIZE': '0',
+    'PARSE_BATCH_WINDOW_MS': '0',
+    'PARSE_DEADLINE': '0',
+    'BROWSER_POOL_WARM': 'false',
+    'ENTITY_MODEL_PATH': '',
+    'PARSE_EXAMPLE_LOG': '',
+    'ORDER_STORE_PATH': '',
+})
+
+from fake_openai_server import FakeOpenAIServer, load_line_recordings  # noqa: E402
+from latency_stats import percentile  # noqa: E402
+
+CORPUS_PATH = os.path.join(ROOT, 'benchmarks', 'corpus', 'grocery_corpus_v1.json')
+RECORDINGS_PATH = os.path.join(ROOT, 'benchmarks', 'corpus', 'llm_responses_v1.json')
+
+UNIT_ALIASES = {
+    'packets': 'packet', 'pack': 'packet', 'packs': 'packet', 'pkt': 'packet',
+    'liters': 'liter', 'litre': 'liter', 'litres': 'liter', 'l': 'liter', 'ltr': 'liter',
+    'kgs': 'kg', 'kilo': 'kg', 'kilos': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'gm': 'g', 'gms': 'g', 'gram': 'g', 'grams': 'g',
+    'piece': 'pieces', 'pcs': 'pieces', 'pc': 'pieces',
+    'bottle': 'bottles', 'dozens': 'dozen',
+}
+TIERS = ('local', 'fallback', 'ai', 'pipeline', 'summary')
+
+
+def item_key(item):
+    name = re.sub(r'\s+', ' ', str(item.get('name', '')).lower()).strip()
+    unit = str(item.get('unit', '')).lower().strip()
+    try:
+        quantity = round(float(item.get('quantity', 1)), 3)
+    except (TypeError, ValueError):
+        quantity = None
+    return name, quantity, UNIT_ALIASES.get(unit, unit)
+
+
+def score(expected, got):
+    """(matched, expected count, produced count, names matched) for one message"""
+    want = Counter(item_key(item) for item in expected)
+    have = Counter(item_key(item) for item in got)
+    want_names = Counter(key[0] for key in want.elements())
+    have_names = Counter(key[0] for key in have.elements())
+    return (sum((want & have).values()), len(expected), len(got), sum((want_names & have_names).values()))
+
+
+def load_corpus(path):
+    with open(path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    return corpus['version'], corpus['messages']
+
+
+def make_tiers(app, local_parser):
+    def local(text):
+        items = []
+        for line in (line.strip() for line in text.split('\n')):
+            if line:
+                line_items, confidence = local_parser.parse_line(line)
+                if line_items and confidence >= app.LOCAL_PARSE_THRESHOLD:
+                    items.extend(line_items)
+        return items
+
+    def ai(text):
+        threshold, app.LOCAL_PARSE_THRESHOLD = app.LOCAL_PARSE_THRESHOLD, 1.1
+        try:
+            return app.parse_grocery_list(text)
+        finally:
+            app.LOCAL_PARSE_THRESHOLD = threshold
+
+    return {
+        'local': local,
+        'fallback': app.fallback_parsing,
+        'ai': ai,
+        'pipeline': app.parse_grocery_list,
+    }
+
+
+def run(messages, app, local_parser, tiers, repeat):
+    parsers = make_tiers(app, local_parser)
+    results = {}
+    for tier in tiers:
+        samples = []
+        peaks = []
+        totals = Counter()
+        by_kind = {}
+        for message in messages:
+            if tier == 'summary':
+                call = lambda message=message: app.generate_order_summary(message['expected'])  # noqa: E731
+            else:
+                call = lambda message=message: parsers[tier](message['text'])  # noqa: E731
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                got = call()
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    call()
+                    samples.append(time.perf_counter() - start)
+                tracemalloc.start()
+                tracemalloc.reset_peak()
+                call()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+
+            if tier != 'summary':
+                matched, expected, produced, names = score(message['expected'], got)
+                for counts in (totals, by_kind.setdefault(message['kind'], Counter())):
+                    counts.update(matched=matched, expected=expected, produced=produced, names=names)
+
+        samples.sort()
+        result = {
+            'p50_ms': round(percentile(samples, 50) * 1000, 3),
+            'p95_ms': round(percentile(samples, 95) * 1000, 3),
+            'p99_ms': round(percentile(samples, 99) * 1000, 3),
+            'peak_kb_avg': round(sum(peaks) / len(peaks) / 1024, 1),
+            'peak_kb_max': round(max(peaks) / 1024, 1),
+        }
+        if tier != 'summary':
+            result.update(accuracy(totals))
+            result['by_kind'] = {kind: accuracy(counts) for kind, counts in sorted(by_kind.items())}
+        results[tier] = result
+    return results
+
+
+def accuracy(counts):
+    precision = counts['matched'] / counts['produced'] if counts['produced'] else 0.0
+    recall = counts['matched'] / counts['expected'] if counts['expected'] else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        'precision': round(precision, 3),
+        'recall': round(recall, 3),
+        'f1': round(f1, 3),
+        'name_recall': round(counts['names'] / counts['expected'], 3) if counts['expected'] else 0.0,
+    }
+
+
+def record(messages, app, path):
+    """Ask the real AI for every corpus line and store its items as the new recordings"""
+    lines = sorted({line.strip() for message in messages for line in message['text'].split('\n') if line.strip()})
+    recorded = {}
+    for n, line in enumerate(lines, start=1):
+        reply = app.call_ai(app.GROCERY_PARSE_PROMPT, line)
+        match = re.search(r'\[.*\]', reply, re.DOTALL)
+        items = json.loads(match.group()) if match else []
+        recorded[line] = [{key: value for key, value in item.items() if key != 'line'} for item in items]
+        print(f"🎙️ {n}/{len(lines)} {line!r}: {len(recorded[line])} items")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'model': app.llm_client.model, 'lines': recorded}, f, indent=1, ensure_ascii=False)
+    print(f"💾 Recorded {len(recorded)} lines to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-tier latency, allocations and accuracy on the grocery corpus")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--recordings', default=RECORDINGS_PATH)
+    parser.add_argument('--tiers', nargs='*', default=list(TIERS), choices=TIERS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--llm-latency', default='fixed:0', help="Fake AI latency spec (see fake_openai_server.py)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--record', action='store_true', help="Re-record AI answers from the real API into --recordings")
+    args = parser.parse_args()
+
+    version, messages = load_corpus(args.corpus)
+
+    if args.record:
+        import app
+        record(messages, app, args.recordings)
+        return 0
+
+    server = FakeOpenAIServer(latency=args.llm_latency, line_recordings=load_line_recordings(args.recordings)).start()
+    os.environ.update({'OPENAI_BASE_URL': server.base_url, 'OPENAI_API_KEY': 'fake'})
+    import app
+    import local_parser
+
+    kinds = Counter(message['kind'] for message in messages)
+    print(f"📚 Corpus v{version}: {len(messages)} messages ({', '.join(f'{n} {kind}' for kind, n in sorted(kinds.items()))}), "
+          f"{sum(len(message['expected']) for message in messages)} expected items")
+    results = run(messages, app, local_parser, args.tiers, args.repeat)
+    server.stop()
+
+    print(f"\n{'tier':10s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'peak KB':>8s} {'prec':>6s} {'recall':>6s} {'f1':>6s} {'names':>6s}")
+    for tier, result in results.items():
+        scores = ''.join(f" {result[key]:6.3f}" if key in result else f" {'-':>6s}"
+                         for key in ('precision', 'recall', 'f1', 'name_recall'))
+        print(f"{tier:10s} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} {result['p99_ms']:9.3f} "
+              f"{result['peak_kb_avg']:8.1f}{scores}")
+
+    print(f"\n{'F1 by kind':10s} " + ' '.join(f"{kind:>9s}" for kind in sorted(kinds)))
+    for tier, result in results.items():
+        if 'by_kind' in result:
+            print(f"{tier:10s} " + ' '.join(f"{result['by_kind'][kind]['f1']:9.3f}" for kind in sorted(kinds)))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'corpus_version': version, 'repeat': args.repeat, 'tiers': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
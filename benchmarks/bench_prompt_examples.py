@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Prompt tokens and latency of the full few-shot prompt vs per-request example selection.
+
+For every corpus message, builds the parse prompt both ways and reports prompt
+tokens (estimated, 4 characters per token), the cost of selecting examples, and
+completion latency with each prompt.
+
+Latency comes from the fake OpenAI server, which charges --prefill-ms-per-1k
+for every thousand prompt tokens on top of --latency, or from the real API with
+--live (uses OPENAI_API_KEY / OPENAI_BASE_URL; each message is sent twice):
+    python benchmarks/bench_prompt_examples.py --prefill-ms-per-1k 60
+    python benchmarks/bench_prompt_examples.py --live --limit 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.update({'PARSE_CACHE_PATH': '', 'BROWSER_POOL_WARM': 'false',
+                   'ENTITY_MODEL_PATH': '', 'PARSE_EXAMPLE_LOG': '', 'ORDER_STORE_PATH': ''})
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from latency_stats import percentile  # noqa: E402
+from parse_batcher import estimate_tokens  # noqa: E402
+
+CORPUS_PATH = os.path.join(ROOT, 'benchmarks', 'corpus', 'grocery_corpus_v1.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and selected few-shot parse prompts")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--k', type=int, default=None, help="Examples per prompt (default PARSE_EXAMPLE_COUNT)")
+    parser.add_argument('--latency', default='fixed:0.05', help="Fake server base latency spec")
+    parser.add_argument('--prefill-ms-per-1k', type=float, default=60.0)
+    parser.add_argument('--live', action='store_true', help="Time against the real API instead of the fake server")
+    parser.add_argument('--limit', type=int, help="Only the first N corpus messages")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding='utf-8') as f:
+        messages = json.load(f)['messages'][:args.limit]
+
+    server = None
+    if not args.live:
+        server = FakeOpenAIServer(latency=args.latency, prefill_ms_per_1k=args.prefill_ms_per_1k).start()
+        os.environ.update({'OPENAI_BASE_URL': server.base_url, 'OPENAI_API_KEY': 'fake'})
+    import app  # noqa: E402
+
+    full_prompt = app.GROCERY_PARSE_PROMPT
+    full_tokens = estimate_tokens(full_prompt)
+    rows = []
+    select_seconds = []
+    latency = {'full': [], 'selected': []}
+    for message in messages:
+        start = time.perf_counter()
+        prompt, examples = app.example_index.compact_prompt(app.GROCERY_PARSE_HEADER, app.GROCERY_PARSE_FOOTER,
+                                                            message['text'], args.k)
+        select_seconds.append(time.perf_counter() - start)
+        rows.append((message['kind'], estimate_tokens(prompt), examples))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, system_prompt in (('full', full_prompt), ('selected', prompt)):
+                start = time.perf_counter()
+                app.call_ai(system_prompt, message['text'])
+                latency[name].append(time.perf_counter() - start)
+
+    print(f"📚 {len(messages)} messages, {len(app.example_index.examples)} examples in the full prompt "
+          f"({full_tokens} tokens), k={args.k or app.example_index.k}")
+    print(f"\n{'kind':10s} {'messages':>8s} {'full':>7s} {'selected':>9s} {'saved':>7s}")
+    for kind in sorted({kind for kind, _, _ in rows}):
+        tokens = [prompt_tokens for row_kind, prompt_tokens, _ in rows if row_kind == kind]
+        avg = sum(tokens) / len(tokens)
+        print(f"{kind:10s} {len(tokens):8d} {full_tokens:7d} {avg:9.1f} {1 - avg / full_tokens:6.1%}")
+    avg = sum(prompt_tokens for _, prompt_tokens, _ in rows) / len(rows)
+    print(f"{'all':10s} {len(rows):8d} {full_tokens:7d} {avg:9.1f} {1 - avg / full_tokens:6.1%}")
+
+    select_seconds.sort()
+    print(f"\n⏱️ Example selection: p50 {percentile(select_seconds, 50) * 1e6:.1f}µs, "
+          f"p99 {percentile(select_seconds, 99) * 1e6:.1f}µs per message")
+    source = "real API" if args.live else f"fake server ({args.latency} + {args.prefill_ms_per_1k}ms per 1k prompt tokens)"
+    print(f"⏱️ Completion latency against the {source}:")
+    for name, samples in latency.items():
+        samples.sort()
+        print(f"   {name:9s} p50 {percentile(samples, 50) * 1000:7.1f}ms  p95 {percentile(samples, 95) * 1000:7.1f}ms")
+
+    if server:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Latency comparison of the two Blinkit search paths.
+
+  url   - open https://blinkit.com/s/?q=<query> directly
+  click - homepage fake search bar -> search page -> type -> Enter
+
+Each query is searched once per mode per round (modes alternate so page caching
+favours neither). Search time runs from the start of the search until Add buttons
+are on screen. Nothing is added to the cart.
+
+Needs Chrome and a logged-in chrome-profile, like the automation itself:
+    python benchmarks/bench_search_modes.py --rounds 3 milk bread "amul butter"
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blinkit_automation_clean import BlinkitAutomation  # noqa: E402
+from latency_stats import LatencyStats  # noqa: E402
+
+DEFAULT_QUERIES = ["milk", "bread", "eggs", "amul butter", "onion", "basmati rice"]
+
+
+def time_search(automation, mode, query):
+    """Run one search in the given mode; returns (seconds, success)"""
+    if mode == 'click':
+        # The click path starts from the homepage, as the first item of an order does
+        automation.reset_to_home()
+
+    start = time.monotonic()
+    if mode == 'url':
+        success = automation.search_via_url(query)
+    else:
+        success = automation.search_via_click(query) and bool(automation.find_add_buttons(automation.driver)[1])
+    return time.monotonic() - start, success
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare direct-URL and search-bar search latency on Blinkit")
+    parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    automation = BlinkitAutomation()
+    if not automation.setup_driver() or not automation.navigate_to_blinkit():
+        print("❌ Could not start a logged-in browser")
+        return 1
+
+    results = LatencyStats()
+    try:
+        for round_number in range(args.rounds):
+            modes = ('url', 'click') if round_number % 2 == 0 else ('click', 'url')
+            for query in args.queries:
+                for mode in modes:
+                    seconds, success = time_search(automation, mode, query)
+                    results.record(mode, seconds, success)
+                    print(f"  round {round_number + 1} {mode:5s} {query!r}: {seconds:.2f}s {'✅' if success else '❌'}")
+    finally:
+        automation.close()
+
+    summary = results.summary()
+    print("\n📊 Search latency by mode (seconds)")
+    print(f"{'mode':6s} {'count':>5s} {'fail':>5s} {'p50':>7s} {'p95':>7s} {'max':>7s}")
+    for mode in ('url', 'click'):
+        row = summary.get(mode)
+        if row:
+            print(f"{mode:6s} {row['count']:5d} {row['errors']:5d} {row['p50']:7.2f} {row['p95']:7.2f} {row['max']:7.2f}")
+
+    if 'url' in summary and 'click' in summary:
+        saved = summary['click']['p50'] - summary['url']['p50']
+        print(f"\n⚡ Direct URL saves {saved:.2f}s per search at p50 "
+              f"({saved * len(args.queries):.1f}s for a {len(args.queries)}-item order)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Socket.IO connection load test: memory per idle connection and sustained chat
+throughput for each server async mode.
+
+For every --modes entry the app is started in a subprocess with
+SOCKETIO_ASYNC_MODE set (browsers not warmed, parse cache and order store in
+memory, the AI pointed at an in-process fake_openai_server). --connections
+Socket.IO clients connect and sit idle; the server's resident memory and OS
+thread count are read before and after. Then --active of those clients send
+grocery lists back to back for --seconds, each waiting for its chat_response,
+and the report shows messages per second and round-trip latency percentiles.
+
+Green-thread modes need their package installed (pip install eventlet /
+gevent); missing ones are skipped. Clients use the websocket transport when
+websocket-client is installed, long-polling otherwise:
+    python benchmarks/bench_socket_load.py --modes threading,eventlet --connections 500 --active 50
+"""
+
+import argparse
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+import requests
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from latency_stats import LatencyStats  # noqa: E402
+
+MESSAGES = [
+    "2 kg potatoes\n1 dozen eggs\n3 packets bread",
+    "one packet amul toned milk\nbanana",
+    "I need 2 kg onions, 1 kg tomatoes and some coriander",
+    "milk 1 liter, bananas 5 pieces, rice 2 kg",
+]
+MODE_PACKAGES = {'threading': None, 'eventlet': 'eventlet', 'gevent': 'gevent'}
+SERVER = ("import app; app.socketio.run(app.app, host='127.0.0.1', port={port}, "
+          "allow_unsafe_werkzeug=True, log_output=False)")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, llm_url):
+    port = free_port()
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, BROWSER_POOL_WARM='false', PARSE_CACHE_PATH='',
+               ORDER_STORE_PATH='', PARSE_EXAMPLE_LOG='', ENTITY_MODEL_PATH='',
+               OPENAI_BASE_URL=llm_url, OPENAI_API_KEY='fake')
+    process = subprocess.Popen([sys.executable, '-c', SERVER.format(port=port)], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            health = requests.get(f"{url}/health", timeout=1).json()
+            return process, url, health['async_mode']
+        except (requests.RequestException, ValueError):
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server in {mode} mode did not start")
+
+
+def server_usage(process):
+    info = psutil.Process(process.pid)
+    return info.memory_info().rss, info.num_threads()
+
+
+def settle(process, seconds=2.0):
+    """Memory and threads once the server stops growing"""
+    usage = server_usage(process)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.5)
+        usage = server_usage(process)
+    return usage
+
+
+class ChatClient:
+    """One Socket.IO connection that can send a list and wait for its reply"""
+
+    def __init__(self, url, transport):
+        self.client = socketio.Client(reconnection=False)
+        self.reply = threading.Event()
+        self.client.on('chat_response', self.on_response)
+        self.client.connect(url, transports=[transport], wait_timeout=30)
+
+    def on_response(self, data):
+        if not data.get('partial'):
+            self.reply.set()
+
+    def send(self, message, timeout=30):
+        self.reply.clear()
+        self.client.emit('chat_message', {'message': message})
+        return self.reply.wait(timeout)
+
+
+def run_mode(mode, args, llm_url, transport):
+    process, url, actual = start_server(mode, llm_url)
+    if actual != mode:
+        process.kill()
+        print(f"⏭️ {mode}: server fell back to {actual}, skipping")
+        return None
+    clients = []
+    try:
+        base_rss, base_threads = settle(process)
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            for client in pool.map(lambda _: ChatClient(url, transport), range(args.connections)):
+                clients.append(client)
+        rss, threads = settle(process, args.settle)
+
+        timings = LatencyStats(max_samples=100000)
+        stop_at = time.monotonic() + args.seconds
+
+        def chat(client, n):
+            while time.monotonic() < stop_at:
+                start = time.monotonic()
+                ok = client.send(MESSAGES[n % len(MESSAGES)])
+                timings.record('message', time.monotonic() - start, ok=ok)
+                n += 1
+
+        workers = [threading.Thread(target=chat, args=(client, n))
+                   for n, client in enumerate(clients[:args.active])]
+        start = time.monotonic()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.monotonic() - start
+        busy_rss, busy_threads = server_usage(process)
+    finally:
+        # A websocket client takes a few seconds to close, so close them side by side
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            list(pool.map(lambda client: client.client.disconnect(), clients))
+        process.terminate()
+        process.wait(10)
+
+    message = timings.summary().get('message', {'count': 0, 'errors': 0})
+    return {
+        'mode': mode,
+        'idle_kb': (rss - base_rss) / 1024 / max(len(clients), 1),
+        'rss_mb': (base_rss / 2 ** 20, rss / 2 ** 20, busy_rss / 2 ** 20),
+        'threads': (base_threads, threads, busy_threads),
+        'rate': message['count'] / elapsed,
+        'message': message,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test Socket.IO connections per server async mode")
+    parser.add_argument('--modes', default='threading,eventlet,gevent')
+    parser.add_argument('--connections', type=int, default=300, help="Idle connections to open")
+    parser.add_argument('--active', type=int, default=30, help="Connections sending messages")
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--settle', type=float, default=3, help="Seconds to let memory settle after connecting")
+    parser.add_argument('--latency', default='fixed:0.05', help="Fake LLM latency for lines the local parser skips")
+    args = parser.parse_args()
+    args.active = min(args.active, args.connections)
+
+    transport = 'websocket' if importlib.util.find_spec('websocket') else 'polling'
+    llm = FakeOpenAIServer(latency=args.latency).start()
+    print(f"🏁 {args.connections} idle connections ({transport}), {args.active} sending for {args.seconds:.0f}s")
+
+    results = []
+    for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+        package = MODE_PACKAGES.get(mode, mode)
+        if package and not importlib.util.find_spec(package):
+            print(f"⏭️ {mode}: {package} is not installed, skipping")
+            continue
+        print(f"⏱️ {mode}...")
+        result = run_mode(mode, args, llm.base_url, transport)
+        if result:
+            results.append(result)
+    llm.stop()
+
+    for result in results:
+        message = result['message']
+        base, idle, busy = result['rss_mb']
+        print(f"\n📊 {result['mode']}")
+        print(f"   Memory: {base:.1f} MB -> {idle:.1f} MB idle -> {busy:.1f} MB busy "
+              f"({result['idle_kb']:.0f} KB per idle connection)")
+        print(f"   OS threads: {result['threads'][0]} -> {result['threads'][1]} idle -> {result['threads'][2]} busy")
+        print(f"   Throughput: {result['rate']:.1f} messages/s, {message['errors']} of {message['count']} timed out")
+        print(f"   Round trip: p50 {message.get('p50')}s  p95 {message.get('p95')}s  p99 {message.get('p99')}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
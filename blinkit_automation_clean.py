@@ -5,13 +5,149 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
+import os
 import time
 import logging
+from urllib.parse import quote_plus
+
+from latency_stats import LatencyStats
+
+from selector_race import race_selectors, selector_kind, ensure_script_timeout
+from selector_registry import selector_registry
+from page_waits import (
+    install_page_instrumentation, wait_until, wait_for_page_ready, wait_for_url_change,
+    wait_for_url_contains, wait_for_cart_increment, wait_for_search_change,
+    wait_for_network_idle, wait_for_dom_quiet, get_cart_count, wait_stats
+)
+
+BLINKIT_HOME_URL = "https://blinkit.com"
+BLINKIT_SEARCH_URL = BLINKIT_HOME_URL + "/s/?q={query}"
+
+# "url" opens the search results page directly; "click" drives the homepage search bar like a user
+SEARCH_MODES = ('url', 'click')
+
+# Per-mode search latency, shared by all instances so both paths can be compared
+search_timings = LatencyStats()
+
+# Exact CSS selector for Blinkit's "ADD" button on search results
+ADD_BUTTON_SELECTOR = "div.tw-rounded-md.tw-font-okra.tw-flex.tw-justify-center.tw-font-semibold.tw-items-center.tw-relative.tw-text-300.tw-py-2.tw-px-0.tw-gap-0\\.5.tw-min-w-\\[66px\\].tw-bg-green-050.tw-border.tw-border-base-green.tw-text-base-green"
+
+# Elements that indicate the user is logged in
+LOGGED_IN_INDICATORS = [
+    "//div[contains(@class, 'profile') or contains(@class, 'Profile')]",
+    "//div[contains(@class, 'user') or contains(@class, 'User')]",
+    "//div[contains(@class, 'account') or contains(@class, 'Account')]",
+    "//img[contains(@alt, 'profile') or contains(@alt, 'Profile')]",
+    "//div[contains(@data-testid, 'profile') or contains(@data-testid, 'user')]",
+    "//span[contains(text(), 'Hi') or contains(text(), 'Hello')]",
+    "//div[contains(text(), 'Hi') or contains(text(), 'Hello')]"
+]
+
+# Login/signup buttons - visible only when the user is NOT logged in
+LOGIN_BUTTON_INDICATORS = [
+    "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]",
+    "//a[contains(text(), 'Login') or contains(text(), 'Sign In')]",
+    "//div[contains(text(), 'Login') or contains(text(), 'Sign In')]"
+]
+
+# Cookie name fragments (lowercase) that mean a session exists: only Blinkit's auth token (gr_1_accessToken).
+# Anonymous visitors get session/device cookies too, so those prove nothing.
+SESSION_COOKIE_HINTS = ('accesstoken',)
+
+LOGGED_IN = 'logged_in'
+LOGGED_OUT = 'logged_out'
+LOGIN_UNKNOWN = 'unknown'
+
+# arguments: loggedInXpaths, loginButtonXpaths, cookieHints
+LOGIN_PROBE_JS = """
+function firstVisible(xpaths) {
+    for (var i = 0; i < xpaths.length; i++) {
+        var el = document.evaluate(xpaths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (el && el.getClientRects().length > 0) { return i; }
+    }
+    return -1;
+}
+var hints = arguments[2];
+var sessionCookie = null;
+document.cookie.split(';').forEach(function (pair) {
+    var name = pair.split('=')[0].trim();
+    if (!sessionCookie && hints.some(function (hint) { return name.toLowerCase().indexOf(hint) !== -1; })) {
+        sessionCookie = name;
+    }
+});
+return {
+    logged_in_index: firstVisible(arguments[0]),
+    login_button_index: firstVisible(arguments[1]),
+    session_cookie: sessionCookie
+};
+"""
+
+# arguments: loggedInXpaths, loginButtonXpaths, cookieHints, timeoutMs, callback
+# Same precedence as probe_login_state: logged-in indicator, then Login button, then the auth cookie
+WAIT_FOR_LOGIN_JS = """
+var loggedInXpaths = arguments[0], loginButtonXpaths = arguments[1], hints = arguments[2], timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var finished = false, observer = null, timer = null, interval = null;
+function anyVisible(xpaths) {
+    for (var i = 0; i < xpaths.length; i++) {
+        var el = document.evaluate(xpaths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (el && el.getClientRects().length > 0) { return true; }
+    }
+    return false;
+}
+function loggedIn() {
+    if (anyVisible(loggedInXpaths)) { return true; }
+    // A showing Login button outweighs any cookie
+    if (anyVisible(loginButtonXpaths)) { return false; }
+    return document.cookie.split(';').some(function (pair) {
+        var name = pair.split('=')[0].trim().toLowerCase();
+        return hints.some(function (hint) { return name.indexOf(hint) !== -1; });
+    });
+}
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    clearInterval(interval);
+    done(result);
+}
+if (loggedIn()) {
+    finish(true);
+} else {
+    observer = new MutationObserver(function () { if (loggedIn()) { finish(true); } });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+    // Cookies change without DOM mutations
+    interval = setInterval(function () { if (loggedIn()) { finish(true); } }, 500);
+    timer = setTimeout(function () { finish(false); }, timeoutMs);
+}
+"""
+
+
+def has_session_cookie_name(name):
+    name = name.lower()
+    return any(hint in name for hint in SESSION_COOKIE_HINTS)
+
+# Add button candidates. Only the exact Tailwind class list: looser matches (any green-bordered
+# div, any div reading "ADD") also hit carousels and upsells outside the search results, and the
+# registry would then promote those wrong hits
+ADD_BUTTON_SELECTORS = [
+    ADD_BUTTON_SELECTOR,
+]
 
 class BlinkitAutomation:
-    def __init__(self):
+    def __init__(self, profile_dir=None, search_mode=None, search_fallback=None):
         self.driver = None
         self.wait = None
+        # Absolute path so the --user-data-dir match in the process checks is exact
+        self.profile_dir = os.path.abspath(profile_dir or os.path.join(os.getcwd(), "chrome-profile"))
+        self.search_mode = (search_mode or os.getenv('BLINKIT_SEARCH_MODE', 'url')).lower()
+        if self.search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{self.search_mode}', expected one of {SEARCH_MODES}")
+        # When the direct URL search finds nothing clickable, retry through the search bar
+        if search_fallback is None:
+            search_fallback = os.getenv('BLINKIT_SEARCH_FALLBACK', 'true').lower() == 'true'
+        self.search_fallback = search_fallback
         self.setup_logging()
     
     def setup_logging(self):
@@ -67,11 +203,8 @@ class BlinkitAutomation:
             chrome_options = Options()
             
             # Use absolute path for profile directory to avoid any path issues
-            import os
-            # Get the absolute path to the current working directory and then to chrome-profile
-            current_dir = os.getcwd()
-            profile_path = os.path.join(current_dir, "chrome-profile")
-            profile_path = os.path.abspath(profile_path)
+            # (each browser pool slot gets its own profile directory)
+            profile_path = self.profile_dir
             
             # Ensure the profile directory exists
             if not os.path.exists(profile_path):
@@ -120,6 +253,7 @@ class BlinkitAutomation:
                 self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
                 self.driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
                 self.driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
+                self.install_page_hooks()
                 
                 # Verify profile is actually being used
                 self.logger.info("🔍 Verifying profile usage...")
@@ -149,6 +283,7 @@ class BlinkitAutomation:
                         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
                         self.driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
                         self.driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
+                        self.install_page_hooks()
                         
                         self.logger.info("✅ Chrome driver started successfully after profile repair!")
                         return True
@@ -167,6 +302,7 @@ class BlinkitAutomation:
                     
                     self.driver = webdriver.Chrome(options=fallback_options)
                     self.wait = WebDriverWait(self.driver, 20)
+                    self.install_page_hooks()
                     
                     self.logger.warning("⚠️ Chrome driver started without persistent profile")
                     self.logger.warning("⚠️ You'll need to log in manually each time")
@@ -184,6 +320,7 @@ class BlinkitAutomation:
                             time.sleep(3)  # Wait a bit more
                             self.driver = webdriver.Chrome(options=fallback_options)
                             self.wait = WebDriverWait(self.driver, 20)
+                            self.install_page_hooks()
                             self.logger.info("✅ Chrome driver started after killing processes")
                             return True
                         except Exception as final_error:
@@ -195,6 +332,14 @@ class BlinkitAutomation:
             self.logger.error(f"❌ Failed to setup Chrome driver: {e}")
             return False
     
+    def install_page_hooks(self):
+        """Install the network/DOM hooks the event-driven waits in page_waits rely on"""
+        try:
+            install_page_instrumentation(self.driver)
+            self.logger.info("🪝 Page wait hooks installed")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not install page wait hooks (waits will install them lazily): {e}")
+    
     def check_chrome_status(self):
         """Check if Chrome is running and handle potential conflicts"""
         import psutil
@@ -215,7 +360,7 @@ class BlinkitAutomation:
                 self.logger.info("💡 This is normal and shouldn't cause issues")
             
             # Check if profile directory exists and is accessible
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             if os.path.exists(profile_dir):
                 try:
                     # Test if we can write to the profile directory
@@ -236,6 +381,11 @@ class BlinkitAutomation:
             self.logger.warning(f"⚠️ Could not check Chrome status: {e}")
             return True  # Continue anyway
     
+    def is_own_automation_process(self, cmdline):
+        """Check if a Chrome command line belongs to this instance's profile (other pool slots are left alone)"""
+        profile_arg = f"--user-data-dir={self.profile_dir}"
+        return any(str(arg).rstrip('\\/') == profile_arg for arg in (cmdline or []))
+
     def force_kill_chrome(self):
         """Force kill only automation-related Chrome processes, preserve user's personal Chrome tabs"""
         import psutil
@@ -249,7 +399,7 @@ class BlinkitAutomation:
                     if 'chrome' in proc.info['name'].lower():
                         # Check if this is an automation-related Chrome process
                         cmdline = proc.info.get('cmdline', [])
-                        is_automation = any('--user-data-dir' in str(arg) for arg in cmdline)
+                        is_automation = self.is_own_automation_process(cmdline)
                         
                         if is_automation:
                             # This is our automation Chrome - kill it
@@ -292,7 +442,7 @@ class BlinkitAutomation:
             
             # Check if profile directory is locked
             import os
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             
             if os.path.exists(profile_dir):
                 try:
@@ -329,7 +479,7 @@ class BlinkitAutomation:
         try:
             import os
             
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             if not os.path.exists(profile_dir):
                 self.logger.warning("⚠️ Profile directory doesn't exist")
                 return False
@@ -370,7 +520,7 @@ class BlinkitAutomation:
             import os
             import shutil
             
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             
             if not os.path.exists(profile_dir):
                 self.logger.info("📁 Profile directory doesn't exist - nothing to repair")
@@ -422,7 +572,7 @@ class BlinkitAutomation:
                 try:
                     if 'chrome' in proc.info['name'].lower():
                         cmdline = proc.info.get('cmdline', [])
-                        if any('--user-data-dir' in str(arg) for arg in cmdline):
+                        if self.is_own_automation_process(cmdline):
                             automation_processes.append(proc.info)
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     pass
@@ -449,7 +599,7 @@ class BlinkitAutomation:
                 return False
             
             # Check if the profile directory is being used
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             
             if not os.path.exists(profile_dir):
                 self.logger.warning("⚠️ Profile directory doesn't exist yet")
@@ -500,7 +650,7 @@ class BlinkitAutomation:
         try:
             import os
             
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             
             # Create profile directory if it doesn't exist
             if not os.path.exists(profile_dir):
@@ -528,11 +678,11 @@ class BlinkitAutomation:
     def navigate_to_blinkit(self):
         """Navigate to Blinkit website and check login status (location handling removed)"""
         try:
-            self.driver.get("https://blinkit.com")
+            self.driver.get(BLINKIT_HOME_URL)
             self.logger.info("Navigated to Blinkit website")
             
             # Wait for page to load
-            time.sleep(5)
+            wait_for_page_ready(self.driver, timeout=15, replaces=5)
             
             # Check if user is already logged in
             if self.is_user_logged_in():
@@ -544,88 +694,142 @@ class BlinkitAutomation:
                 self.logger.info("📝 After login, the session will be saved for future runs")
                 self.logger.info("📝 Waiting for manual login to complete...")
                 
-                # Wait for user to manually log in
-                max_login_wait = 120  # 2 minutes for manual login
-                start_time = time.time()
-                
-                while time.time() - start_time < max_login_wait:
-                    if self.is_user_logged_in():
-                        self.logger.info("✅ Manual login successful! Session saved for future runs")
-                        break
-                    time.sleep(5)
+                # Wait for user to manually log in (2 minutes), reacting the moment the page shows it
+                if self.wait_for_login(timeout=120):
+                    self.logger.info("✅ Manual login successful! Session saved for future runs")
                 else:
                     self.logger.warning("⚠️ Login timeout - continuing anyway, but cart operations may fail")
             
             # Location detection removed - account is now remembered automatically
             self.logger.info("✅ Account is remembered - no need for location detection")
             
-            # Additional wait to ensure page is fully loaded
-            time.sleep(3)
+            # Let the homepage finish its initial API calls before the first search
+            wait_for_network_idle(self.driver, idle_ms=300, timeout=10, replaces=3)
             
             return True
         except Exception as e:
             self.logger.error(f"Failed to navigate to Blinkit: {e}")
             return False
     
+    def is_browser_alive(self):
+        """Cheap health check for a long-lived (pooled) browser session"""
+        if not self.driver:
+            return False
+        try:
+            # Any command that round-trips to the renderer fails fast on a crashed/closed window
+            return self.driver.execute_script("return document.readyState") is not None
+        except Exception as e:
+            self.logger.warning(f"⚠️ Browser health check failed: {e}")
+            return False
+    
+    def reset_to_home(self, timeout=15):
+        """Bring a reused browser back to the Blinkit homepage so the next order starts from a known state"""
+        try:
+            self.driver.get(BLINKIT_HOME_URL)
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            self.logger.info("🏠 Browser reset to Blinkit homepage")
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to reset browser to homepage: {e}")
+            return False
+    
+    def close(self):
+        """Quit the browser if it is running"""
+        if self.driver:
+            try:
+                self.driver.quit()
+                self.logger.info("Browser closed")
+            except Exception as e:
+                self.logger.warning(f"⚠️ Error while closing browser: {e}")
+            finally:
+                self.driver = None
+                self.wait = None
+    
+    def probe_login_state(self):
+        """
+        Tri-state login check in one execute_script: every DOM indicator plus readable cookies.
+        Only when the page is ambiguous does it spend a second round trip on get_cookies()
+        (which also sees HttpOnly session cookies). Returns LOGGED_IN, LOGGED_OUT or LOGIN_UNKNOWN.
+        """
+        probe = self.driver.execute_script(
+            LOGIN_PROBE_JS, LOGGED_IN_INDICATORS, LOGIN_BUTTON_INDICATORS, list(SESSION_COOKIE_HINTS)
+        ) or {}
+        
+        if probe.get('logged_in_index', -1) >= 0:
+            self.logger.info(f"✅ Login detected (found: {LOGGED_IN_INDICATORS[probe['logged_in_index']]})")
+            return LOGGED_IN
+        if probe.get('login_button_index', -1) >= 0:
+            self.logger.info("❌ Login button found - user NOT logged in")
+            return LOGGED_OUT
+        if probe.get('session_cookie'):
+            self.logger.info(f"✅ Login detected (session cookie: {probe['session_cookie']})")
+            return LOGGED_IN
+        
+        for cookie in self.driver.get_cookies():
+            if has_session_cookie_name(cookie.get('name', '')):
+                self.logger.info(f"✅ Login detected (session cookie: {cookie['name']})")
+                return LOGGED_IN
+        return LOGIN_UNKNOWN
+    
     def is_user_logged_in(self):
-        """Check if user is already logged in by looking for profile/user elements"""
+        """Check if user is already logged in (unknown counts as not logged in, for safety)"""
         try:
-            # Wait a moment for page to load
-            time.sleep(2)
-            
-            # Look for elements that indicate user is logged in
-            logged_in_indicators = [
-                "//div[contains(@class, 'profile') or contains(@class, 'Profile')]",
-                "//div[contains(@class, 'user') or contains(@class, 'User')]",
-                "//div[contains(@class, 'account') or contains(@class, 'Account')]",
-                "//img[contains(@alt, 'profile') or contains(@alt, 'Profile')]",
-                "//div[contains(@data-testid, 'profile') or contains(@data-testid, 'user')]",
-                "//span[contains(text(), 'Hi') or contains(text(), 'Hello')]",
-                "//div[contains(text(), 'Hi') or contains(text(), 'Hello')]"
-            ]
+            # Make sure the page has loaded before looking for indicators
+            wait_for_page_ready(self.driver, timeout=10, replaces=2)
             
-            for selector in logged_in_indicators:
-                try:
-                    element = WebDriverWait(self.driver, 3).until(
-                        EC.presence_of_element_located((By.XPATH, selector))
-                    )
-                    if element.is_displayed():
-                        self.logger.info(f"✅ Login detected (found: {selector})")
-                        return True
-                except:
-                    continue
-            
-            # Also check if login/signup buttons are NOT present (negative check)
-            login_indicators = [
-                "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]",
-                "//a[contains(text(), 'Login') or contains(text(), 'Sign In')]",
-                "//div[contains(text(), 'Login') or contains(text(), 'Sign In')]"
-            ]
-            
-            for selector in login_indicators:
-                try:
-                    element = self.driver.find_element(By.XPATH, selector)
-                    if element.is_displayed():
-                        self.logger.info(f"❌ Login button found - user NOT logged in")
-                        return False
-                except:
-                    continue
-            
-            # If we can't determine, assume not logged in for safety
-            self.logger.warning("⚠️ Could not determine login status, assuming not logged in")
-            return False
+            state = self.probe_login_state()
+            if state == LOGIN_UNKNOWN:
+                # If we can't determine, assume not logged in for safety
+                self.logger.warning("⚠️ Could not determine login status, assuming not logged in")
+            return state == LOGGED_IN
             
         except Exception as e:
             self.logger.error(f"Error checking login status: {e}")
             return False
     
+    def wait_for_login(self, timeout=120, chunk=30):
+        """
+        Event-driven wait for the logged-in transition (manual OTP login).
+        A MutationObserver in the page resolves as soon as a logged-in indicator shows up, or the auth cookie
+        does while no Login button is visible;
+        it runs in chunks so page reloads during the OTP flow just start a new chunk.
+        """
+        deadline = time.monotonic() + timeout
+        start = time.monotonic()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            window = min(chunk, remaining)
+            try:
+                ensure_script_timeout(self.driver, window + 5)
+                if self.driver.execute_async_script(
+                    WAIT_FOR_LOGIN_JS, LOGGED_IN_INDICATORS, LOGIN_BUTTON_INDICATORS, list(SESSION_COOKIE_HINTS),
+                    int(window * 1000)
+                ):
+                    wait_stats.record('login', time.monotonic() - start, True)
+                    return True
+                # HttpOnly session cookies are invisible to the page - check them between chunks
+                if self.probe_login_state() == LOGGED_IN:
+                    wait_stats.record('login', time.monotonic() - start, True)
+                    return True
+            except Exception as e:
+                # Navigation replaced the document mid-wait; re-arm on the new page
+                self.logger.info(f"🔄 Login wait interrupted ({e.__class__.__name__}), re-arming...")
+                wait_for_page_ready(self.driver, timeout=min(10, max(remaining, 0.1)))
+        
+        wait_stats.record('login', time.monotonic() - start, False)
+        return False
+    
     def clear_chrome_profile(self):
         """Clear the Chrome profile to force fresh login (useful if login issues occur)"""
         import shutil
         import os
         
         try:
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             if os.path.exists(profile_dir):
                 shutil.rmtree(profile_dir)
                 self.logger.info(f"✅ Successfully cleared Chrome profile: {profile_dir}")
@@ -643,7 +847,7 @@ class BlinkitAutomation:
         import os
         
         try:
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             if os.path.exists(profile_dir):
                 profile_size = sum(os.path.getsize(os.path.join(dirpath, filename))
                     for dirpath, dirnames, filenames in os.walk(profile_dir)
@@ -681,7 +885,7 @@ class BlinkitAutomation:
         import os
         
         try:
-            profile_dir = os.path.join(os.getcwd(), "chrome-profile")
+            profile_dir = self.profile_dir
             self.logger.info("🔍 Debugging Chrome profile issues...")
             
             # Check if profile directory exists
@@ -741,7 +945,48 @@ class BlinkitAutomation:
     
     def search_blinkit_item(self, query, timeout=20):
         """
-        Helper function to search for items on Blinkit using the correct approach:
+        Search for an item using the configured search mode.
+        "url" goes straight to the results page (falling back to the search bar flow if enabled);
+        "click" always uses the search bar flow. Latency per mode is recorded in search_timings.
+        """
+        start = time.monotonic()
+        mode = self.search_mode
+        if mode == 'url':
+            success = self.search_via_url(query, timeout=min(timeout, 10))
+            search_timings.record('url', time.monotonic() - start, success)
+            if success or not self.search_fallback:
+                return success
+            self.logger.warning("⚠️ Direct search URL found no results, falling back to the search bar...")
+            start = time.monotonic()
+            mode = 'click_fallback'
+        
+        success = self.search_via_click(query, timeout)
+        search_timings.record(mode, time.monotonic() - start, success)
+        return success
+    
+    def search_via_url(self, query, timeout=10):
+        """Fast path: open the search results URL for the query directly (one navigation, no clicks)"""
+        try:
+            search_url = BLINKIT_SEARCH_URL.format(query=quote_plus(query))
+            self.logger.info(f"🔍 Opening search results directly: {search_url}")
+            self.driver.get(search_url)
+            
+            # Results are ready once Add buttons have rendered
+            selector, buttons = self.find_add_buttons(self.driver, timeout=timeout)
+            if buttons:
+                self.logger.info(f"✅ Search results loaded for: {query} ({len(buttons)} Add buttons)")
+                return True
+            
+            self.logger.warning(f"⚠️ No results rendered at {search_url}")
+            return False
+            
+        except Exception as e:
+            self.logger.error(f"❌ Direct URL search failed: {e}")
+            return False
+    
+    def search_via_click(self, query, timeout=20):
+        """
+        Search for items on Blinkit the way a user does:
         1. Click fake search bar → 2. Navigate to search page → 3. Find real input → 4. Type and search
         """
         try:
@@ -757,41 +1002,28 @@ class BlinkitAutomation:
                 "//a[contains(@class, 'SearchBar') and contains(@class, 'Button')]"  # Combined
             ]
             
-            fake_search_clicked = False
-            for selector in fake_search_selectors:
-                try:
-                    fake_search_bar = WebDriverWait(self.driver, timeout).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    self.logger.info(f"✅ Found fake search bar with selector: {selector}")
-                    
-                    # Click the fake search bar to navigate to search page
-                    fake_search_bar.click()
-                    self.logger.info("✅ Successfully clicked fake search bar! Navigating to search page...")
-                    fake_search_clicked = True
-                    break
-                    
-                except Exception as e:
-                    self.logger.info(f"Selector failed: {e}")
-                    continue
+            # Race all candidates in one round trip - a stale first selector costs nothing extra
+            fake_search_bar, selector = self.race_step('fake_search_bar', fake_search_selectors, timeout=timeout)
+            if not fake_search_bar:
+                self.logger.error("❌ Could not find or click fake search bar!")
+                return False
+            self.logger.info(f"✅ Found fake search bar with selector: {selector}")
             
-            if not fake_search_clicked:
+            # Click the fake search bar to navigate to search page
+            if not self.click_element(fake_search_bar):
                 self.logger.error("❌ Could not find or click fake search bar!")
                 return False
+            self.logger.info("✅ Successfully clicked fake search bar! Navigating to search page...")
             
             # STEP 2: Wait for navigation to search page
             self.logger.info("🔍 STEP 2: Waiting for navigation to search page...")
-            time.sleep(2)  # OPTIMIZED: Reduced wait for page navigation
+            current_url = wait_for_url_contains(self.driver, '/s/', timeout=4, replaces=2)
             
             # Check if we're on the search page
-            current_url = self.driver.current_url
-            self.logger.info(f"Current URL after click: {current_url}")
-            
-            if '/s/' not in current_url:
-                self.logger.warning("⚠️ Not redirected to search page, waiting longer...")
-                time.sleep(2)  # OPTIMIZED: Reduced wait
-                current_url = self.driver.current_url
-                self.logger.info(f"Current URL after additional wait: {current_url}")
+            if current_url:
+                self.logger.info(f"Current URL after click: {current_url}")
+            else:
+                self.logger.warning(f"⚠️ Not redirected to search page (URL: {self.driver.current_url}), looking for input anyway...")
             
             # STEP 3: Find the real search input field on the search page
             self.logger.info("🔍 STEP 3: Looking for the real search input field...")
@@ -805,17 +1037,11 @@ class BlinkitAutomation:
                 "//input[@id='search']"  # By ID
             ]
             
-            search_input = None
-            for selector in real_input_selectors:
-                try:
-                    search_input = WebDriverWait(self.driver, timeout).until(
-                        EC.presence_of_element_located((By.XPATH, selector))
-                    )
-                    self.logger.info(f"✅ Found real search input with selector: {selector}")
-                    break
-                except Exception as e:
-                    self.logger.info(f"Input selector failed: {e}")
-                    continue
+            search_input, selector = self.race_step('search_input', real_input_selectors, timeout=timeout, condition='present')
+            if search_input:
+                self.logger.info(f"✅ Found real search input with selector: {selector}")
+            else:
+                self.logger.info("Input selectors failed")
             
             # STEP 4: If still no input found, try JavaScript approach
             if not search_input:
@@ -844,13 +1070,11 @@ class BlinkitAutomation:
             if search_input:
                 self.logger.info("🔍 STEP 5: Interacting with search input...")
                 
-                # Focus the input
+                # Focus the input (focus is synchronous, no settle time needed)
                 try:
                     search_input.click()
-                    time.sleep(1)
                 except:
                     self.driver.execute_script("arguments[0].focus();", search_input)
-                    time.sleep(1)
                 
                 # Clear any existing text
                 try:
@@ -858,13 +1082,14 @@ class BlinkitAutomation:
                 except:
                     self.driver.execute_script("arguments[0].value = '';", search_input)
                 
+                # What the page shows now, so the wait below can tell this search's results from the last ones
+                before = self.search_results_snapshot()
+                
                 # Type the query
                 try:
                     search_input.send_keys(query)
-                    time.sleep(1)
                 except:
                     self.driver.execute_script("arguments[0].value = arguments[1];", search_input, query)
-                    time.sleep(1)
                 
                 # Press Enter to search
                 try:
@@ -874,7 +1099,10 @@ class BlinkitAutomation:
                     self.driver.execute_script("arguments[0].dispatchEvent(new KeyboardEvent('keydown', {'key': 'Enter'}));", search_input)
                     self.logger.info("✅ JavaScript Enter key successful")
                 
-                time.sleep(2)  # OPTIMIZED: Reduced wait for search results
+                # Wait for this search's results (not the previous page's) to load and render
+                if not self.wait_for_search_results(query, before, replaces=2):
+                    self.logger.error(f"❌ Results never changed after searching for: {query}")
+                    return False
                 self.logger.info(f"✅ Successfully searched for: {query}")
                 return True
                 
@@ -886,6 +1114,70 @@ class BlinkitAutomation:
             self.logger.error(f"❌ Search failed: {e}")
             return False
     
+    def race_step(self, step, selectors, timeout=20, condition='clickable'):
+        """
+        Race a step's selectors with the ones that currently work ordered first, and record
+        the outcome in the selector registry. Returns (element, selector) or (None, None).
+        """
+        candidates = selector_registry.ordered(step, selectors)
+        start = time.monotonic()
+        element, index, matched = race_selectors(self.driver, candidates, timeout=timeout, condition=condition, with_matches=True)
+        selector_registry.record_race(step, candidates, index, matched, time.monotonic() - start)
+        return (element, candidates[index]) if element else (None, None)
+    
+    def find_add_buttons(self, driver, timeout=10):
+        """
+        Wait for search results to render Add buttons, trying the registry's preferred selector first.
+        Returns (selector, buttons) or (None, []).
+        """
+        candidates = selector_registry.ordered('add_button', ADD_BUTTON_SELECTORS)
+        
+        def any_buttons():
+            return self.current_add_buttons(driver, candidates)
+        
+        start = time.monotonic()
+        found = wait_until('add_buttons_rendered', any_buttons, timeout=timeout, replaces=2)
+        latency = time.monotonic() - start
+        if not found:
+            for selector in candidates:
+                selector_registry.record('add_button', selector, False)
+            return None, []
+        
+        winner, buttons = found
+        # Candidates ahead of the winner were checked and came up empty
+        for selector in candidates[:candidates.index(winner)]:
+            selector_registry.record('add_button', selector, False)
+        selector_registry.record('add_button', winner, True, latency)
+        return winner, buttons
+    
+    def current_add_buttons(self, driver, candidates=None):
+        """(selector, buttons) for the first Add button selector matching right now, or None - no waiting"""
+        for selector in candidates or selector_registry.ordered('add_button', ADD_BUTTON_SELECTORS):
+            by = By.XPATH if selector_kind(selector) == 'xpath' else By.CSS_SELECTOR
+            buttons = driver.find_elements(by, selector)
+            if buttons:
+                return selector, buttons
+        return None
+    
+    def search_results_snapshot(self):
+        """(URL, first Add button or None) before a new search is submitted"""
+        found = self.current_add_buttons(self.driver)
+        return self.driver.current_url, found[1][0] if found else None
+    
+    def click_element(self, element):
+        """Click an element, falling back to a JavaScript click if it is covered or detached"""
+        try:
+            element.click()
+            return True
+        except Exception as e:
+            self.logger.info(f"Native click failed ({e}), trying JavaScript click")
+            try:
+                self.driver.execute_script("arguments[0].click();", element)
+                return True
+            except Exception as js_e:
+                self.logger.error(f"❌ JavaScript click also failed: {js_e}")
+                return False
+    
     def search_and_add_item(self, item):
         """Search for an item using the correct Blinkit approach: click fake search bar → navigate to search page → find real input"""
         try:
@@ -894,7 +1186,7 @@ class BlinkitAutomation:
             
             # Wait for page to fully load
             self.logger.info("⏳ Waiting for page to fully load...")
-            time.sleep(2)  # OPTIMIZED: Further reduced wait time
+            wait_for_page_ready(self.driver, timeout=10, replaces=2)
             
             # Debug: Log current page state
             self.logger.info(f"📄 Current page title: {self.driver.title}")
@@ -910,10 +1202,7 @@ class BlinkitAutomation:
             
             self.logger.info("✅ Search completed successfully, now looking for products...")
             
-            # Wait for search results to load (REDUCED from 3s to 1s)
-            self.logger.info("⏳ Waiting for search results to load...")
-            time.sleep(1)
-            
+            # Search results are awaited by search_blinkit_item and add_first_item_to_cart
             # OPTIMIZED: Skip debugging for faster performance
             
             # Use the OPTIMIZED cart addition function
@@ -970,6 +1259,19 @@ class BlinkitAutomation:
         try:
             self.logger.info(f"🛒 Starting search for next item: {item['name']}")
             
+            # Direct URL mode doesn't need the search bar - every item is one navigation
+            if self.search_mode == 'url':
+                if not self.search_blinkit_item(item['name']):
+                    self.logger.error(f"❌ Search failed for {item['name']}")
+                    return False
+                cart_success = self.add_first_item_to_cart(self.driver, timeout=10)
+                if cart_success:
+                    self.logger.info(f"🎉 Successfully added {item['name']} to cart!")
+                else:
+                    self.logger.error(f"❌ Failed to add {item['name']} to cart")
+                return cart_success
+            
+            start = time.monotonic()
             # Find the search bar using the provided selector
             search_bar_selector = "//input[contains(@class, 'SearchBarContainer__Input')]"
             search_box = self.wait.until(
@@ -979,16 +1281,22 @@ class BlinkitAutomation:
             # Clear the search bar
             self.logger.info("🧹 Clearing search bar...")
             search_box.clear()
-            time.sleep(1)
+            
+            # The previous item's results are still on screen; remember them to wait for the new ones
+            before = self.search_results_snapshot()
             
             # Type the new item name
             self.logger.info(f"⌨️ Typing new item: {item['name']}")
             search_box.send_keys(item['name'])
-            time.sleep(1)
             
             # Press Enter to search
             search_box.send_keys(Keys.ENTER)
-            time.sleep(2)  # OPTIMIZED: Reduced wait for search results
+            changed = self.wait_for_search_results(item['name'], before, replaces=4)
+            search_timings.record('click_next', time.monotonic() - start, changed)
+            if not changed:
+                # Adding now would put the previous item's product in the cart again
+                self.logger.error(f"❌ Results never changed after searching for {item['name']}")
+                return False
             
             # Use the same cart addition logic as the main function
             self.logger.info("🛒 Adding item to cart...")
@@ -1005,15 +1313,22 @@ class BlinkitAutomation:
             self.logger.error(f"❌ Error in search_next_item process: {e}")
             return False
     
-    def place_order(self, grocery_items):
-        """Main function to place the complete order"""
+    def place_order(self, grocery_items, keep_browser=False):
+        """
+        Main function to place the complete order.
+        If a browser is already running (e.g. checked out from the BrowserPool) it is reused as-is,
+        and keep_browser=True leaves it open afterwards instead of quitting it.
+        """
         try:
-            if not self.setup_driver():
-                return False, "Failed to setup browser automation"
-            
-            # Navigate to Blinkit once for the first item
-            if not self.navigate_to_blinkit():
-                return False, "Failed to navigate to Blinkit"
+            if not self.driver:
+                if not self.setup_driver():
+                    return False, "Failed to setup browser automation"
+                
+                # Navigate to Blinkit once for the first item
+                if not self.navigate_to_blinkit():
+                    return False, "Failed to navigate to Blinkit"
+            else:
+                self.logger.info("♻️ Reusing warm browser session - skipping Chrome startup and login check")
             
             # Add each item to cart using search bar
             for i, item in enumerate(grocery_items):
@@ -1034,8 +1349,6 @@ class BlinkitAutomation:
                     else:
                         self.logger.error(f"❌ Failed to add {item['name']} to cart")
                         return False, f"Failed to add {item['name']} to cart"
-                
-                time.sleep(2)  # Wait between items
             
             # All items added, now navigate to cart for checkout
             self.logger.info("🛒 All items added! Now navigating to cart for checkout...")
@@ -1059,27 +1372,22 @@ class BlinkitAutomation:
                     "//div[contains(@class, 'CheckoutStrip__StripContainer')]//div[contains(text(), 'Proceed To Pay')]"
                 ]
                 
-                proceed_btn = None
-                for i, selector in enumerate(proceed_to_pay_selectors):
-                    try:
-                        self.logger.info(f"Trying 'Proceed To Pay' selector {i+1}: {selector}")
-                        proceed_btn = self.wait.until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                        self.logger.info(f"✅ Found 'Proceed To Pay' button with selector {i+1}")
-                        break
-                    except Exception as e:
-                        self.logger.info(f"'Proceed To Pay' selector {i+1} failed: {e}")
-                        continue
+                proceed_btn, selector = self.race_step('proceed_to_pay', proceed_to_pay_selectors, timeout=20)
+                if proceed_btn:
+                    self.logger.info(f"✅ Found 'Proceed To Pay' button with selector: {selector}")
                 
                 if not proceed_btn:
                     self.logger.error("❌ Could not find 'Proceed To Pay' button!")
                     return False, "Could not proceed to payment"
                 
                 # Click the "Proceed To Pay" button
+                checkout_url = self.driver.current_url
                 proceed_btn.click()
                 self.logger.info("✅ Successfully clicked 'Proceed To Pay' button - navigating to payment page")
-                time.sleep(5)  # Wait for payment page to load
+                
+                # Wait for the payment page to replace the checkout page and finish rendering
+                wait_for_url_change(self.driver, checkout_url, timeout=10, replaces=5)
+                wait_for_dom_quiet(self.driver, quiet_ms=300, timeout=5)
                 
                 # Verify we're on the payment page
                 try:
@@ -1090,20 +1398,10 @@ class BlinkitAutomation:
                         "//div[contains(text(), 'Cash on Delivery') or contains(text(), 'COD')]"
                     ]
                     
-                    payment_page_found = False
-                    for selector in payment_page_indicators:
-                        try:
-                            element = WebDriverWait(self.driver, 5).until(
-                                EC.presence_of_element_located((By.XPATH, selector))
-                            )
-                            if element.is_displayed():
-                                self.logger.info("✅ Successfully navigated to payment page")
-                                payment_page_found = True
-                                break
-                        except:
-                            continue
-                    
-                    if not payment_page_found:
+                    element, _ = race_selectors(self.driver, payment_page_indicators, timeout=5, condition='visible')
+                    if element:
+                        self.logger.info("✅ Successfully navigated to payment page")
+                    else:
                         self.logger.warning("⚠️ May not be on payment page, but continuing...")
                     
                 except Exception as e:
@@ -1124,18 +1422,9 @@ class BlinkitAutomation:
                     "//div[contains(@class, 'Zpayments__PayNowButtonContainer')]//div[contains(@class, 'Zpayments__Button')]"
                 ]
                 
-                pay_now_btn = None
-                for i, selector in enumerate(pay_now_selectors):
-                    try:
-                        self.logger.info(f"Trying 'Pay Now' selector {i+1}: {selector}")
-                        pay_now_btn = self.wait.until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                        self.logger.info(f"✅ Found 'Pay Now' button with selector {i+1}")
-                        break
-                    except Exception as e:
-                        self.logger.info(f"'Pay Now' selector {i+1} failed: {e}")
-                        continue
+                pay_now_btn, selector = self.race_step('pay_now', pay_now_selectors, timeout=20)
+                if pay_now_btn:
+                    self.logger.info(f"✅ Found 'Pay Now' button with selector: {selector}")
                 
                 if not pay_now_btn:
                     self.logger.error("❌ Could not find 'Pay Now' button!")
@@ -1145,19 +1434,13 @@ class BlinkitAutomation:
                 pay_now_btn.click()
                 self.logger.info("✅ Successfully clicked 'Pay Now' button - executing order!")
                 
-                # Wait for payment processing with timeout
-                start_time = time.time()
-                timeout = 30  # 30 seconds timeout
-                
-                while time.time() - start_time < timeout:
-                    time.sleep(2)
-                    # Check if we've moved away from payment page
-                    try:
-                        current_url = self.driver.current_url
-                        if 'payment' not in current_url.lower() and 'checkout' not in current_url.lower():
-                            break
-                    except:
-                        pass
+                # Wait for payment processing (until we've moved away from the payment page) with timeout
+                wait_until(
+                    'payment_processed',
+                    lambda: 'payment' not in self.driver.current_url.lower() and 'checkout' not in self.driver.current_url.lower(),
+                    timeout=30,
+                    poll=0.25
+                )
                 
                 self.logger.info("⏳ Payment processing completed, checking order status...")
                 
@@ -1173,18 +1456,11 @@ class BlinkitAutomation:
                     "//div[contains(text(), 'Insufficient') or contains(text(), 'insufficient')]"
                 ]
                 
-                order_cancelled = False
-                for selector in cancellation_indicators:
-                    try:
-                        element = WebDriverWait(self.driver, 3).until(
-                            EC.presence_of_element_located((By.XPATH, selector))
-                        )
-                        if element.is_displayed():
-                            self.logger.warning("⚠️ Order appears to have been cancelled or failed")
-                            order_cancelled = True
-                            break
-                    except:
-                        continue
+                # One 3s race across all indicators instead of 3s per indicator
+                element, _ = race_selectors(self.driver, cancellation_indicators, timeout=3, condition='visible')
+                order_cancelled = element is not None
+                if order_cancelled:
+                    self.logger.warning("⚠️ Order appears to have been cancelled or failed")
                 
                 if order_cancelled:
                     return False, "Order was cancelled or payment failed - please try again"
@@ -1196,15 +1472,9 @@ class BlinkitAutomation:
                         "//div[contains(text(), 'items') and contains(text(), '₹')]"
                     ]
                     
-                    back_to_cart = False
-                    for selector in cart_indicators:
-                        try:
-                            element = self.driver.find_element(By.XPATH, selector)
-                            if element.is_displayed():
-                                back_to_cart = True
-                                break
-                        except:
-                            continue
+                    # Immediate check (timeout 0), like a find_element per indicator
+                    element, _ = race_selectors(self.driver, cart_indicators, timeout=0, condition='visible')
+                    back_to_cart = element is not None
                     
                     if back_to_cart:
                         self.logger.warning("⚠️ Back to cart page - order may not have been processed")
@@ -1223,18 +1493,10 @@ class BlinkitAutomation:
                         "//div[contains(@class, 'success') or contains(@class, 'Success')]"
                     ]
                     
-                    order_completed = False
-                    for selector in order_completion_indicators:
-                        try:
-                            element = WebDriverWait(self.driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, selector))
-                            )
-                            if element.is_displayed():
-                                self.logger.info("🎉 Order completed successfully!")
-                                order_completed = True
-                                break
-                        except:
-                            continue
+                    element, _ = race_selectors(self.driver, order_completion_indicators, timeout=10, condition='visible')
+                    order_completed = element is not None
+                    if order_completed:
+                        self.logger.info("🎉 Order completed successfully!")
                     
                     if order_completed:
                         self.logger.info("✅ Order executed successfully with UPI payment!")
@@ -1250,15 +1512,8 @@ class BlinkitAutomation:
                                 "//div[contains(text(), 'Select Payment') or contains(text(), 'Choose Payment')]"
                             ]
                             
-                            still_on_payment = False
-                            for selector in payment_page_indicators:
-                                try:
-                                    element = self.driver.find_element(By.XPATH, selector)
-                                    if element.is_displayed():
-                                        still_on_payment = True
-                                        break
-                                except:
-                                    continue
+                            element, _ = race_selectors(self.driver, payment_page_indicators, timeout=0, condition='visible')
+                            still_on_payment = element is not None
                             
                             if still_on_payment:
                                 self.logger.warning("⚠️ Still on payment page - payment may not have been processed")
@@ -1282,9 +1537,11 @@ class BlinkitAutomation:
             return False, f"Order placement failed: {str(e)}"
         
         finally:
-            if self.driver:
-                self.driver.quit()
-                self.logger.info("Browser closed")
+            self.logger.info(f"⏱️ Wait timings so far (seconds): {wait_stats.summary()}")
+            self.logger.info(f"⏱️ Search timings by mode (seconds): {search_timings.summary()}")
+            selector_registry.save()
+            if not keep_browser:
+                self.close()
     
     def navigate_to_cart(self):
         """Navigate to the cart page after adding items"""
@@ -1300,18 +1557,9 @@ class BlinkitAutomation:
                 "//div[contains(text(), 'items')]/ancestor::div[contains(@class, 'CartButton__Button')]"
             ]
             
-            cart_btn = None
-            for i, selector in enumerate(cart_selectors):
-                try:
-                    self.logger.info(f"Trying cart selector {i+1}: {selector}")
-                    cart_btn = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    self.logger.info(f"✅ Found cart button with selector {i+1}")
-                    break
-                except Exception as e:
-                    self.logger.info(f"Cart selector {i+1} failed: {e}")
-                    continue
+            cart_btn, selector = self.race_step('cart_button', cart_selectors, timeout=20)
+            if cart_btn:
+                self.logger.info(f"✅ Found cart button with selector: {selector}")
             
             if not cart_btn:
                 self.logger.error("❌ Could not find cart button!")
@@ -1320,7 +1568,7 @@ class BlinkitAutomation:
             # Click the cart button
             cart_btn.click()
             self.logger.info("✅ Successfully clicked cart button - navigating to cart")
-            time.sleep(3)
+            wait_for_dom_quiet(self.driver, quiet_ms=300, timeout=5, replaces=3)
             
             # Verify we're on the cart page
             try:
@@ -1331,20 +1579,10 @@ class BlinkitAutomation:
                     "//div[contains(text(), 'items') and contains(text(), '₹')]"
                 ]
                 
-                cart_page_found = False
-                for selector in cart_page_indicators:
-                    try:
-                        element = WebDriverWait(self.driver, 5).until(
-                            EC.presence_of_element_located((By.XPATH, selector))
-                        )
-                        if element.is_displayed():
-                            self.logger.info("✅ Successfully navigated to cart page")
-                            cart_page_found = True
-                            break
-                    except:
-                        continue
-                
-                if not cart_page_found:
+                element, _ = race_selectors(self.driver, cart_page_indicators, timeout=5, condition='visible')
+                if element:
+                    self.logger.info("✅ Successfully navigated to cart page")
+                else:
                     self.logger.warning("⚠️ May not be on cart page, but continuing...")
                 
                 return True
@@ -1531,6 +1769,33 @@ class BlinkitAutomation:
             self.logger.error(f"Debug search results page failed: {e}")
             return False
 
+    def wait_for_search_results(self, query, before, replaces=None):
+        """
+        Wait for the results of this search, given the search_results_snapshot() taken before it was submitted.
+        Settling alone can pass before the search request has even fired, leaving the previous item's Add
+        buttons on screen - so first wait for a change tied to this search (URL now has the query, old first
+        result detached, or a first result where there was none), then for the request to settle and the
+        list to stop re-rendering. Returns False if the page never moved on.
+        """
+        old_url, old_first = before
+        changed = wait_for_search_change(
+            self.driver, old_url, old_first, query,
+            lambda: self.current_add_buttons(self.driver), timeout=10, replaces=replaces
+        )
+        if not changed:
+            return False
+        wait_for_network_idle(self.driver, idle_ms=300, timeout=10)
+        wait_for_dom_quiet(self.driver, quiet_ms=250, timeout=5)
+        return True
+    
+    def wait_for_cart_update(self, driver, cart_count_before, timeout=5):
+        """Wait for the cart badge to increment after clicking Add (DOM quiet if the badge can't be read)"""
+        new_count = wait_for_cart_increment(driver, cart_count_before, timeout=timeout, replaces=1)
+        if new_count is not None:
+            self.logger.info(f"🛒 Cart now shows {new_count} items")
+        else:
+            wait_for_dom_quiet(driver, quiet_ms=250, timeout=2)
+    
     def add_first_item_to_cart(self, driver, timeout=10):
         """
         Add the first product from Blinkit search results into the cart.
@@ -1539,9 +1804,12 @@ class BlinkitAutomation:
         try:
             self.logger.info("🛒 Starting add_first_item_to_cart function")
             
-            # Wait for search results to fully load (small buffer as suggested)
-            self.logger.info("⏳ Waiting for search results to load (2s buffer)...")
-            time.sleep(2)
+            # Wait until search results have rendered at least one Add button
+            self.logger.info("⏳ Waiting for Add buttons to appear in search results...")
+            add_button_selector, _ = self.find_add_buttons(driver, timeout=timeout)
+            if not add_button_selector:
+                self.logger.warning("⚠️ No Add buttons appeared yet, trying anyway...")
+                add_button_selector = ADD_BUTTON_SELECTOR
             
             # Check if this is a fruit (banana, apple, etc.) - click second product to avoid ads
             # We need to get the item name from the current context
@@ -1573,15 +1841,13 @@ class BlinkitAutomation:
                 self.logger.info(f"⚠️ Could not determine item type, using first product: {e}")
                 add_button_index = 0
             
-            # Step 1: Find the Add button using the exact CSS selector from Blinkit's HTML
-            self.logger.info(f"🔍 Looking for Add button #{add_button_index + 1} using exact CSS selector...")
-            
-            # The exact CSS selector based on the HTML you provided
-            add_button_selector = "div.tw-rounded-md.tw-font-okra.tw-flex.tw-justify-center.tw-font-semibold.tw-items-center.tw-relative.tw-text-300.tw-py-2.tw-px-0.tw-gap-0\\.5.tw-min-w-\\[66px\\].tw-bg-green-050.tw-border.tw-border-base-green.tw-text-base-green"
+            # Step 1: Find the Add button using the selector that matched the rendered results
+            self.logger.info(f"🔍 Looking for Add button #{add_button_index + 1} using selector: {add_button_selector}")
+            add_button_by = By.XPATH if selector_kind(add_button_selector) == 'xpath' else By.CSS_SELECTOR
             
             try:
                 # Find all Add buttons and select the appropriate one based on index
-                add_buttons = driver.find_elements(By.CSS_SELECTOR, add_button_selector)
+                add_buttons = driver.find_elements(add_button_by, add_button_selector)
                 
                 if len(add_buttons) > add_button_index:
                     add_button = add_buttons[add_button_index]
@@ -1603,12 +1869,12 @@ class BlinkitAutomation:
                 # Fallback: Try to find all matching elements and take the first one
                 self.logger.info("🔄 Trying fallback approach - finding all Add buttons...")
                 try:
-                    add_buttons = driver.find_elements(By.CSS_SELECTOR, add_button_selector)
+                    add_buttons = driver.find_elements(add_button_by, add_button_selector)
                     if add_buttons:
                         add_button = add_buttons[0]  # Take the first one
                         self.logger.info(f"✅ Found {len(add_buttons)} Add buttons, using first one")
                     else:
-                        self.logger.error("❌ No Add buttons found with CSS selector")
+                        self.logger.error("❌ No Add buttons found with any Add button selector")
                         return False
                         
                 except Exception as fallback_e:
@@ -1617,13 +1883,14 @@ class BlinkitAutomation:
             
             # Step 2: Click the Add button immediately
             self.logger.info("🖱️ Clicking Add button...")
+            cart_count_before = get_cart_count(driver)
             try:
                 # Click the button directly
                 add_button.click()
                 self.logger.info("✅ Successfully clicked Add button")
                 
-                # Wait a moment for cart update
-                time.sleep(1)
+                # Wait for the cart badge to pick up the new item
+                self.wait_for_cart_update(driver, cart_count_before)
                 
                 self.logger.info("🎉 Added first item to cart")
                 return True
@@ -1635,7 +1902,7 @@ class BlinkitAutomation:
                 try:
                     driver.execute_script("arguments[0].click();", add_button)
                     self.logger.info("✅ Successfully clicked Add button using JavaScript")
-                    time.sleep(1)
+                    self.wait_for_cart_update(driver, cart_count_before)
                     self.logger.info("🎉 Added first item to cart (JavaScript fallback)")
                     return True
                 except Exception as js_e:
@@ -0,0 +1,227 @@
+"""
+Warm Chrome session pool for BlinkitAutomation.
+
+Launching Chrome, checking the profile and waiting for the Blinkit homepage costs
+several seconds per order. The pool keeps already-launched, logged-in browsers
+around so an order can check one out, run, and hand it back.
+
+Every slot owns its own profile directory (Chrome locks a user-data-dir to a single
+process). Slot 0 uses the main `chrome-profile`; extra slots are seeded from it so
+they start with the same saved login.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from blinkit_automation_clean import BlinkitAutomation
+
+# Chrome lock files that must not be copied when seeding a slot profile
+PROFILE_LOCK_FILES = ('LOCK', 'LOCK.old', 'lockfile', 'SingletonLock', 'SingletonCookie', 'SingletonSocket')
+
+
+class BrowserPoolError(Exception):
+    """Raised when the pool cannot provide a browser session"""
+
+
+class PooledBrowser:
+    """A warm BlinkitAutomation instance plus its pool bookkeeping"""
+
+    def __init__(self, slot, automation):
+        self.slot = slot
+        self.automation = automation
+        self.uses = 0
+        self.created_at = time.time()
+        self.last_used_at = None
+
+
+class BrowserPool:
+    def __init__(self, size=1, max_uses=20, base_profile_dir=None, factory=None, acquire_timeout=300):
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1")
+
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.base_profile_dir = os.path.abspath(base_profile_dir or os.path.join(os.getcwd(), "chrome-profile"))
+        # factory(profile_dir) -> object with the BlinkitAutomation session API
+        self.factory = factory or (lambda profile_dir: BlinkitAutomation(profile_dir=profile_dir))
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._free_slots = list(range(size))
+        self._closed = False
+        self._stats = {
+            'launched': 0,
+            'launch_failures': 0,
+            'checkouts': 0,
+            'warm_checkouts': 0,
+            'retired_max_uses': 0,
+            'retired_unhealthy': 0,
+        }
+
+    def profile_dir_for_slot(self, slot):
+        """Slot 0 uses the main profile; other slots get a copy seeded from it"""
+        if slot == 0:
+            return self.base_profile_dir
+
+        profile_dir = f"{self.base_profile_dir}-pool-{slot}"
+        if not os.path.exists(profile_dir) and os.path.exists(self.base_profile_dir):
+            try:
+                shutil.copytree(
+                    self.base_profile_dir,
+                    profile_dir,
+                    ignore=shutil.ignore_patterns(*PROFILE_LOCK_FILES),
+                )
+                self.logger.info(f"📁 Seeded pool profile for slot {slot}: {profile_dir}")
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not seed pool profile for slot {slot}: {e}")
+        return profile_dir
+
+    def _launch(self, slot):
+        """Start Chrome for a slot and bring it to the logged-in homepage"""
+        automation = self.factory(self.profile_dir_for_slot(slot))
+        try:
+            if not automation.setup_driver():
+                raise BrowserPoolError(f"Failed to setup browser for pool slot {slot}")
+            if not automation.navigate_to_blinkit():
+                raise BrowserPoolError(f"Failed to navigate to Blinkit for pool slot {slot}")
+        except Exception:
+            automation.close()
+            with self._cond:
+                self._stats['launch_failures'] += 1
+            raise
+
+        with self._cond:
+            self._stats['launched'] += 1
+        self.logger.info(f"🔥 Warm browser ready in pool slot {slot}")
+        return PooledBrowser(slot, automation)
+
+    def _retire(self, browser, reason):
+        """Quit a browser and give its slot back"""
+        self.logger.info(f"♻️ Retiring browser in slot {browser.slot} ({reason}) after {browser.uses} uses")
+        browser.automation.close()
+        with self._cond:
+            self._stats[f'retired_{reason}'] += 1
+            self._free_slots.append(browser.slot)
+            self._cond.notify()
+
+    def warm(self):
+        """Launch browsers for every free slot (call from a background thread at startup)"""
+        while True:
+            with self._cond:
+                if self._closed or not self._free_slots:
+                    return
+                slot = self._free_slots.pop(0)
+            try:
+                browser = self._launch(slot)
+            except Exception as e:
+                self.logger.error(f"❌ Could not warm pool slot {slot}: {e}")
+                with self._cond:
+                    self._free_slots.append(slot)
+                    self._cond.notify()
+                return
+            with self._cond:
+                self._idle.append(browser)
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Check out a healthy browser, launching one if a slot is free"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        while True:
+            browser = None
+            slot = None
+            with self._cond:
+                while not self._idle and not self._free_slots:
+                    if self._closed:
+                        raise BrowserPoolError("Browser pool is shut down")
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise BrowserPoolError(f"No browser available after {timeout}s")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise BrowserPoolError("Browser pool is shut down")
+                if self._idle:
+                    browser = self._idle.pop()
+                else:
+                    slot = self._free_slots.pop(0)
+
+            if browser is None:
+                try:
+                    browser = self._launch(slot)
+                except Exception:
+                    with self._cond:
+                        self._free_slots.append(slot)
+                        self._cond.notify()
+                    raise
+            elif not browser.automation.is_browser_alive():
+                self._retire(browser, 'unhealthy')
+                continue
+            else:
+                with self._cond:
+                    self._stats['warm_checkouts'] += 1
+
+            with self._cond:
+                self._stats['checkouts'] += 1
+            browser.last_used_at = time.time()
+            return browser
+
+    def release(self, browser, healthy=True):
+        """Return a browser; it is reset to the homepage or retired if worn out or broken"""
+        browser.uses += 1
+
+        if self._closed:
+            browser.automation.close()
+            return
+        if not healthy or not browser.automation.is_browser_alive():
+            self._retire(browser, 'unhealthy')
+            return
+        if browser.uses >= self.max_uses:
+            self._retire(browser, 'max_uses')
+            return
+        if not browser.automation.reset_to_home():
+            self._retire(browser, 'unhealthy')
+            return
+
+        with self._cond:
+            self._idle.append(browser)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Context manager yielding a warm BlinkitAutomation instance"""
+        browser = self.acquire(timeout)
+        healthy = True
+        try:
+            yield browser.automation
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.release(browser, healthy=healthy)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self.size,
+                'max_uses': self.max_uses,
+                'idle': len(self._idle),
+                'in_use': self.size - len(self._idle) - len(self._free_slots),
+            })
+            return stats
+
+    def shutdown(self):
+        """Quit all idle browsers; checked-out ones are retired when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for browser in idle:
+            browser.automation.close()
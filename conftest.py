@@ -0,0 +1,57 @@
+"""
+Isolated environment for the test suite.
+
+app.py and the parse cache read their settings at import, so these are set
+before any test module imports them: caches and the order store in memory,
+no browser warm-up, and no entity model or AI parse log on disk. Values from
+.env never apply (load_dotenv does not override variables already set), so a
+test run can't touch the developer's parse_examples.jsonl, entity_model.json
+or orders.sqlite3. Test files import this module too, so running one directly
+as a script is isolated as well.
+
+The parse_app fixture gives parse tests a clean app: fresh parse and line
+caches and parse timings, plus whatever AI stub and knobs the test passes.
+"""
+
+import os
+
+import pytest
+
+TEST_ENV = {
+    'PARSE_CACHE_PATH': '',
+    'BROWSER_POOL_WARM': 'false',
+    'ORDER_STORE_PATH': '',
+    'ENTITY_MODEL_PATH': '',
+    'PARSE_EXAMPLE_LOG': '',
+}
+
+os.environ.update(TEST_ENV)
+
+# parse_app knobs that send every line past the local parser, to the tier under test
+SKIP_LOCAL_PARSER = {'LOCAL_PARSE_THRESHOLD': 1.1}
+# Per-tier parse timings on app, reset for every parse test
+PARSE_STATS = ('parse_tier_timings', 'stream_timings', 'chunk_timings', 'hedge_timings')
+
+
+@pytest.fixture
+def parse_app(monkeypatch):
+    """
+    Empty parse caches and timings on app; returns configure(**attributes), which patches app's
+    AI stub and knobs for the test and returns the app module:
+        parse_app(request_ai_parse=fake_ai, LOCAL_PARSE_THRESHOLD=1.1)
+    """
+    # Imported here: the environment above has to be in place before app is imported
+    import app
+    from latency_stats import LatencyStats
+    from parse_cache import ParseCache
+
+    monkeypatch.setattr(app, 'parse_cache', ParseCache())
+    monkeypatch.setattr(app, 'line_cache', ParseCache(table='line_cache'))
+    for name in PARSE_STATS:
+        monkeypatch.setattr(app, name, LatencyStats())
+
+    def configure(**attributes):
+        for name, value in attributes.items():
+            monkeypatch.setattr(app, name, value)
+        return app
+    return configure
@@ -0,0 +1,570 @@
+"""
+On-box grocery entity extractor trained from the AI's own parses.
+
+Every line the AI parses successfully is a labelled example (line -> items with
+name / quantity / unit / category). ParseExampleLog appends those pairs to a
+JSONL file as they happen; EntityExtractor learns from them offline and then
+parses new lines in-process, so most traffic no longer needs the LLM.
+
+The model is a small sequence labeller:
+
+  * a line is split into item segments on commas, "and", "aur", "&", "+"
+  * every token of a segment is tagged Q (quantity), U (unit), N (name) or O
+    (filler) by a greedy averaged perceptron over word, suffix, shape,
+    neighbouring words and the previous tags
+  * training tags come from aligning each segment with its AI item: the number
+    equal to the quantity is Q, the unit word is U, words of the name are N.
+    When the AI translated the name ("doodh" -> "milk", "aadha kilo pyaaz" ->
+    0.5 kg "onions") the leftover words are the name and the first of several
+    leftovers is the quantity word
+  * lexicons learned alongside map name spans and words to the AI's names,
+    quantity words to numbers, unit words to the AI's units and names to
+    categories
+
+parse_line() returns (items, confidence). Confidence is the smallest tag margin
+in the line (1 - e^-margin), lowered when a name word looks Hindi but was never
+translated in training or the name holds sentence words ("i need ..."); callers
+send lines below their threshold to the AI. Parsing a line takes tens of
+microseconds.
+
+    python entity_extractor.py train --data parse_examples.jsonl --out entity_model.json
+    python entity_extractor.py evaluate --model entity_model.json --data benchmarks/corpus/llm_responses_v1.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from local_parser import (
+    BARE_NAME_CONFIDENCE, CATEGORIES, CHAT_WORDS, DEFAULT_CATEGORY, FILLER_WORDS, HINGLISH_NUMBERS, HINGLISH_WORDS,
+    NUMBER_WORDS, UNITS, guess_category
+)
+
+MODEL_VERSION = 1
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_EPOCHS = 8
+
+TAGS = ('Q', 'U', 'N', 'O')
+SEGMENT_SPLIT = re.compile(r',|;|&|\+|\band\b|\baur\b')
+TOKEN = re.compile(r"\d+(?:\.\d+)?|[a-z][a-z'-]*")
+UNIT_SET = frozenset(UNITS) | frozenset(('kilo', 'kilos'))
+
+# Spellings of the same unit; used to find the unit word when aligning training examples
+UNIT_ALIASES = {
+    'packets': 'packet', 'pack': 'packet', 'packs': 'packet', 'pkt': 'packet',
+    'liters': 'liter', 'litre': 'liter', 'litres': 'liter', 'l': 'liter', 'ltr': 'liter',
+    'kgs': 'kg', 'kilo': 'kg', 'kilos': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'gm': 'g', 'gms': 'g', 'gram': 'g', 'grams': 'g',
+    'piece': 'pieces', 'pcs': 'pieces', 'pc': 'pieces',
+    'bottle': 'bottles', 'dozens': 'dozen',
+}
+
+# Confidence cap for a name word that looks Hindi but has no learned translation
+UNTRANSLATED_CONFIDENCE = 0.5
+# Confidence cap for a line holding sentence words ("i need potatoes", "what is the price of milk")
+SENTENCE_CONFIDENCE = 0.4
+SENTENCE_WORDS = frozenset(FILLER_WORDS) | frozenset((
+    'a', 'an', 'the', 'that', 'this', 'maybe',
+    'what', 'is', 'are', 'how', 'much', 'price', 'cost', 'where', 'when', 'why', 'which', 'can', 'you', 'your',
+))
+
+
+def unit_key(unit):
+    unit = str(unit).lower().strip()
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def segments_of(line):
+    """Token lists of the item segments of one line"""
+    segments = [TOKEN.findall(part) for part in SEGMENT_SPLIT.split(line.lower())]
+    return [tokens for tokens in segments if tokens]
+
+
+def _number(token, quantity_words=None):
+    if token in NUMBER_WORDS:
+        return NUMBER_WORDS[token]
+    if quantity_words and token in quantity_words:
+        return quantity_words[token]
+    try:
+        value = float(token)
+    except ValueError:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _shape(token):
+    if token[0].isdigit():
+        return 'num'
+    if token in UNIT_SET:
+        return 'unit'
+    if token in NUMBER_WORDS or token in HINGLISH_NUMBERS:
+        return 'numword'
+    return 'word'
+
+
+def _features(tokens, i, prev_tag, prev2_tag):
+    word = tokens[i]
+    prev_word = tokens[i - 1] if i else '<s>'
+    next_word = tokens[i + 1] if i + 1 < len(tokens) else '</s>'
+    return (
+        'bias',
+        'w=' + word,
+        'suf=' + word[-3:],
+        'shape=' + _shape(word),
+        'pw=' + prev_word,
+        'nw=' + next_word,
+        'pshape=' + (_shape(prev_word) if i else '<s>'),
+        'nshape=' + (_shape(next_word) if i + 1 < len(tokens) else '</s>'),
+        'pt=' + prev_tag,
+        'pt2=' + prev_tag + prev2_tag,
+        'pt+w=' + prev_tag + word,
+        'first' if i == 0 else 'last' if i + 1 == len(tokens) else 'middle',
+    )
+
+
+def align(tokens, item):
+    """
+    Training tags for one segment from its AI item, plus any (kind, token, value) lexicon entries it teaches;
+    None when the item can't be lined up with the words
+    """
+    name_words = str(item.get('name', '')).lower().split()
+    try:
+        quantity = float(item.get('quantity', 1))
+    except (TypeError, ValueError):
+        return None
+    unit = unit_key(item.get('unit', ''))
+    if not name_words:
+        return None
+
+    tags = ['O'] * len(tokens)
+    for j, token in enumerate(tokens):
+        value = _number(token)
+        if value is not None and float(value) == quantity:
+            tags[j] = 'Q'
+            break
+    for j, token in enumerate(tokens):
+        if tags[j] == 'O' and token in UNIT_SET and unit_key(token) == unit and token not in name_words:
+            tags[j] = 'U'
+            break
+    for j, token in enumerate(tokens):
+        if tags[j] == 'O' and token in name_words:
+            tags[j] = 'N'
+
+    lessons = []
+    covered = set(token for token, tag in zip(tokens, tags) if tag == 'N')
+    if not covered.issuperset(name_words):
+        # The AI translated the name: the unexplained words are the name, led by a quantity word if it is missing
+        leftover = [j for j, tag in enumerate(tags) if tag == 'O' and tokens[j] not in FILLER_WORDS]
+        if 'Q' not in tags and len(leftover) >= 2:
+            tags[leftover[0]] = 'Q'
+            if _number(tokens[leftover[0]]) is None:
+                lessons.append(('quantity', tokens[leftover[0]], item.get('quantity', 1)))
+            leftover = leftover[1:]
+        for j in leftover:
+            tags[j] = 'N'
+        span = [token for token, tag in zip(tokens, tags) if tag == 'N']
+        if span:
+            lessons.append(('phrase', ' '.join(span), ' '.join(name_words)))
+            if len(span) == len(name_words):
+                lessons.extend(('word', word, name_word) for word, name_word in zip(span, name_words) if word != name_word)
+
+    if 'N' not in tags:
+        return None
+    return tags, lessons
+
+
+class AveragedPerceptron:
+    """Multiclass perceptron with weight averaging; weights are {feature: {tag: weight}}"""
+
+    def __init__(self, weights=None):
+        self.weights = weights or {}
+        self._totals = defaultdict(float)
+        self._stamps = defaultdict(int)
+        self._updates = 0
+
+    def scores(self, features):
+        scores = dict.fromkeys(TAGS, 0.0)
+        for feature in features:
+            weights = self.weights.get(feature)
+            if weights:
+                for tag, weight in weights.items():
+                    scores[tag] += weight
+        return scores
+
+    def update(self, truth, guess, features):
+        self._updates += 1
+        if truth == guess:
+            return
+        for feature in features:
+            weights = self.weights.setdefault(feature, {})
+            for tag, delta in ((truth, 1.0), (guess, -1.0)):
+                key = (feature, tag)
+                weight = weights.get(tag, 0.0)
+                self._totals[key] += (self._updates - self._stamps[key]) * weight
+                self._stamps[key] = self._updates
+                weights[tag] = weight + delta
+
+    def average(self):
+        for feature, weights in self.weights.items():
+            for tag, weight in list(weights.items()):
+                key = (feature, tag)
+                total = self._totals[key] + (self._updates - self._stamps[key]) * weight
+                averaged = round(total / self._updates, 3) if self._updates else 0.0
+                if averaged:
+                    weights[tag] = averaged
+                else:
+                    del weights[tag]
+        self.weights = {feature: weights for feature, weights in self.weights.items() if weights}
+
+
+class EntityExtractor:
+    def __init__(self, perceptron=None, lexicons=None, trained_on=0):
+        self.perceptron = perceptron or AveragedPerceptron()
+        lexicons = lexicons or {}
+        self.phrases = lexicons.get('phrases', {})
+        self.words = lexicons.get('words', {})
+        self.quantity_words = lexicons.get('quantity_words', {})
+        self.units = lexicons.get('units', {})
+        self.categories = lexicons.get('categories', {})
+        self.trained_on = trained_on
+
+    # Training
+
+    @classmethod
+    def train(cls, examples, epochs=DEFAULT_EPOCHS, seed=0):
+        """
+        Learn from (line, items) pairs; lines whose segments can't be matched to their items are skipped
+        """
+        sentences = []
+        counters = {kind: defaultdict(Counter) for kind in ('phrase', 'word', 'quantity', 'unit', 'category')}
+        for line, items in examples:
+            segments = segments_of(line)
+            if len(items) == 1 and len(segments) > 1:
+                # "salt and pepper" is one item
+                segments = [[token for segment in segments for token in segment]]
+            if not items or len(segments) != len(items):
+                continue
+            for tokens, item in zip(segments, items):
+                aligned = align(tokens, item)
+                if aligned is None:
+                    continue
+                tags, lessons = aligned
+                sentences.append((tokens, tags))
+                for kind, key, value in lessons:
+                    counters[kind][key][json.dumps(value)] += 1
+                for token, tag in zip(tokens, tags):
+                    if tag == 'U':
+                        counters['unit'][token][json.dumps(item.get('unit'))] += 1
+                counters['category'][str(item.get('name', '')).lower()][json.dumps(item.get('category', DEFAULT_CATEGORY))] += 1
+
+        perceptron = AveragedPerceptron()
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(sentences)
+            for tokens, tags in sentences:
+                prev, prev2 = '<s>', '<s>'
+                for i, truth in enumerate(tags):
+                    features = _features(tokens, i, prev, prev2)
+                    scores = perceptron.scores(features)
+                    guess = max(TAGS, key=lambda tag: scores[tag])
+                    perceptron.update(truth, guess, features)
+                    prev2, prev = prev, guess
+        perceptron.average()
+
+        def most_common(kind):
+            return {key: json.loads(counts.most_common(1)[0][0]) for key, counts in counters[kind].items()}
+
+        lexicons = {
+            'phrases': most_common('phrase'),
+            'words': most_common('word'),
+            'quantity_words': most_common('quantity'),
+            'units': most_common('unit'),
+            'categories': most_common('category'),
+        }
+        return cls(perceptron, lexicons, trained_on=len({line for line, _ in examples}))
+
+    # Inference
+
+    def tag(self, tokens):
+        """[(tag, margin)] for each token, greedily left to right"""
+        tagged = []
+        prev, prev2 = '<s>', '<s>'
+        for i in range(len(tokens)):
+            scores = self.perceptron.scores(_features(tokens, i, prev, prev2))
+            ranked = sorted(TAGS, key=lambda tag: scores[tag], reverse=True)
+            tagged.append((ranked[0], scores[ranked[0]] - scores[ranked[1]]))
+            prev2, prev = prev, ranked[0]
+        return tagged
+
+    def _item(self, tokens, tagged):
+        if CHAT_WORDS.intersection(tokens):
+            # Chat, not groceries - the same lines the local parser turns away
+            return None, 0.0
+        quantity = 1
+        unit = 'pieces'
+        span = []
+        confidence = 1.0
+        sentence = False
+        for i, (token, (tag, margin)) in enumerate(zip(tokens, tagged)):
+            confidence = min(confidence, 1 - math.exp(-margin))
+            # "2 kg of rice" is fine; any other sentence word anywhere in the line is not
+            if token in SENTENCE_WORDS and not (token == 'of' and i and tagged[i - 1][0] == 'U'):
+                sentence = True
+            if tag == 'Q':
+                value = _number(token, self.quantity_words)
+                if value is None:
+                    return None, 0.0
+                quantity = value
+            elif tag == 'U':
+                unit = self.units.get(token, token)
+            elif tag == 'N':
+                span.append(token)
+        if not span:
+            return None, 0.0
+
+        phrase = ' '.join(span)
+        if phrase in self.phrases:
+            name = self.phrases[phrase]
+        else:
+            name = ' '.join(self.words.get(word, word) for word in span)
+        if HINGLISH_WORDS.intersection(name.split()):
+            # "dudh", "2 kg chawal": the name still needs translating before a search
+            confidence = min(confidence, UNTRANSLATED_CONFIDENCE)
+        if sentence:
+            confidence = min(confidence, SENTENCE_CONFIDENCE)
+        if not any(tag in ('Q', 'U') for tag, _ in tagged):
+            # Capped like the local parser's bare names ("banana", "delete"): the line memo or the AI decides
+            confidence = min(confidence, BARE_NAME_CONFIDENCE)
+        category = self.categories.get(name)
+        if category not in CATEGORIES:
+            category = guess_category(name)
+        return {'name': name, 'quantity': quantity, 'unit': unit, 'category': category}, confidence
+
+    def parse_line(self, line):
+        """Parse one line into (items, confidence); items is empty when nothing was recognised"""
+        items = []
+        confidence = 1.0
+        for tokens in segments_of(line):
+            item, item_confidence = self._item(tokens, self.tag(tokens))
+            if item is None:
+                return [], 0.0
+            items.append(item)
+            confidence = min(confidence, item_confidence)
+        if not items:
+            return [], 0.0
+        return items, round(confidence, 4)
+
+    # Persistence
+
+    def to_dict(self):
+        return {
+            'version': MODEL_VERSION,
+            'trained_on': self.trained_on,
+            'weights': self.perceptron.weights,
+            'lexicons': {
+                'phrases': self.phrases,
+                'words': self.words,
+                'quantity_words': self.quantity_words,
+                'units': self.units,
+                'categories': self.categories,
+            },
+        }
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MODEL_VERSION:
+            raise ValueError(f"Unsupported entity model version: {data.get('version')}")
+        return cls(AveragedPerceptron(data['weights']), data['lexicons'], trained_on=data.get('trained_on', 0))
+
+    def stats(self):
+        return {
+            'trained_on': self.trained_on,
+            'features': len(self.perceptron.weights),
+            'phrases': len(self.phrases),
+            'quantity_words': len(self.quantity_words),
+        }
+
+
+def load_model(path):
+    """The model at path, or None when there is none yet or it can't be read"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return EntityExtractor.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logging.getLogger(__name__).warning(f"⚠️ Could not load entity model {path}: {e}")
+        return None
+
+
+class ParseExampleLog:
+    """Append-only JSONL log of (line, items) pairs the AI parsed; the entity extractor's training data"""
+
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats = {'recorded': 0, 'errors': 0}
+
+    def record(self, line, items):
+        if not self.path or not items:
+            return
+        entry = {
+            'line': line,
+            'items': [{key: value for key, value in item.items() if key != 'line'} for item in items],
+            'ts': round(time.time(), 3),
+        }
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                self._stats['recorded'] += 1
+        except OSError as e:
+            self._stats['errors'] += 1
+            self.logger.warning(f"⚠️ Could not log parse example: {e}")
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, path=self.path)
+
+
+def load_examples(paths):
+    """
+    (line, items) pairs from JSONL parse logs and/or recorded-answer files ({"lines": {line: items}});
+    repeated lines keep their latest answer
+    """
+    examples = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                for raw in f:
+                    raw = raw.strip()
+                    if not raw:
+                        continue
+                    try:
+                        entry = json.loads(raw)
+                    except json.JSONDecodeError:
+                        continue
+                    examples[entry['line'].strip()] = entry['items']
+            else:
+                for line, items in json.load(f)['lines'].items():
+                    examples[line.strip()] = items
+    return list(examples.items())
+
+
+def split_examples(examples, holdout, seed=0):
+    """(train, held out) split of examples by line"""
+    shuffled = sorted(examples)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(round(len(shuffled) * (1 - holdout)))
+    return shuffled[:cut], shuffled[cut:]
+
+
+def _item_key(item):
+    try:
+        quantity = round(float(item.get('quantity', 1)), 3)
+    except (TypeError, ValueError):
+        quantity = None
+    return str(item.get('name', '')).lower().strip(), quantity, unit_key(item.get('unit', ''))
+
+
+def evaluate(model, examples, thresholds=(DEFAULT_THRESHOLD,)):
+    """
+    Line-level accuracy of the model against recorded parses: a line is correct when its items match the
+    AI's on (name, quantity, unit). Per threshold, coverage is the share of lines the model would answer and
+    accuracy is measured on those lines only
+    """
+    results = []
+    seconds = []
+    for line, expected in examples:
+        start = time.perf_counter()
+        items, confidence = model.parse_line(line)
+        seconds.append(time.perf_counter() - start)
+        want = sorted(_item_key(item) for item in expected)
+        got = sorted(_item_key(item) for item in items)
+        fields = {
+            'name': [key[0] for key in want] == [key[0] for key in got],
+            'quantity': [key[1] for key in want] == [key[1] for key in got],
+            'unit': [key[2] for key in want] == [key[2] for key in got],
+        }
+        results.append((confidence, want == got, fields))
+
+    total = len(results)
+    seconds.sort()
+    report = {
+        'lines': total,
+        'accuracy': round(sum(correct for _, correct, _ in results) / total, 3) if total else None,
+        'fields': {field: round(sum(fields[field] for _, _, fields in results) / total, 3) if total else None
+                   for field in ('name', 'quantity', 'unit')},
+        'p50_us': round(seconds[len(seconds) // 2] * 1e6, 1) if seconds else None,
+        'max_us': round(seconds[-1] * 1e6, 1) if seconds else None,
+        'thresholds': {},
+    }
+    for threshold in thresholds:
+        answered = [correct for confidence, correct, _ in results if confidence >= threshold]
+        report['thresholds'][threshold] = {
+            'coverage': round(len(answered) / total, 3) if total else None,
+            'accuracy': round(sum(answered) / len(answered), 3) if answered else None,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"📏 {report['lines']} lines: accuracy {report['accuracy']}, "
+          f"fields {report['fields']}, p50 {report['p50_us']}µs, max {report['max_us']}µs")
+    for threshold, result in report['thresholds'].items():
+        print(f"   threshold {threshold}: answers {result['coverage']} of lines, accuracy {result['accuracy']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the on-box grocery entity extractor")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train = commands.add_parser('train', help="Train from parse logs / recordings and report held-out accuracy")
+    train.add_argument('--data', nargs='+', required=True, help="JSONL parse logs or recorded-answer JSON files")
+    train.add_argument('--out', default='entity_model.json')
+    train.add_argument('--holdout', type=float, default=0.2, help="Share of lines held out for evaluation")
+    train.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS)
+    train.add_argument('--seed', type=int, default=0)
+    train.add_argument('--final', action='store_true', help="After evaluating, retrain on every line before saving")
+    evaluate_parser = commands.add_parser('evaluate', help="Accuracy of a saved model on recorded parses")
+    evaluate_parser.add_argument('--model', default='entity_model.json')
+    evaluate_parser.add_argument('--data', nargs='+', required=True)
+    for command in (train, evaluate_parser):
+        command.add_argument('--thresholds', type=float, nargs='+', default=[0.5, DEFAULT_THRESHOLD, 0.9])
+    args = parser.parse_args()
+
+    if args.command == 'evaluate':
+        print_report(evaluate(EntityExtractor.load(args.model), load_examples(args.data), args.thresholds))
+        return 0
+
+    examples = load_examples(args.data)
+    train_set, held_out = split_examples(examples, args.holdout, args.seed)
+    start = time.monotonic()
+    model = EntityExtractor.train(train_set, epochs=args.epochs, seed=args.seed)
+    print(f"🧠 Trained on {len(train_set)} lines in {time.monotonic() - start:.2f}s ({model.stats()})")
+    if held_out:
+        print_report(evaluate(model, held_out, args.thresholds))
+    if args.final:
+        model = EntityExtractor.train(examples, epochs=args.epochs, seed=args.seed)
+        print(f"🧠 Retrained on all {len(examples)} lines")
+    model.save(args.out)
+    print(f"💾 Model saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions API.
+
+Lets parsing be benchmarked and load-tested offline, without paying for or
+waiting on the real API. Point the app at it with:
+
+    python fake_openai_server.py --port 8089 --latency lognormal:0.8:0.5 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake python app.py
+
+Answers POST /v1/chat/completions in the real wire format, streamed (SSE) or not:
+  * recorded  - if --recordings names a JSON file mapping user messages to
+                assistant replies, a matching message gets its recorded reply
+  * generated - otherwise each line of the user message is answered from
+                --line-recordings (recorded per-line items, so any chunking or
+                batching of a list replays the same answers) or, failing that, run
+                through the local tokenizer, and returned as the grocery JSON array
+                the parse prompt asks for (batched "### LIST n" messages get a JSON
+                object of arrays)
+
+Latency is drawn per request from a distribution (fixed:S, uniform:A:B,
+normal:MEAN:SD, lognormal:MEDIAN:SIGMA), plus --prefill-ms-per-1k for every
+thousand prompt tokens; errors are injected at the given rates
+(500, 429 with Retry-After, or a hang that outlasts client read timeouts).
+--seed makes a run repeatable. GET /stats returns request counts.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from local_parser import tokenize_items
+from parse_cache import normalize_message
+
+BATCH_HEADER = re.compile(r'^### LIST (\d+)\s*$', re.MULTILINE)
+
+
+def parse_latency(spec):
+    """Sampler rng -> seconds for a latency spec like 'fixed:0.5' or 'lognormal:0.8:0.4'"""
+    kind, _, args = (spec or 'fixed:0').partition(':')
+    try:
+        values = [float(value) for value in args.split(':') if value]
+        if kind == 'fixed':
+            seconds, = values
+            return lambda rng: seconds
+        if kind == 'uniform':
+            low, high = values
+            return lambda rng: rng.uniform(low, high)
+        if kind == 'normal':
+            mean, sd = values
+            return lambda rng: max(0.0, rng.gauss(mean, sd))
+        if kind == 'lognormal':
+            median, sigma = values
+            return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec '{spec}' (use fixed:S, uniform:A:B, normal:MEAN:SD or lognormal:MEDIAN:SIGMA)")
+
+
+def generate_items(text, line_recordings=None):
+    """
+    Grocery JSON for one list, tagged with 1-based line numbers. Lines found in
+    line_recordings (normalized line -> items) use the recorded items, the rest one tokenizer pass.
+    """
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    items = []
+    for n, line in enumerate(lines, start=1):
+        recorded = line_recordings.get(normalize_message(line)) if line_recordings else None
+        items.extend(dict(item, line=n) for item in (recorded if recorded is not None else tokenize_items(line)))
+    return items
+
+
+def generate_reply(user_content, line_recordings=None):
+    """Rule-generated assistant reply in the format the parse prompts ask for"""
+    headers = list(BATCH_HEADER.finditer(user_content))
+    if not headers:
+        return json.dumps(generate_items(user_content, line_recordings))
+    lists = {}
+    for k, header in enumerate(headers):
+        end = headers[k + 1].start() if k + 1 < len(headers) else len(user_content)
+        lists[header.group(1)] = generate_items(user_content[header.end():end], line_recordings)
+    return json.dumps(lists)
+
+
+class FakeOpenAIServer:
+    def __init__(self, host='127.0.0.1', port=0, latency='fixed:0', error_rate=0.0, rate_limit_rate=0.0,
+                 hang_rate=0.0, hang_seconds=60.0, stream_chunk_chars=12, stream_chunk_delay=0.01,
+                 recordings=None, line_recordings=None, prefill_ms_per_1k=0.0, seed=None):
+        self.latency = parse_latency(latency)
+        # Extra latency per 1000 prompt tokens, so prompt size shows up in response times
+        self.prefill_ms_per_1k = prefill_ms_per_1k
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.stream_chunk_chars = max(1, stream_chunk_chars)
+        self.stream_chunk_delay = stream_chunk_delay
+        # Keys are normalized the same way the parse cache does
+        self.recordings = {normalize_message(message): reply for message, reply in (recordings or {}).items()}
+        self.line_recordings = {normalize_message(line): items for line, items in (line_recordings or {}).items()}
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'streamed': 0,
+            'recorded': 0,
+            'generated': 0,
+            'errors': 0,
+            'rate_limited': 0,
+            'hung': 0,
+        }
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _draw(self):
+        """Latency and fault for one request, drawn under the lock so a seeded run is repeatable"""
+        with self._lock:
+            delay = self.latency(self.rng)
+            roll = self.rng.random()
+        if roll < self.hang_rate:
+            return delay, 'hang'
+        roll -= self.hang_rate
+        if roll < self.error_rate:
+            return delay, 'error'
+        roll -= self.error_rate
+        if roll < self.rate_limit_rate:
+            return delay, 'rate_limit'
+        return delay, None
+
+    def reply_for(self, messages):
+        user_content = next((message.get('content') or '' for message in reversed(messages)
+                             if message.get('role') == 'user'), '')
+        recorded = self.recordings.get(normalize_message(user_content))
+        if recorded is not None:
+            self._count('recorded')
+            return recorded
+        self._count('generated')
+        return generate_reply(user_content, self.line_recordings)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out as separate writes; don't let Nagle hold the body back
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/stats':
+                    with server._lock:
+                        stats = dict(server.stats)
+                    self._send_json(200, stats)
+                else:
+                    self._send_json(404, {'error': {'message': 'Not found'}})
+
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send_json(404, {'error': {'message': 'Not found'}})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                except ValueError:
+                    self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+                    return
+
+                server._count('requests')
+                delay, fault = server._draw()
+                prompt_tokens = sum(len(m.get('content') or '') for m in body.get('messages') or []) // 4
+                delay += prompt_tokens / 1000.0 * server.prefill_ms_per_1k / 1000.0
+                if fault == 'hang':
+                    server._count('hung')
+                    time.sleep(server.hang_seconds)
+                    return
+                time.sleep(delay)
+                if fault == 'error':
+                    server._count('errors')
+                    self._send_json(500, {'error': {'message': 'Injected server error', 'type': 'server_error'}})
+                    return
+                if fault == 'rate_limit':
+                    server._count('rate_limited')
+                    self._send_json(429, {'error': {'message': 'Injected rate limit', 'type': 'rate_limit_error'}},
+                                    headers={'Retry-After': '0.1'})
+                    return
+
+                content = server.reply_for(body.get('messages') or [])
+                completion_id = f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+                model = body.get('model', 'gpt-3.5-turbo')
+                if body.get('stream'):
+                    server._count('streamed')
+                    self._stream(completion_id, model, content)
+                else:
+                    completion_tokens = len(content) // 4
+                    self._send_json(200, {
+                        'id': completion_id,
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': content},
+                            'finish_reason': 'stop',
+                        }],
+                        'usage': {
+                            'prompt_tokens': prompt_tokens,
+                            'completion_tokens': completion_tokens,
+                            'total_tokens': prompt_tokens + completion_tokens,
+                        },
+                    })
+
+            def _stream(self, completion_id, model, content):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                step = server.stream_chunk_chars
+                deltas = [{'role': 'assistant', 'content': ''}] + \
+                         [{'content': content[i:i + step]} for i in range(0, len(content), step)]
+                for n, delta in enumerate(deltas):
+                    chunk = {
+                        'id': completion_id,
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    if n and server.stream_chunk_delay:
+                        time.sleep(server.stream_chunk_delay)
+                done = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                        'model': model, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+                self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+    def start(self):
+        """Serve on a background daemon thread; returns self"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-openai', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def load_recordings(path):
+    """Recordings file: a JSON object mapping user messages to assistant replies"""
+    with open(path, encoding='utf-8') as f:
+        recordings = json.load(f)
+    if not isinstance(recordings, dict):
+        raise ValueError(f"{path} must hold a JSON object of message -> reply")
+    return recordings
+
+
+def load_line_recordings(path):
+    """Per-line recordings file: {"version": N, "lines": {line: [items]}}"""
+    with open(path, encoding='utf-8') as f:
+        recordings = json.load(f)
+    if not isinstance(recordings, dict) or not isinstance(recordings.get('lines'), dict):
+        raise ValueError(f"{path} must hold a JSON object with a 'lines' object of line -> items")
+    return recordings['lines']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI chat-completions API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='lognormal:0.8:0.4',
+                        help="fixed:S, uniform:A:B, normal:MEAN:SD or lognormal:MEDIAN:SIGMA (seconds)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    parser.add_argument('--hang-rate', type=float, default=0.0, help="Share of requests that never answer")
+    parser.add_argument('--stream-chunk-chars', type=int, default=12)
+    parser.add_argument('--stream-chunk-delay', type=float, default=0.01)
+    parser.add_argument('--recordings', help="JSON file mapping user messages to recorded replies")
+    parser.add_argument('--line-recordings', help="JSON file of recorded items per line, e.g. benchmarks/corpus/llm_responses_v1.json")
+    parser.add_argument('--prefill-ms-per-1k', type=float, default=0.0,
+                        help="Added latency (ms) per 1000 prompt tokens, to model prompt size cost")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        host=args.host, port=args.port, latency=args.latency,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, hang_rate=args.hang_rate,
+        stream_chunk_chars=args.stream_chunk_chars, stream_chunk_delay=args.stream_chunk_delay,
+        recordings=load_recordings(args.recordings) if args.recordings else None,
+        line_recordings=load_line_recordings(args.line_recordings) if args.line_recordings else None,
+        prefill_ms_per_1k=args.prefill_ms_per_1k, seed=args.seed
+    )
+    print(f"🤖 Fake OpenAI server on {server.base_url} (latency {args.latency}, "
+          f"errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%}, hangs {args.hang_rate:.0%})")
+    print(f"   OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=fake python app.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping fake OpenAI server")
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
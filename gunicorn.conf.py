@@ -0,0 +1,17 @@
+"""
+Gunicorn settings, read automatically when gunicorn is started from this directory:
+    SOCKETIO_ASYNC_MODE=eventlet gunicorn -k eventlet -w 1 -b 0.0.0.0:$PORT app:app
+
+Gunicorn imports app.py but never runs its __main__ block, so the startup work
+python app.py and start.py do (order recovery, browser warm-up) runs here instead.
+"""
+
+# The eventlet / gevent workers patch select before app.py is imported. httpcore probes for trio at
+# import, and trio needs the select.epoll that patching removes, so import it here in the master first
+import httpcore  # noqa: F401
+
+
+def post_worker_init(worker):
+    # Sessions and queues live in memory, so there is a single worker and this runs once
+    import app
+    app.prepare_server()
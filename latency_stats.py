@@ -0,0 +1,104 @@
+"""
+Small thread-safe latency recorder with percentiles.
+
+Keeps the most recent samples per name (bounded memory) plus all-time counts,
+and summarises them as count / errors / avg / p50 / p95 / p99 / max.
+LatencyHistogram adds fixed-bucket all-time counts for dashboards.
+"""
+
+import threading
+from collections import deque
+
+DEFAULT_MAX_SAMPLES = 1000
+
+# Upper bounds (seconds) of the histogram buckets; anything slower lands in '+Inf'
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyStats:
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+        self._errors = {}
+
+    def record(self, name, seconds, ok=True):
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.max_samples)
+                self._counts[name] = 0
+                self._errors[name] = 0
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+            if not ok:
+                self._errors[name] += 1
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: (sorted(samples), self._counts[name], self._errors[name])
+                        for name, samples in self._samples.items()}
+
+        summary = {}
+        for name, (values, count, errors) in snapshot.items():
+            summary[name] = {
+                'count': count,
+                'errors': errors,
+                'avg': round(sum(values) / len(values), 4) if values else None,
+                'p50': round(percentile(values, 50), 4) if values else None,
+                'p95': round(percentile(values, 95), 4) if values else None,
+                'p99': round(percentile(values, 99), 4) if values else None,
+                'max': round(values[-1], 4) if values else None,
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
+
+
+class LatencyHistogram:
+    """All-time counts of samples per latency bucket (cumulative, like Prometheus 'le' buckets)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            counts = self._counts.setdefault(name, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: list(counts) for name, counts in self._counts.items()}
+
+        summary = {}
+        for name, counts in snapshot.items():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            summary[name] = buckets
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
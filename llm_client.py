@@ -0,0 +1,294 @@
+"""
+Pooled, timeout-bounded client for the OpenAI chat-completions API.
+
+Replaces the module-level `openai.ChatCompletion.create` calls, which had no
+timeout and no retries (and no longer exist in the pinned openai 1.x package).
+
+  * one httpx.Client per LLMClient: persistent keep-alive connection pool
+  * separate connect / read / write / pool timeouts, so a hung request fails
+    instead of holding a parse worker forever
+  * retries with full jitter on timeouts, connection errors, 429 and 5xx
+    (Retry-After is honoured, capped at the backoff limit)
+  * a global retry budget: retries may not exceed a fixed share of recent
+    requests, so an outage does not multiply load on an already slow API
+  * latency percentiles and histograms per attempt and per call
+
+base_url can point at any server speaking the same wire format (the local
+fake server, a proxy), which is how the client is tested.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from latency_stats import LatencyHistogram, LatencyStats
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+
+
+class LLMError(Exception):
+    """Raised when a completion could not be obtained"""
+
+    def __init__(self, message, status=None, retryable=False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class RetryBudget:
+    """
+    Allows retries up to `ratio` of the requests seen in the last `window` seconds,
+    plus `min_retries` so a quiet server can still retry the odd failure.
+    """
+
+    def __init__(self, ratio=0.2, min_retries=3, window=10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests = deque()
+        self._retries = deque()
+        self.exhausted = 0
+
+    def _trim(self, now):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self):
+        """Take one retry from the budget; False when it is used up"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                'ratio': self.ratio,
+                'recent_requests': len(self._requests),
+                'recent_retries': len(self._retries),
+                'exhausted': self.exhausted,
+            }
+
+
+class LLMClient:
+    def __init__(self, api_key=None, base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL,
+                 connect_timeout=5.0, read_timeout=20.0, pool_size=10,
+                 max_retries=2, backoff_base=0.25, backoff_max=4.0,
+                 retry_budget=None, transport=None):
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget or RetryBudget()
+        self.timings = LatencyStats()
+        self.histogram = LatencyHistogram()
+        self.logger = logging.getLogger(__name__)
+
+        self._client = httpx.Client(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=60),
+            transport=transport,
+        )
+        self._lock = threading.Lock()
+        self._stats = {
+            'calls': 0,
+            'attempts': 0,
+            'retries': 0,
+            'failures': 0,
+        }
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _headers(self):
+        if not self.api_key:
+            raise LLMError("OPENAI_API_KEY is not set")
+        return {'Authorization': f"Bearer {self.api_key}", 'Content-Type': 'application/json'}
+
+    def _payload(self, messages, max_tokens, temperature, stream):
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+        }
+        if stream:
+            payload['stream'] = True
+        return payload
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff; Retry-After wins when the server sends one"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            return None
+
+    def _error_for(self, response):
+        try:
+            detail = response.json().get('error', {}).get('message', '')
+        except ValueError:
+            detail = response.text[:200]
+        return LLMError(f"LLM request failed with HTTP {response.status_code}: {detail}",
+                        status=response.status_code, retryable=response.status_code in RETRYABLE_STATUS)
+
+    def _should_retry(self, attempt, error):
+        if not error.retryable or attempt >= self.max_retries:
+            return False
+        if not self.retry_budget.try_spend():
+            self.logger.warning("⚠️ LLM retry budget exhausted, not retrying")
+            return False
+        return True
+
+    def chat(self, messages, max_tokens=500, temperature=0.1):
+        """One chat completion; returns the message text"""
+        headers = self._headers()
+        payload = self._payload(messages, max_tokens, temperature, stream=False)
+        self._count('calls')
+        self.retry_budget.record_request()
+        call_start = time.monotonic()
+
+        attempt = 0
+        while True:
+            attempt_start = time.monotonic()
+            retry_after = None
+            self._count('attempts')
+            try:
+                response = self._client.post(f"{self.base_url}/chat/completions", headers=headers, json=payload)
+                if response.status_code == 200:
+                    content = response.json()['choices'][0]['message']['content'] or ''
+                    self._record('attempt', attempt_start, True)
+                    self._record('call', call_start, True)
+                    return content.strip()
+                error = self._error_for(response)
+                retry_after = self._retry_after(response)
+            except httpx.TimeoutException as e:
+                error = LLMError(f"LLM request timed out: {e.__class__.__name__}", retryable=True)
+            except httpx.TransportError as e:
+                error = LLMError(f"LLM connection error: {e}", retryable=True)
+            except (KeyError, IndexError, ValueError) as e:
+                error = LLMError(f"Malformed LLM response: {e}")
+
+            self._record('attempt', attempt_start, False)
+            if not self._should_retry(attempt, error):
+                self._count('failures')
+                self._record('call', call_start, False)
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            self.logger.warning(f"🔁 {error} - retrying in {delay:.2f}s")
+            self._count('retries')
+            time.sleep(delay)
+            attempt += 1
+
+    def stream_chat(self, messages, max_tokens=500, temperature=0.1):
+        """Streamed chat completion; yields content deltas. Retries only before the first delta."""
+        headers = self._headers()
+        payload = self._payload(messages, max_tokens, temperature, stream=True)
+        self._count('calls')
+        self.retry_budget.record_request()
+        call_start = time.monotonic()
+
+        attempt = 0
+        while True:
+            attempt_start = time.monotonic()
+            retry_after = None
+            yielded = False
+            self._count('attempts')
+            try:
+                with self._client.stream('POST', f"{self.base_url}/chat/completions", headers=headers, json=payload) as response:
+                    if response.status_code != 200:
+                        response.read()
+                        error = self._error_for(response)
+                        retry_after = self._retry_after(response)
+                    else:
+                        for delta in self._iter_sse_deltas(response):
+                            if not yielded:
+                                self._record('first_delta', attempt_start, True)
+                            yielded = True
+                            yield delta
+                        self._record('attempt', attempt_start, True)
+                        self._record('call', call_start, True)
+                        return
+            except httpx.TimeoutException as e:
+                error = LLMError(f"LLM stream timed out: {e.__class__.__name__}", retryable=not yielded)
+            except httpx.TransportError as e:
+                error = LLMError(f"LLM stream connection error: {e}", retryable=not yielded)
+
+            self._record('attempt', attempt_start, False)
+            if yielded or not self._should_retry(attempt, error):
+                self._count('failures')
+                self._record('call', call_start, False)
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            self.logger.warning(f"🔁 {error} - retrying in {delay:.2f}s")
+            self._count('retries')
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _iter_sse_deltas(response):
+        """Content deltas from a text/event-stream chat completion"""
+        for line in response.iter_lines():
+            if not line.startswith('data:'):
+                continue
+            data = line[5:].strip()
+            if data == '[DONE]':
+                return
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            choices = chunk.get('choices') or [{}]
+            content = (choices[0].get('delta') or {}).get('content')
+            if content:
+                yield content
+
+    def _record(self, name, start, ok):
+        seconds = time.monotonic() - start
+        self.timings.record(name, seconds, ok=ok)
+        self.histogram.record(name, seconds)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'base_url': self.base_url,
+            'model': self.model,
+            'max_retries': self.max_retries,
+            'retry_budget': self.retry_budget.stats(),
+            'timings': self.timings.summary(),
+            'histogram': self.histogram.summary(),
+        })
+        return stats
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,219 @@
+"""
+Fast local parser for simple grocery lines.
+
+Most lines people type are already structured - "2 kg potatoes", "one packet
+amul toned milk", "banana". The local parser handles those without the LLM and
+scores how sure it is about each line. parse_grocery_list accepts confident
+lines straight away and only escalates the rest (free text, several items on
+one line, odd characters) to the AI.
+
+Confidence scale:
+  0.95  quantity + unit + name          "2 kg potatoes", "milk 1 liter"
+  0.90  quantity + name                 "three bananas"
+  0.75  short bare name                 "banana", "amul butter"
+  0.60  longer bare name                 "tata sampann unpolished toor dal"
+  0.50  a Hinglish word in the name, or a quantity + name / bare name line
+        with a number word or a unit the patterns don't know in the name
+                                        "2 kilo aloo", "ek packet doodh"
+  <0.5  looks like free text or several items on one line
+
+Bare names sit below the default threshold: "hi", "thanks" and "doodh" look
+just like "banana", so they go on to the line memo, the entity model or the AI.
+
+tokenize_items() is the no-AI fallback for whole messages: one compiled regex
+walks the text once, splitting items on newlines, commas and "and", and picks
+out quantities (digits or number words) and units as it goes.
+"""
+
+import re
+
+# Lines at or above this confidence are accepted without asking the AI
+DEFAULT_THRESHOLD = 0.8
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+}
+
+UNITS = (
+    'kg', 'kgs', 'g', 'gm', 'gms', 'grams', 'gram', 'l', 'ltr', 'liter', 'liters', 'litre', 'litres', 'ml',
+    'packet', 'packets', 'pack', 'packs', 'piece', 'pieces', 'pcs', 'dozen',
+    'bottle', 'bottles', 'can', 'cans', 'box', 'boxes', 'bag', 'bags', 'bunch', 'bunches',
+)
+
+# Words that mean the line is a sentence rather than an item ("I need some milk")
+FILLER_WORDS = {'i', 'need', 'want', 'please', 'get', 'buy', 'me', 'some', 'also', 'and', 'order', 'add', 'my', 'of'}
+
+# Units and counts the line patterns don't know; in a name they mean the line was misread ("2 kilo aloo")
+UNLISTED_UNIT_WORDS = frozenset((
+    'kilo', 'kilos', 'kilogram', 'kilograms', 'lt', 'lts', 'tin', 'tins', 'jar', 'jars', 'pouch', 'pouches',
+    'sachet', 'sachets', 'carton', 'cartons', 'tray', 'trays', 'loaf', 'loaves', 'dabba', 'dabbe',
+))
+# The one Hinglish lexicon: the local parser, the entity model and the prompt example selection all use it.
+# Numbers and quantities first, then fillers and the product names that need translating before a search
+HINGLISH_NUMBERS = frozenset((
+    'ek', 'do', 'teen', 'char', 'chaar', 'paanch', 'panch', 'chhe', 'saat', 'aath', 'nau', 'das',
+    'aadha', 'adha', 'dedh', 'dhai', 'sava', 'paav', 'thoda', 'thodi',
+))
+HINGLISH_WORDS = HINGLISH_NUMBERS | frozenset((
+    'aur', 'bhi', 'chahiye', 'mujhe', 'lao', 'lana', 'dena', 'wala', 'wali', 'wale', 'ka', 'ki', 'ke',
+    'aloo', 'alu', 'pyaaz', 'pyaz', 'kanda', 'tamatar', 'doodh', 'dudh', 'anda', 'ande', 'chawal', 'chini',
+    'cheeni', 'chai', 'patti', 'namak', 'adrak', 'lehsun', 'lahsun', 'dhaniya', 'mirch', 'mirchi', 'kela',
+    'kele', 'seb', 'gobi', 'bhindi', 'baingan', 'matar', 'nimbu', 'makhan', 'tel', 'sarson', 'sabun', 'haldi',
+    'jeera', 'sabzi', 'phal',
+))
+# Chat rather than groceries
+CHAT_WORDS = frozenset(('hi', 'hello', 'hey', 'thanks', 'thank', 'thankyou', 'ok', 'okay', 'bye', 'yes', 'no'))
+
+CATEGORY_KEYWORDS = {
+    'vegetables': ('potato', 'potatoes', 'onion', 'onions', 'tomato', 'tomatoes', 'carrot', 'carrots',
+                   'spinach', 'cabbage', 'cauliflower', 'capsicum', 'ginger', 'garlic', 'chilli', 'coriander'),
+    'fruits': ('banana', 'bananas', 'apple', 'apples', 'mango', 'mangoes', 'orange', 'oranges',
+               'grapes', 'papaya', 'pomegranate', 'watermelon', 'lemon', 'lemons'),
+    'dairy': ('milk', 'curd', 'paneer', 'butter', 'cheese', 'ghee', 'eggs', 'egg', 'yogurt', 'dahi', 'cream'),
+    'grains': ('rice', 'atta', 'flour', 'dal', 'wheat', 'oats', 'poha', 'rava', 'suji', 'besan'),
+    'bakery': ('bread', 'bun', 'buns', 'cake', 'rusk', 'pav'),
+    'snacks': ('chips', 'biscuits', 'biscuit', 'namkeen', 'cookies', 'chocolate', 'maggi', 'noodles'),
+    'beverages': ('tea', 'coffee', 'juice', 'cola', 'soda', 'water'),
+    'household': ('detergent', 'soap', 'dishwash', 'cleaner', 'tissue', 'foil'),
+    'personal_care': ('shampoo', 'toothpaste', 'toothbrush', 'deodorant', 'lotion'),
+}
+KEYWORD_CATEGORY = {word: category for category, words in CATEGORY_KEYWORDS.items() for word in words}
+# The categories the AI prompt allows; lines no keyword places get the catch-all one
+CATEGORIES = tuple(CATEGORY_KEYWORDS)
+DEFAULT_CATEGORY = 'household'
+
+_QTY = r'(?P<qty>\d+(?:\.\d+)?|' + '|'.join(NUMBER_WORDS) + r')'
+_UNIT = r'(?P<unit>' + '|'.join(sorted(UNITS, key=len, reverse=True)) + r')'
+_NAME = r'(?P<name>[a-z][a-z\s\'&-]*?)'
+
+BARE_NAME_CONFIDENCE = 0.75
+LONG_NAME_CONFIDENCE = 0.6
+# A name with a word the patterns can't read, or one that needs translating
+UNSURE_CONFIDENCE = 0.5
+
+# Compiled once; tried most specific first
+LINE_PATTERNS = (
+    (re.compile(r'^' + _QTY + r'\s*' + _UNIT + r'\s+(?:of\s+)?' + _NAME + r'$'), 0.95),
+    (re.compile(r'^' + _NAME + r'\s+' + _QTY + r'\s*' + _UNIT + r'$'), 0.95),
+    (re.compile(r'^' + _QTY + r'\s+' + _NAME + r'$'), 0.90),
+    (re.compile(r'^' + _NAME + r'$'), BARE_NAME_CONFIDENCE),
+)
+
+# Single-pass tokenizer over lowercased text: (separator, number, word) per token, anything else skipped
+TOKEN_PATTERN = re.compile(r"(\n|,|;|&|\+|\band\b)|(\d+(?:\.\d+)?)|([a-z][a-z'-]*)")
+UNIT_SET = frozenset(UNITS)
+# Any of these in the name of a line without a unit means the patterns misread it
+MISREAD_WORDS = frozenset(NUMBER_WORDS) | UNIT_SET | UNLISTED_UNIT_WORDS
+ARTICLES = frozenset(('a', 'an'))
+# Dropped from the start of an item ("I need 2 kg potatoes", "please get me bread")
+LEADING_FILLER = frozenset(FILLER_WORDS - {'and'})
+
+MULTI_ITEM_PATTERN = re.compile(r',|;|\band\b|&|\+')
+WHITESPACE = re.compile(r'\s+')
+
+
+def to_quantity(token):
+    if token in NUMBER_WORDS:
+        return NUMBER_WORDS[token]
+    value = float(token)
+    return int(value) if value.is_integer() else value
+
+
+def guess_category(name):
+    for word in reversed(name.split()):
+        if word in KEYWORD_CATEGORY:
+            return KEYWORD_CATEGORY[word]
+    return DEFAULT_CATEGORY
+
+
+def parse_line(line):
+    """Parse one line into (items, confidence); items is empty when nothing matched"""
+    text = WHITESPACE.sub(' ', line).strip().lower()
+    if not text:
+        return [], 0.0
+    if MULTI_ITEM_PATTERN.search(text):
+        # Several items on one line - left to the AI
+        return [], 0.3
+
+    for pattern, confidence in LINE_PATTERNS:
+        match = pattern.match(text)
+        if not match:
+            continue
+
+        name = match.group('name').strip()
+        words = name.split()
+        if not words or FILLER_WORDS.intersection(words) or CHAT_WORDS.intersection(words):
+            return [], 0.2
+        if HINGLISH_WORDS.intersection(words) or (
+                'unit' not in pattern.groupindex and MISREAD_WORDS.intersection(words)):
+            # "2 kilo aloo", "ek packet doodh": keep the guess but let the model or the AI answer
+            confidence = UNSURE_CONFIDENCE
+        elif 'qty' not in pattern.groupindex and len(words) > 3:
+            # A long bare name is as likely a sentence as a product
+            confidence = LONG_NAME_CONFIDENCE
+
+        groups = match.groupdict()
+        item = {
+            'name': name,
+            'quantity': to_quantity(groups['qty']) if groups.get('qty') else 1,
+            'unit': groups.get('unit') or 'pieces',
+            'category': guess_category(name),
+        }
+        return [item], confidence
+
+    return [], 0.2
+
+
+def _make_item(quantity, unit, words):
+    category = DEFAULT_CATEGORY
+    for word in reversed(words):
+        if word in KEYWORD_CATEGORY:
+            category = KEYWORD_CATEGORY[word]
+            break
+    if quantity is None:
+        quantity = 1
+    elif quantity.isdigit():
+        quantity = int(quantity)
+    else:
+        quantity = to_quantity(quantity)
+    return {'name': ' '.join(words), 'quantity': quantity, 'unit': unit or 'pieces', 'category': category}
+
+
+def tokenize_items(text):
+    """Split a message into items in one pass over the text (newlines, commas and "and" separate items)"""
+    items = []
+    quantity = unit = None
+    words = []
+    # True right after a quantity, so "kg" in "2 kg" is read as the unit
+    after_quantity = False
+
+    for separator, number, word in TOKEN_PATTERN.findall((text or '').lower()):
+        if separator:
+            if words:
+                items.append(_make_item(quantity, unit, words))
+            quantity = unit = None
+            words = []
+            after_quantity = False
+        elif number:
+            # Leading ("2 kg potatoes") or trailing ("milk 1 liter") quantity; later numbers belong to the name
+            if quantity is None:
+                quantity = number
+                after_quantity = True
+            else:
+                words.append(number)
+                after_quantity = False
+        elif after_quantity and unit is None and word in UNIT_SET:
+            unit = word
+            after_quantity = False
+        elif quantity is None and not words and (word in NUMBER_WORDS or word in ARTICLES):
+            quantity = '1' if word in ARTICLES else word
+            after_quantity = True
+        else:
+            if words or word not in LEADING_FILLER:
+                words.append(word)
+            after_quantity = False
+
+    if words:
+        items.append(_make_item(quantity, unit, words))
+    return items
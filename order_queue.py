@@ -0,0 +1,181 @@
+"""
+Bounded worker pool that places confirmed orders.
+
+Placing an order drives a Chrome session through Blinkit for a minute or more.
+Confirmations used to start a thread each, so a burst of confirms started as
+many automations as there were clicks, all fighting over the browser pool's
+few profiles and the machine's memory. OrderQueue places orders on a fixed
+number of workers - one per pooled browser - first come, first served:
+
+  * max_pending - confirmations beyond this many queued + running orders are
+    turned away straight away with OrderQueueFull
+  * on_update   - every queued order is told its place in line and estimated
+    start time when it is queued and again whenever the line moves
+
+Start times are estimated from how long recent orders took (estimate_seconds
+until the first one finishes): each running order is expected to free its
+worker once it has run that long, and queued orders take the earliest free
+worker in turn.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+
+from latency_stats import LatencyStats
+
+
+class OrderQueueFull(Exception):
+    """Raised when too many orders are already queued or being placed"""
+
+
+class OrderJob:
+    """One confirmed order waiting for (or holding) a worker"""
+
+    def __init__(self, order_id, task, on_update=None):
+        self.order_id = order_id
+        self.task = task
+        self.on_update = on_update
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        # Place in line last reported to on_update (1 = next to start)
+        self.position = None
+
+
+class OrderQueue:
+    def __init__(self, workers=1, max_pending=10, estimate_seconds=120, history=20):
+        if workers < 1:
+            raise ValueError("Order queue needs at least 1 worker")
+
+        self.workers = workers
+        self.max_pending = max_pending
+        self.estimate_seconds = estimate_seconds
+        self.timings = LatencyStats()
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._running = []
+        self._durations = deque(maxlen=history)
+        self._threads = []
+        self._closed = False
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+        }
+
+    def _start_workers(self):
+        """Worker threads are started on first use so importing app stays cheap"""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"order-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, order_id, task, on_update=None):
+        """
+        Queue task() to place order_id. on_update(job, position, eta_seconds), if given, is called while the
+        order waits: once when it is queued and again each time its place in line changes.
+        """
+        with self._cond:
+            if self._closed:
+                raise OrderQueueFull("Order queue is shut down")
+            if len(self._queue) + len(self._running) >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise OrderQueueFull(f"{self.max_pending} orders already pending")
+
+            job = OrderJob(order_id, task, on_update)
+            self._queue.append(job)
+            self._stats['submitted'] += 1
+            self._start_workers()
+            # A free worker takes the order right away, so only announce a wait when every worker is busy
+            updates = self._line_updates() if len(self._queue) + len(self._running) > self.workers else []
+            self._cond.notify()
+
+        self._send(updates)
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                job = self._queue.popleft()
+                job.started_at = time.monotonic()
+                self._running.append(job)
+                # Everyone behind this order moved up one place
+                updates = self._line_updates()
+
+            self._send(updates)
+            self.timings.record('queue_wait', job.started_at - job.submitted_at)
+            ok = True
+            try:
+                job.task()
+            except Exception as e:
+                ok = False
+                self.logger.error(f"❌ Order {job.order_id} failed: {e}")
+            duration = time.monotonic() - job.started_at
+            self.timings.record('order', duration, ok=ok)
+
+            with self._cond:
+                self._running.remove(job)
+                self._durations.append(duration)
+                self._stats['completed' if ok else 'failed'] += 1
+
+    def average_order_seconds(self):
+        with self._cond:
+            return self._average()
+
+    def _average(self):
+        return sum(self._durations) / len(self._durations) if self._durations else self.estimate_seconds
+
+    def _line_updates(self):
+        """(job, position, eta_seconds) for queued jobs whose place in line changed; caller holds the lock"""
+        average = self._average()
+        now = time.monotonic()
+        # When each worker is expected to be free: running orders after the average duration, idle ones now
+        free_at = [max(0.0, average - (now - job.started_at)) for job in self._running]
+        free_at += [0.0] * (self.workers - len(free_at))
+        heapq.heapify(free_at)
+
+        updates = []
+        for position, job in enumerate(self._queue, start=1):
+            start = heapq.heappop(free_at)
+            heapq.heappush(free_at, start + average)
+            if job.position != position:
+                job.position = position
+                updates.append((job, position, round(start, 1)))
+        return updates
+
+    def _send(self, updates):
+        for job, position, eta_seconds in updates:
+            if job.on_update is None:
+                continue
+            try:
+                job.on_update(job, position, eta_seconds)
+            except Exception as e:
+                self.logger.error(f"❌ Order queue update failed: {e}")
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'queued': len(self._queue),
+                'running': len(self._running),
+                'avg_order_seconds': round(self._average(), 1),
+            })
+        stats['timings'] = self.timings.summary()
+        return stats
+
+    def shutdown(self):
+        """Stop accepting orders; workers exit once the queue drains"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,37 @@
+"""
+Order status state machine.
+
+An order's status only moves along these edges:
+
+    pending ---> queued ---> processing ---> completed
+       |   <---    |                    \\--> failed ---> queued (retry)
+       \\--------> cancelled <--/
+
+Every change is a compare-and-set: the order store (order_store.py) applies a
+transition atomically, only if the order's current status allows it, and the
+caller learns whether it won. A double-clicked "Confirm Order", the "yes" keyword racing the button, or a
+retry of an order that is already queued, running or done therefore finds the
+order no longer pending and is absorbed - one indexed lookup and one
+comparison - instead of starting a second browser run. queued -> pending hands
+the order back when the order queue turns it away.
+"""
+
+PENDING = 'pending'
+QUEUED = 'queued'
+PROCESSING = 'processing'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+TRANSITIONS = {
+    PENDING: frozenset((QUEUED, CANCELLED)),
+    QUEUED: frozenset((PROCESSING, PENDING, CANCELLED)),
+    PROCESSING: frozenset((COMPLETED, FAILED)),
+    COMPLETED: frozenset(),
+    FAILED: frozenset((QUEUED,)),
+    CANCELLED: frozenset(),
+}
+
+
+def can_transition(current, to_status):
+    return to_status in TRANSITIONS.get(current, ())
@@ -0,0 +1,443 @@
+"""
+Order store: draft and confirmed orders, indexed and expiring.
+
+Orders used to live in a plain dict in app.py that grew forever, was changed
+from worker threads without a lock, was lost on restart, and was scanned
+front to back whenever someone typed "yes". Both stores here keep orders
+indexed by id, by status and by (session, status), apply status changes as
+atomic compare-and-set along the edges in order_state.py, and expire old
+orders:
+
+  * MemoryOrderStore - a dict plus insertion-ordered indexes; every lookup is O(1)
+  * SQLiteOrderStore - one SQLite file in WAL mode (readers don't wait for the
+    writer), B-tree indexes on (status, status_at) and (session, status,
+    status_at); lookups are O(log n) and orders survive restarts
+
+Drafts (pending orders nobody confirmed) expire draft_ttl seconds after they
+became pending; finished orders (completed, failed, cancelled) are kept for
+`retention` seconds. Queued and processing orders never expire. Expired orders
+read as missing at once and are deleted every EXPIRE_EVERY writes.
+
+Orders come back as fresh dicts: id, session, status, items, message,
+created_at, status_at (when it entered its status), updated_at.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from order_state import TRANSITIONS, PENDING, QUEUED, PROCESSING, COMPLETED, FAILED, CANCELLED, can_transition
+
+DEFAULT_DRAFT_TTL = 24 * 3600
+DEFAULT_RETENTION = 30 * 24 * 3600
+
+# Sweep expired orders at most once per this many writes
+EXPIRE_EVERY = 50
+
+STATUSES = tuple(TRANSITIONS)
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+# Fields a caller may store along with a transition
+FIELDS = ('items', 'message')
+
+RESTART_MESSAGE = "Order placement was interrupted by a server restart. Please check your Blinkit cart."
+
+
+def _check_fields(fields):
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown order fields: {', '.join(sorted(unknown))}")
+
+
+class MemoryOrderStore:
+    def __init__(self, draft_ttl=DEFAULT_DRAFT_TTL, retention=DEFAULT_RETENTION, clock=time.time):
+        self.draft_ttl = draft_ttl
+        self.retention = retention
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._orders = {}
+        # status -> ids, and (session, status) -> ids, each in the order they entered the status
+        self._by_status = {status: OrderedDict() for status in STATUSES}
+        self._by_session = {}
+        self._writes = 0
+        self._stats = {
+            'created': 0,
+            'transitions': 0,
+            'rejected': 0,
+            'expired': 0,
+        }
+
+    def _ttl(self, status):
+        if status == PENDING:
+            return self.draft_ttl
+        if status in FINISHED:
+            return self.retention
+        return None
+
+    def _expired(self, order, now):
+        ttl = self._ttl(order['status'])
+        return ttl is not None and now - order['status_at'] >= ttl
+
+    def _index(self, order):
+        self._by_status[order['status']][order['id']] = None
+        self._by_session.setdefault((order['session'], order['status']), OrderedDict())[order['id']] = None
+
+    def _unindex(self, order):
+        self._by_status[order['status']].pop(order['id'], None)
+        key = (order['session'], order['status'])
+        ids = self._by_session.get(key)
+        if ids is not None:
+            ids.pop(order['id'], None)
+            if not ids:
+                del self._by_session[key]
+
+    def _live(self, order_id, now):
+        """The stored order, or None if missing or expired (caller holds the lock)"""
+        order = self._orders.get(order_id)
+        if order is None or self._expired(order, now):
+            return None
+        return order
+
+    def _wrote(self, now):
+        self._writes += 1
+        if self._writes % EXPIRE_EVERY == 0:
+            self._expire(now)
+
+    def _expire(self, now):
+        """Drop expired orders, oldest first per status (caller holds the lock)"""
+        for status in STATUSES:
+            ttl = self._ttl(status)
+            if ttl is None:
+                continue
+            ids = self._by_status[status]
+            while ids:
+                order = self._orders[next(iter(ids))]
+                if now - order['status_at'] < ttl:
+                    break
+                self._unindex(order)
+                del self._orders[order['id']]
+                self._stats['expired'] += 1
+
+    def create(self, order_id, items, session=None):
+        """Store a new pending order; returns it"""
+        now = self.clock()
+        order = {
+            'id': order_id,
+            'session': session,
+            'status': PENDING,
+            'items': items,
+            'message': None,
+            'created_at': now,
+            'status_at': now,
+            'updated_at': now,
+        }
+        with self._lock:
+            if self._live(order_id, now) is not None:
+                raise ValueError(f"Order {order_id} already exists")
+            stale = self._orders.pop(order_id, None)
+            if stale is not None:
+                self._unindex(stale)
+            self._orders[order_id] = order
+            self._index(order)
+            self._stats['created'] += 1
+            self._wrote(now)
+            return dict(order)
+
+    def get(self, order_id):
+        with self._lock:
+            order = self._live(order_id, self.clock())
+            return dict(order) if order is not None else None
+
+    def transition(self, order_id, to_status, **fields):
+        """
+        Atomically move the order to to_status if its current status allows it, storing fields with it.
+        Returns (moved, status before the call); (False, None) when there is no such order.
+        """
+        _check_fields(fields)
+        now = self.clock()
+        with self._lock:
+            order = self._live(order_id, now)
+            if order is None:
+                return False, None
+            current = order['status']
+            if not can_transition(current, to_status):
+                self._stats['rejected'] += 1
+                return False, current
+            self._unindex(order)
+            order.update(fields)
+            order.update(status=to_status, status_at=now, updated_at=now)
+            self._index(order)
+            self._stats['transitions'] += 1
+            self._wrote(now)
+        return True, current
+
+    def update_if(self, order_id, status, **fields):
+        """Atomically store fields on the order only while it is in status; returns whether it was"""
+        _check_fields(fields)
+        now = self.clock()
+        with self._lock:
+            order = self._live(order_id, now)
+            if order is None or order['status'] != status:
+                return False
+            order.update(fields)
+            order['updated_at'] = now
+            return True
+
+    def latest(self, status, session=None):
+        """The order that most recently entered status (of this session when given), or None"""
+        now = self.clock()
+        with self._lock:
+            ids = self._by_status[status] if session is None else self._by_session.get((session, status))
+            if not ids:
+                return None
+            order = self._live(next(reversed(ids)), now)
+            return dict(order) if order is not None else None
+
+    def recover(self):
+        """After a restart: queued orders go back to pending, interrupted ones are failed. Returns the count"""
+        now = self.clock()
+        recovered = 0
+        with self._lock:
+            for status, to_status, fields in ((QUEUED, PENDING, {}), (PROCESSING, FAILED, {'message': RESTART_MESSAGE})):
+                for order_id in list(self._by_status[status]):
+                    order = self._orders[order_id]
+                    self._unindex(order)
+                    order.update(fields)
+                    order.update(status=to_status, status_at=now, updated_at=now)
+                    self._index(order)
+                    recovered += 1
+        return recovered
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'backend': 'memory',
+                'orders': len(self._orders),
+                'by_status': {status: len(ids) for status, ids in self._by_status.items() if ids},
+            })
+            return stats
+
+    def close(self):
+        pass
+
+
+class SQLiteOrderStore:
+    def __init__(self, path, draft_ttl=DEFAULT_DRAFT_TTL, retention=DEFAULT_RETENTION, clock=time.time):
+        self.path = path
+        self.draft_ttl = draft_ttl
+        self.retention = retention
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {
+            'created': 0,
+            'transitions': 0,
+            'rejected': 0,
+            'expired': 0,
+        }
+
+        # Autocommit; writes that read first run in an explicit BEGIN IMMEDIATE so other processes can't interleave
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS orders ("
+            " id TEXT PRIMARY KEY,"
+            " session TEXT,"
+            " status TEXT NOT NULL,"
+            " items TEXT NOT NULL,"
+            " message TEXT,"
+            " created_at REAL NOT NULL,"
+            " status_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS orders_status ON orders (status, status_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS orders_session ON orders (session, status, status_at)")
+        with self._lock:
+            self._expire(self.clock())
+
+    def _ttl(self, status):
+        if status == PENDING:
+            return self.draft_ttl
+        if status in FINISHED:
+            return self.retention
+        return None
+
+    def _order(self, row, now):
+        """Row as an order dict, or None if it has expired"""
+        if row is None:
+            return None
+        ttl = self._ttl(row['status'])
+        if ttl is not None and now - row['status_at'] >= ttl:
+            return None
+        order = dict(row)
+        order['items'] = json.loads(order['items'])
+        return order
+
+    def _row(self, order_id):
+        return self._conn.execute("SELECT * FROM orders WHERE id = ?", (order_id,)).fetchone()
+
+    def _wrote(self, now):
+        self._writes += 1
+        if self._writes % EXPIRE_EVERY == 0:
+            self._expire(now)
+
+    def _expire(self, now):
+        """Delete expired orders through the status index (caller holds the lock)"""
+        for status in STATUSES:
+            ttl = self._ttl(status)
+            if ttl is None:
+                continue
+            cursor = self._conn.execute("DELETE FROM orders WHERE status = ? AND status_at <= ?", (status, now - ttl))
+            self._stats['expired'] += max(cursor.rowcount, 0)
+
+    def _set_clause(self, fields):
+        columns = []
+        values = []
+        for field, value in fields.items():
+            columns.append(f"{field} = ?")
+            values.append(json.dumps(value, separators=(',', ':')) if field == 'items' else value)
+        return columns, values
+
+    def create(self, order_id, items, session=None):
+        """Store a new pending order; returns it"""
+        now = self.clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._order(self._row(order_id), now) is not None:
+                    raise ValueError(f"Order {order_id} already exists")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO orders (id, session, status, items, message, created_at, status_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, NULL, ?, ?, ?)",
+                    (order_id, session, PENDING, json.dumps(items, separators=(',', ':')), now, now, now)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._stats['created'] += 1
+            self._wrote(now)
+        return self.get(order_id)
+
+    def get(self, order_id):
+        with self._lock:
+            return self._order(self._row(order_id), self.clock())
+
+    def transition(self, order_id, to_status, **fields):
+        """
+        Atomically move the order to to_status if its current status allows it, storing fields with it.
+        Returns (moved, status before the call); (False, None) when there is no such order.
+        """
+        _check_fields(fields)
+        now = self.clock()
+        columns, values = self._set_clause(fields)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                order = self._order(self._row(order_id), now)
+                if order is None:
+                    self._conn.execute("COMMIT")
+                    return False, None
+                current = order['status']
+                if not can_transition(current, to_status):
+                    self._conn.execute("COMMIT")
+                    self._stats['rejected'] += 1
+                    return False, current
+                self._conn.execute(
+                    f"UPDATE orders SET {', '.join(columns + ['status = ?', 'status_at = ?', 'updated_at = ?'])} WHERE id = ?",
+                    values + [to_status, now, now, order_id]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._stats['transitions'] += 1
+            self._wrote(now)
+        return True, current
+
+    def update_if(self, order_id, status, **fields):
+        """Atomically store fields on the order only while it is in status; returns whether it was"""
+        _check_fields(fields)
+        now = self.clock()
+        ttl = self._ttl(status)
+        columns, values = self._set_clause(fields)
+        with self._lock:
+            # One statement, so the status check and the write can't be separated
+            cursor = self._conn.execute(
+                f"UPDATE orders SET {', '.join(columns + ['updated_at = ?'])}"
+                " WHERE id = ? AND status = ? AND status_at > ?",
+                values + [now, order_id, status, now - ttl if ttl is not None else float('-inf')]
+            )
+            return cursor.rowcount > 0
+
+    def latest(self, status, session=None):
+        """The order that most recently entered status (of this session when given), or None"""
+        now = self.clock()
+        with self._lock:
+            if session is None:
+                row = self._conn.execute(
+                    "SELECT * FROM orders WHERE status = ? ORDER BY status_at DESC LIMIT 1", (status,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT * FROM orders WHERE session = ? AND status = ? ORDER BY status_at DESC LIMIT 1",
+                    (session, status)
+                ).fetchone()
+            return self._order(row, now)
+
+    def recover(self):
+        """After a restart: queued orders go back to pending, interrupted ones are failed. Returns the count"""
+        now = self.clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                queued = self._conn.execute(
+                    "UPDATE orders SET status = ?, status_at = ?, updated_at = ? WHERE status = ?",
+                    (PENDING, now, now, QUEUED)
+                ).rowcount
+                interrupted = self._conn.execute(
+                    "UPDATE orders SET status = ?, message = ?, status_at = ?, updated_at = ? WHERE status = ?",
+                    (FAILED, RESTART_MESSAGE, now, now, PROCESSING)
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return queued + interrupted
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['backend'] = 'sqlite'
+            stats['path'] = self.path
+            try:
+                counts = self._conn.execute("SELECT status, COUNT(*) FROM orders GROUP BY status").fetchall()
+                stats['by_status'] = {status: count for status, count in counts}
+                stats['orders'] = sum(stats['by_status'].values())
+            except sqlite3.Error:
+                stats['by_status'] = None
+            return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_order_store(path=None, draft_ttl=DEFAULT_DRAFT_TTL, retention=DEFAULT_RETENTION):
+    """SQLite store at path, or the memory store when path is empty or the file can't be opened"""
+    if path:
+        try:
+            return SQLiteOrderStore(path, draft_ttl=draft_ttl, retention=retention)
+        except sqlite3.Error as e:
+            logging.getLogger(__name__).warning(f"⚠️ Order store unavailable ({path}), keeping orders in memory: {e}")
+    return MemoryOrderStore(draft_ttl=draft_ttl, retention=retention)
@@ -0,0 +1,266 @@
+"""
+Event-driven wait primitives for the Blinkit automation.
+
+Each wait polls a cheap condition in the page (URL, element count, cart badge,
+in-flight requests, last DOM mutation) and returns as soon as it holds, instead
+of sleeping for the worst case. Every wait is recorded in `wait_stats` with the
+time it actually took and, where it replaced a fixed sleep, how much it saved.
+"""
+
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+# Page hooks: count in-flight fetch/XHR requests and timestamp the last DOM mutation.
+# Installed on every new document via CDP and lazily via execute_script as a fallback.
+PAGE_INSTRUMENTATION_JS = """
+(function () {
+    if (window.__ktInstrumented) { return; }
+    window.__ktInstrumented = true;
+    window.__ktInflight = 0;
+    window.__ktLastNetwork = performance.now();
+    window.__ktLastMutation = performance.now();
+
+    var done = function () {
+        window.__ktInflight = Math.max(0, window.__ktInflight - 1);
+        window.__ktLastNetwork = performance.now();
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            window.__ktInflight++;
+            return originalFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__ktInflight++;
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+
+    var observe = function () {
+        new MutationObserver(function () { window.__ktLastMutation = performance.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    };
+    if (document.documentElement) { observe(); } else { document.addEventListener('DOMContentLoaded', observe); }
+})();
+"""
+
+# Reads the "N items" count from Blinkit's cart button; null when the cart button isn't rendered
+CART_COUNT_JS = """
+var nodes = document.querySelectorAll("[class*='CartButton__Text'], [class*='CartButton__Button']");
+for (var i = 0; i < nodes.length; i++) {
+    var match = (nodes[i].textContent || '').match(/(\\d+)\\s*items?/i);
+    if (match) { return parseInt(match[1], 10); }
+}
+return null;
+"""
+
+DEFAULT_POLL = 0.05
+
+
+class WaitStats:
+    """Thread-safe record of how long each kind of wait really took"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = {}
+
+    def record(self, name, waited, ok, replaces=None):
+        with self._lock:
+            entry = self._waits.setdefault(name, {
+                'count': 0, 'timeouts': 0, 'total_waited': 0.0, 'max_waited': 0.0, 'saved': 0.0
+            })
+            entry['count'] += 1
+            entry['total_waited'] += waited
+            entry['max_waited'] = max(entry['max_waited'], waited)
+            if not ok:
+                entry['timeouts'] += 1
+            if replaces is not None:
+                entry['saved'] += replaces - waited
+
+    def summary(self):
+        with self._lock:
+            summary = {}
+            for name, entry in self._waits.items():
+                summary[name] = {
+                    'count': entry['count'],
+                    'timeouts': entry['timeouts'],
+                    'avg_waited': round(entry['total_waited'] / entry['count'], 3),
+                    'max_waited': round(entry['max_waited'], 3),
+                    'saved_vs_fixed_sleep': round(entry['saved'], 3),
+                }
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+
+
+wait_stats = WaitStats()
+
+
+def wait_until(name, condition, timeout=10, poll=DEFAULT_POLL, replaces=None):
+    """
+    Poll condition() until it returns a truthy value or the timeout expires.
+    Exceptions raised by the condition (stale elements, navigation in progress) count as "not yet".
+    Returns the truthy value, or None on timeout.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    result = None
+    while True:
+        try:
+            result = condition()
+        except Exception:
+            result = None
+        if result or time.monotonic() >= deadline:
+            break
+        time.sleep(poll)
+
+    wait_stats.record(name, time.monotonic() - start, bool(result), replaces)
+    return result or None
+
+
+def install_page_instrumentation(driver):
+    """Install the network/DOM hooks for all future documents and the current one"""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': PAGE_INSTRUMENTATION_JS})
+    except Exception:
+        # Not a Chromium driver - waits fall back to installing the hooks lazily
+        pass
+    ensure_page_instrumentation(driver)
+
+
+def ensure_page_instrumentation(driver):
+    driver.execute_script(PAGE_INSTRUMENTATION_JS)
+
+
+def wait_for_page_ready(driver, timeout=15, replaces=None):
+    """Wait for document.readyState == 'complete'"""
+    return wait_until(
+        'page_ready',
+        lambda: driver.execute_script("return document.readyState") == 'complete',
+        timeout, replaces=replaces
+    )
+
+
+def wait_for_url_change(driver, old_url, timeout=10, replaces=None):
+    """Wait until the URL differs from old_url; returns the new URL"""
+    def changed():
+        url = driver.current_url
+        return url if url != old_url else None
+    return wait_until('url_changed', changed, timeout, replaces=replaces)
+
+
+def wait_for_url_contains(driver, fragment, timeout=10, replaces=None):
+    """Wait until the URL contains fragment; returns the URL"""
+    def contains():
+        url = driver.current_url
+        return url if fragment in url else None
+    return wait_until('url_contains', contains, timeout, replaces=replaces)
+
+
+def count_elements(driver, by, selector):
+    return len(driver.find_elements(by, selector))
+
+
+def wait_for_element_count_change(driver, by, selector, previous_count, timeout=10, replaces=None):
+    """Wait until the number of matching elements differs from previous_count; returns the new count"""
+    def changed():
+        count = count_elements(driver, by, selector)
+        # Wrapped so a new count of 0 is still a truthy result
+        return (count,) if count != previous_count else None
+    result = wait_until('element_count_changed', changed, timeout, replaces=replaces)
+    return result[0] if result else None
+
+
+def wait_for_element_count_at_least(driver, by, selector, minimum=1, timeout=10, replaces=None):
+    """Wait until at least `minimum` elements match; returns the elements"""
+    def enough():
+        elements = driver.find_elements(by, selector)
+        return elements if len(elements) >= minimum else None
+    return wait_until('element_count_at_least', enough, timeout, replaces=replaces)
+
+
+def get_cart_count(driver):
+    """Item count shown on the cart button, or None if it isn't visible"""
+    try:
+        return driver.execute_script(CART_COUNT_JS)
+    except Exception:
+        return None
+
+
+def wait_for_cart_increment(driver, previous_count, timeout=5, replaces=None):
+    """Wait until the cart badge shows more items than previous_count (None = empty cart)"""
+    baseline = previous_count or 0
+    def incremented():
+        count = get_cart_count(driver)
+        return count if count is not None and count > baseline else None
+    return wait_until('cart_incremented', incremented, timeout, replaces=replaces)
+
+
+def wait_for_network_idle(driver, idle_ms=300, timeout=10, replaces=None):
+    """Wait until no fetch/XHR has been in flight for idle_ms"""
+    ensure_page_instrumentation(driver)
+    return wait_until(
+        'network_idle',
+        lambda: driver.execute_script(
+            "return window.__ktInflight === 0 && performance.now() - window.__ktLastNetwork >= arguments[0];",
+            idle_ms
+        ),
+        timeout, replaces=replaces
+    )
+
+
+def wait_for_dom_quiet(driver, quiet_ms=300, timeout=10, replaces=None):
+    """Wait until the DOM hasn't mutated for quiet_ms"""
+    ensure_page_instrumentation(driver)
+    return wait_until(
+        'dom_quiet',
+        lambda: driver.execute_script(
+            "return performance.now() - window.__ktLastMutation >= arguments[0];",
+            quiet_ms
+        ),
+        timeout, replaces=replaces
+    )
+
+
+def is_stale(element):
+    """True once the element has been detached from the document (its list re-rendered)"""
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+def url_query(url):
+    """The search query (?q=) in a URL, normalised for comparison; None if there is none"""
+    values = parse_qs(urlparse(url).query).get('q')
+    return ' '.join(values[0].lower().split()) if values else None
+
+
+def wait_for_search_change(driver, old_url, old_first_result, query, find_first_result, timeout=10, replaces=None):
+    """
+    Wait for a sign that the page moved on to a new search, so results of the previous one are never
+    mistaken for it: the URL changed to this query, the old first result was detached, or - when
+    there were no results before - a first result appeared. find_first_result() returns the current
+    first result or None. Returns 'url', 'stale' or 'rendered', or None on timeout.
+    """
+    wanted = ' '.join(query.lower().split())
+
+    def changed():
+        url = driver.current_url
+        if url != old_url and url_query(url) == wanted:
+            return 'url'
+        if old_first_result is not None:
+            return 'stale' if is_stale(old_first_result) else None
+        return 'rendered' if find_first_result() is not None else None
+    return wait_until('search_changed', changed, timeout, replaces=replaces)
@@ -0,0 +1,141 @@
+"""
+Micro-batching for AI parse requests.
+
+Every AI parse carries the same large system prompt. When several users send
+lists at the same moment, the batcher collects the requests that arrive within
+a short window and sends them as one request (the lists are tagged sections of
+a single user message), then hands each caller its own slice of the answer.
+
+No background thread is needed: the first caller to open a batch is its leader.
+It waits for the window to pass (or the batch to fill), sends the batch, and
+wakes the others. A full batch is closed at once, so later callers start a new one.
+"""
+
+import logging
+import threading
+import time
+
+from latency_stats import LatencyStats
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+class _Request:
+    def __init__(self, text):
+        self.text = text
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Batch:
+    def __init__(self):
+        self.requests = []
+        self.full = threading.Event()
+
+
+class ParseBatcher:
+    def __init__(self, send_batch, window=0.05, max_batch=8, prompt_tokens=0, batch_overhead_tokens=0):
+        if max_batch < 1:
+            raise ValueError("Batch size must be at least 1")
+
+        # send_batch(texts) -> one result per text, in order
+        self.send_batch = send_batch
+        self.window = window
+        self.max_batch = max_batch
+        # Tokens of the shared system prompt; each extra request in a batch saves this many
+        self.prompt_tokens = prompt_tokens
+        # Extra instructions a multi-request batch adds to the prompt
+        self.batch_overhead_tokens = batch_overhead_tokens
+        self.timings = LatencyStats()
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._open = None
+        self._stats = {
+            'batches': 0,
+            'requests': 0,
+            'largest_batch': 0,
+            'prompt_tokens_saved': 0,
+            'failed_batches': 0,
+        }
+
+    def submit(self, text):
+        """Parse text as part of a batch; blocks until the batch returns"""
+        request = _Request(text)
+        if self.window <= 0 or self.max_batch == 1:
+            self._send([request])
+            return self._result(request)
+
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.requests.append(request)
+            if len(batch.requests) >= self.max_batch:
+                # Full: close it so the next caller starts a new batch
+                self._open = None
+                batch.full.set()
+
+        if not leader:
+            request.done.wait()
+        else:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._send(batch.requests)
+
+        return self._result(request)
+
+    @staticmethod
+    def _result(request):
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _send(self, requests):
+        """Send one batch and deliver results to every request in it"""
+        start = time.monotonic()
+        try:
+            results = self.send_batch([request.text for request in requests])
+            if len(results) != len(requests):
+                raise ValueError(f"Batch returned {len(results)} results for {len(requests)} requests")
+            for request, result in zip(requests, results):
+                request.result = result
+            ok = True
+        except Exception as e:
+            self.logger.error(f"❌ Parse batch of {len(requests)} failed: {e}")
+            for request in requests:
+                request.error = e
+            ok = False
+        finally:
+            for request in requests:
+                request.done.set()
+
+        self.timings.record('batch', time.monotonic() - start, ok=ok)
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['requests'] += len(requests)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(requests))
+            if len(requests) > 1:
+                self._stats['prompt_tokens_saved'] += (len(requests) - 1) * self.prompt_tokens - self.batch_overhead_tokens
+            if not ok:
+                self._stats['failed_batches'] += 1
+        return [request.result for request in requests]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'window': self.window,
+            'max_batch': self.max_batch,
+            'avg_batch_size': round(stats['requests'] / stats['batches'], 2) if stats['batches'] else None,
+            'prompt_tokens_saved_per_batch': round(stats['prompt_tokens_saved'] / stats['batches'], 1) if stats['batches'] else None,
+            'timings': self.timings.summary(),
+        })
+        return stats
@@ -0,0 +1,225 @@
+"""
+Two-level cache for parsed grocery lists.
+
+Users send the same lists over and over ("milk", "2 kg onions, 1 kg tomatoes"),
+and each one used to cost a full LLM round trip. Parsed items are cached under
+the normalized message text:
+
+  * level 1 - in-process LRU (OrderedDict), answers in microseconds
+  * level 2 - SQLite file, survives restarts and is shared by every worker process
+
+Both levels expire entries after `ttl` seconds. The memory level holds at most
+`memory_size` entries; the disk level is trimmed back to `max_entries` (least
+recently used first) whenever it grows past that.
+
+The same class backs the per-line memo (`line_cache`): it keys single lines
+instead of whole messages and keeps them in its own table of the same file.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Run the disk trim at most once per this many writes
+TRIM_EVERY = 50
+
+
+def normalize_message(text):
+    """Cache key: lowercased, whitespace collapsed, blank lines dropped (line breaks kept - each line is an item)"""
+    lines = [re.sub(r'\s+', ' ', line).strip().lower() for line in (text or '').split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+class ParseCache:
+    def __init__(self, path=None, memory_size=512, max_entries=10000, ttl=DEFAULT_TTL, table='parse_cache'):
+        if not re.match(r'^[a-z_]+$', table):
+            raise ValueError(f"Invalid parse cache table name: {table}")
+
+        self.path = path
+        self.table = table
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._conn = None
+        self._writes = 0
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expired': 0,
+        }
+
+        if path:
+            self._open()
+
+    def _open(self):
+        try:
+            # Both caches share one file; wait out the other connection's writes instead of failing
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " items TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ Parse cache disk store unavailable ({self.path}): {e}")
+            self._conn = None
+
+    def get(self, text):
+        """Cached items for a message, or None; every call returns a fresh copy"""
+        key = normalize_message(text)
+        if not key:
+            return None
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                payload, created_at = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return json.loads(payload)
+                del self._memory[key]
+                self._stats['expired'] += 1
+
+            row = self._disk_get(key, now)
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+
+            payload, created_at = row
+            self._remember(key, payload, created_at)
+            self._stats['disk_hits'] += 1
+            return json.loads(payload)
+
+    def put(self, text, items):
+        """Store parsed items for a message"""
+        key = normalize_message(text)
+        if not key:
+            return
+        payload = json.dumps(items, separators=(',', ':'))
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, payload, now)
+            self._stats['stores'] += 1
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, items, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, payload, now, now)
+                )
+                self._conn.commit()
+                self._writes += 1
+                if self._writes % TRIM_EVERY == 0:
+                    self._trim_disk(now)
+            except sqlite3.Error as e:
+                self.logger.warning(f"⚠️ Could not write parse cache entry: {e}")
+
+    def _remember(self, key, payload, created_at):
+        """Insert into the memory LRU (caller holds the lock)"""
+        self._memory[key] = (payload, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_get(self, key, now):
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                f"SELECT items, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats['expired'] += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ Could not read parse cache entry: {e}")
+            return None
+
+    def _trim_disk(self, now):
+        """Drop expired rows, then the least recently used beyond max_entries (caller holds the lock)"""
+        cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE created_at <= ?", (now - self.ttl,))
+        self._stats['expired'] += max(cursor.rowcount, 0)
+        cursor = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f" SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self._stats['evictions'] += max(cursor.rowcount, 0)
+        self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else None
+            if self._conn is not None:
+                try:
+                    stats['disk_entries'] = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+                except sqlite3.Error:
+                    stats['disk_entries'] = None
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.table}")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _cache_path():
+    """PARSE_CACHE_PATH; set it to an empty string for a memory-only cache"""
+    path = os.environ.get('PARSE_CACHE_PATH', 'parse_cache.sqlite3')
+    return os.path.abspath(path) if path else None
+
+
+# Shared caches used by the app: whole messages, and single lines for partially repeated lists
+parse_cache = ParseCache(
+    _cache_path(),
+    memory_size=int(os.environ.get('PARSE_CACHE_SIZE', '512')),
+    max_entries=int(os.environ.get('PARSE_CACHE_MAX_ENTRIES', '10000')),
+    ttl=float(os.environ.get('PARSE_CACHE_TTL', str(DEFAULT_TTL)))
+)
+line_cache = ParseCache(
+    _cache_path(),
+    memory_size=int(os.environ.get('PARSE_CACHE_SIZE', '512')) * 4,
+    max_entries=int(os.environ.get('PARSE_CACHE_MAX_ENTRIES', '10000')) * 4,
+    ttl=float(os.environ.get('PARSE_CACHE_TTL', str(DEFAULT_TTL))),
+    table='line_cache'
+)
@@ -0,0 +1,225 @@
+"""
+Bounded background worker pool for grocery-list parsing.
+
+Parsing calls out to the LLM, which can take seconds. Running it inside the
+Socket.IO handler ties up that handler (and, on a single worker, every other
+client) for the whole completion. The queue runs parses on a fixed number of
+worker threads instead and hands the result to a callback.
+
+Two limits stop a slow LLM from starving the server:
+  * max_pending - submissions beyond this many queued + running jobs are
+    rejected straight away with ParseQueueFull
+  * timeout     - a job not finished within this many seconds of submission is
+    answered with the fallback parser; the late LLM result is discarded
+
+A job may also be upgraded: parse can hand back a better result after the job
+was answered (a hedged parse whose AI call missed its deadline). Upgrades are
+always delivered after the job's callback.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from latency_stats import LatencyStats
+
+PARSE_OK = 'ok'
+PARSE_TIMEOUT = 'timeout'
+PARSE_ERROR = 'error'
+
+
+class ParseQueueFull(Exception):
+    """Raised when too many parses are already queued or running"""
+
+
+class ParseJob:
+    """One submitted message plus its completion bookkeeping"""
+
+    def __init__(self, text, callback, timeout, progress=None, upgrade=None):
+        self.text = text
+        self.callback = callback
+        self.progress = progress
+        self.upgrade = upgrade
+        self.pending_upgrade = None
+        self.answered = False
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + timeout
+        self.timer = None
+        self.done = False
+
+
+class ParseQueue:
+    def __init__(self, parse, fallback=None, workers=4, max_pending=32, timeout=20):
+        if workers < 1:
+            raise ValueError("Parse queue needs at least 1 worker")
+
+        # parse(text) -> items; fallback(text) -> items, used on timeout or error
+        self.parse = parse
+        self.fallback = fallback or (lambda text: [])
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.timings = LatencyStats()
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._running = 0
+        self._threads = []
+        self._closed = False
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'rejected': 0,
+            'upgraded': 0,
+        }
+
+    def _start_workers(self):
+        """Worker threads are started on first use so importing app stays cheap"""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"parse-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, text, callback, progress=None, upgrade=None):
+        """
+        Queue text for parsing; callback(items, status) is called exactly once.
+        progress(items), if given, is passed to parse for partial results and is muted once the job is answered.
+        upgrade(items), if given, is passed to parse as on_upgrade for late results and only fires after callback.
+        """
+        with self._cond:
+            if self._closed:
+                raise ParseQueueFull("Parse queue is shut down")
+            if len(self._queue) + self._running >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise ParseQueueFull(f"{self.max_pending} parses already pending")
+
+            job = ParseJob(text, callback, self.timeout, progress, upgrade)
+            job.timer = threading.Timer(self.timeout, self._expire, args=(job,))
+            job.timer.daemon = True
+            self._queue.append(job)
+            self._stats['submitted'] += 1
+            self._start_workers()
+            self._cond.notify()
+
+        job.timer.start()
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                job = self._queue.popleft()
+                if job.done:
+                    # Already answered by the timeout while it sat in the queue
+                    continue
+                self._running += 1
+
+            self.timings.record('queue_wait', time.monotonic() - job.submitted_at)
+            start = time.monotonic()
+            try:
+                kwargs = {}
+                if job.progress is not None:
+                    kwargs['progress'] = lambda partial, job=job: self._progress(job, partial)
+                if job.upgrade is not None:
+                    kwargs['on_upgrade'] = lambda late, job=job: self._upgrade(job, late)
+                items = self.parse(job.text, **kwargs)
+                status = PARSE_OK
+            except Exception as e:
+                self.logger.error(f"❌ Background parse failed: {e}")
+                items = None
+                status = PARSE_ERROR
+            finally:
+                with self._cond:
+                    self._running -= 1
+            self.timings.record('parse', time.monotonic() - start, ok=status == PARSE_OK)
+
+            if status == PARSE_ERROR:
+                self._finish(job, self._fallback(job.text), PARSE_ERROR)
+            else:
+                self._finish(job, items, PARSE_OK)
+
+    def _progress(self, job, items):
+        if job.done:
+            return
+        try:
+            job.progress(items)
+        except Exception as e:
+            self.logger.error(f"❌ Parse progress callback failed: {e}")
+
+    def _upgrade(self, job, items):
+        with self._cond:
+            if not job.answered:
+                # Parse finished late but the worker has not answered yet; deliver after the callback
+                job.pending_upgrade = items
+                return
+            self._stats['upgraded'] += 1
+        self._deliver_upgrade(job, items)
+
+    def _deliver_upgrade(self, job, items):
+        try:
+            job.upgrade(items)
+        except Exception as e:
+            self.logger.error(f"❌ Parse upgrade callback failed: {e}")
+
+    def _expire(self, job):
+        """Timer callback: answer a slow job with the fallback parser"""
+        if job.done:
+            return
+        self.logger.warning(f"⏰ Parse timed out after {self.timeout}s, using fallback parsing")
+        self._finish(job, self._fallback(job.text), PARSE_TIMEOUT)
+
+    def _fallback(self, text):
+        try:
+            return self.fallback(text)
+        except Exception as e:
+            self.logger.error(f"❌ Fallback parse failed: {e}")
+            return []
+
+    def _finish(self, job, items, status):
+        with self._cond:
+            if job.done:
+                # The other side (worker or timer) got there first
+                return
+            job.done = True
+            self._stats[{PARSE_OK: 'completed', PARSE_TIMEOUT: 'timed_out', PARSE_ERROR: 'failed'}[status]] += 1
+        job.timer.cancel()
+        self.timings.record('total', time.monotonic() - job.submitted_at, ok=status == PARSE_OK)
+
+        try:
+            job.callback(items, status)
+        except Exception as e:
+            self.logger.error(f"❌ Parse callback failed: {e}")
+
+        with self._cond:
+            job.answered = True
+            upgrade, job.pending_upgrade = job.pending_upgrade, None
+            if upgrade is not None:
+                self._stats['upgraded'] += 1
+        if upgrade is not None:
+            self._deliver_upgrade(job, upgrade)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'timeout': self.timeout,
+                'queued': len(self._queue),
+                'running': self._running,
+            })
+        stats['timings'] = self.timings.summary()
+        return stats
+
+    def shutdown(self):
+        """Stop accepting work; workers exit once the queue drains"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
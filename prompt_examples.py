@@ -0,0 +1,201 @@
+"""
+Few-shot example selection for the AI parsing prompt.
+
+The parse prompt used to carry every worked example on every call, so a
+one-word message paid for the whole set. ExampleIndex keeps the examples as
+data, describes each one (and each incoming message) by a small set of
+features - unit words, line count, number words vs digits, several items on a
+line, Hinglish, no quantity at all - and builds a prompt holding only the k
+examples that share the most weighted features with the message.
+
+Selection is a few set intersections over a dozen examples (microseconds), so
+the prompt is built per request. stats() reports how many prompt tokens the
+compact prompts saved against sending every example.
+"""
+
+import json
+import re
+import threading
+import time
+
+from latency_stats import LatencyStats
+from local_parser import HINGLISH_NUMBERS, HINGLISH_WORDS, NUMBER_WORDS, UNITS
+from parse_batcher import estimate_tokens
+
+DEFAULT_EXAMPLE_COUNT = 3
+
+UNIT_WORDS = frozenset(UNITS)
+FILLER_START = re.compile(r'^\s*(i need|i want|get|please|buy|order|add)\b', re.IGNORECASE)
+WORD = re.compile(r"[a-z]+")
+
+# Weight of each feature; units score per unit word
+FEATURE_WEIGHTS = {
+    'multiline': 3.0,
+    'lines': 1.0,
+    'hinglish': 3.0,
+    'multi_item': 2.0,
+    'number_word': 2.0,
+    'no_quantity': 2.0,
+    'digits': 1.0,
+    'filler': 1.0,
+    'unit': 1.0,
+}
+
+
+def _item(name, quantity, unit, category, line=1):
+    return {"name": name, "quantity": quantity, "unit": unit, "category": category, "line": line}
+
+
+# The worked examples, in the order they appear in the full prompt
+EXAMPLES = (
+    ("I need 2 kg potatoes, 1 dozen eggs, and 3 packets of bread",
+     [_item("potatoes", 2, "kg", "vegetables"), _item("eggs", 1, "dozen", "dairy"), _item("bread", 3, "packets", "bakery")]),
+    ("milk 1 liter, bananas 5 pieces, rice 2 kg",
+     [_item("milk", 1, "liter", "dairy"), _item("bananas", 5, "pieces", "fruits"), _item("rice", 2, "kg", "grains")]),
+    ("one packet amul toned milk",
+     [_item("amul toned milk", 1, "packet", "dairy")]),
+    ("2 kg onions, 1 kg tomatoes",
+     [_item("onions", 2, "kg", "vegetables"), _item("tomatoes", 1, "kg", "vegetables")]),
+    ("three packets heritage milk",
+     [_item("heritage milk", 3, "packets", "dairy")]),
+    ("500 g paneer",
+     [_item("paneer", 500, "g", "dairy")]),
+    ("get the usual atta",
+     [_item("atta", 1, "pieces", "grains")]),
+    ("ek packet doodh aur 2 kilo aloo",
+     [_item("milk", 1, "packet", "dairy"), _item("potatoes", 2, "kg", "vegetables")]),
+    ("one packet amul toned milk\nbanana",
+     [_item("amul toned milk", 1, "packet", "dairy"), _item("banana", 1, "pieces", "fruits", line=2)]),
+    ("2 kg potatoes\n1 dozen eggs\n3 packets bread",
+     [_item("potatoes", 2, "kg", "vegetables"), _item("eggs", 1, "dozen", "dairy", line=2),
+      _item("bread", 3, "packets", "bakery", line=3)]),
+    ("aadha kilo pyaaz\ndhaniya",
+     [_item("onions", 0.5, "kg", "vegetables"), _item("coriander", 1, "pieces", "vegetables", line=2)]),
+)
+
+
+def _unit_key(word):
+    """Singular unit so "packets" and "packet" count as the same feature"""
+    return word[:-1] if word.endswith('s') and word not in ('g', 'gms') else word
+
+
+def message_features(text):
+    """Feature tags of a message (or example input)"""
+    lines = [line for line in text.lower().split('\n') if line.strip()]
+    words = WORD.findall(text.lower())
+    features = set()
+
+    count = len(lines)
+    features.add('lines:1' if count <= 1 else 'lines:2-3' if count <= 3 else 'lines:4+')
+    if count > 1:
+        features.add('multiline')
+    features.update(f"unit:{_unit_key(word)}" for word in words if word in UNIT_WORDS)
+    has_digits = any(char.isdigit() for char in text)
+    has_number_word = any(word in NUMBER_WORDS or word in HINGLISH_NUMBERS for word in words)
+    if has_digits:
+        features.add('digits')
+    if has_number_word:
+        features.add('number_word')
+    if any(word in HINGLISH_WORDS for word in words):
+        features.add('hinglish')
+    if not has_digits and not has_number_word:
+        features.add('no_quantity')
+    if any(',' in line or re.search(r'\b(and|aur)\b', line) for line in lines):
+        features.add('multi_item')
+    if FILLER_START.match(text):
+        features.add('filler')
+    return frozenset(features)
+
+
+def _weight(feature):
+    return FEATURE_WEIGHTS.get(feature.split(':', 1)[0], 1.0)
+
+
+def _weights(features):
+    return sum(_weight(feature) for feature in features)
+
+
+def format_example(text, items):
+    """One worked example in the prompt's "- input / - Output: json" layout"""
+    shown = text.replace('\n', '\n  ')
+    return f'- "{shown}"\n- Output: {json.dumps(items)}'
+
+
+class ExampleIndex:
+    def __init__(self, examples=EXAMPLES, k=DEFAULT_EXAMPLE_COUNT):
+        # (text, items, features, formatted) - formatting is done once, selection only joins strings
+        self.examples = [(text, items, message_features(text), format_example(text, items)) for text, items in examples]
+        self._totals = [_weights(example[2]) for example in self.examples]
+        self.k = k
+        self.timings = LatencyStats()
+        self._full_tokens = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'prompts': 0,
+            'examples_sent': 0,
+            'prompt_tokens': 0,
+            'full_prompt_tokens': 0,
+        }
+
+    def select(self, text, k=None):
+        """The k examples whose features best match text's, in their original order (index entries)"""
+        k = self.k if k is None else k
+        features = message_features(text)
+        scored = []
+        for position, (_, _, example_features, _) in enumerate(self.examples):
+            # Shared features count for an example; features the message lacks count half against it
+            shared = _weights(features & example_features)
+            scored.append((-(shared - 0.5 * (self._totals[position] - shared)), position))
+        chosen = sorted(position for _, position in sorted(scored)[:k])
+        return [self.examples[position] for position in chosen]
+
+    def examples_block(self, examples=None):
+        """Formatted examples (entries of self.examples); all of them when examples is None"""
+        if examples is None:
+            examples = self.examples
+        single = [formatted for text, _, _, formatted in examples if '\n' not in text]
+        multi = [formatted for text, _, _, formatted in examples if '\n' in text]
+        block = "Examples:\n" + '\n\n'.join(single) if single else ""
+        if multi:
+            block += ("\n\n" if block else "") + "MULTI-LINE EXAMPLES (each line is a separate item):\n" + '\n\n'.join(multi)
+        return block
+
+    def full_prompt(self, header, footer):
+        """The prompt with every example (what was sent before selection)"""
+        return f"{header}\n\n{self.examples_block()}\n\n{footer}"
+
+    def compact_prompt(self, header, footer, text, k=None):
+        """Prompt holding only the examples closest to text (not counted in stats)"""
+        examples = self.select(text, k)
+        return f"{header}\n\n{self.examples_block(examples)}\n\n{footer}", len(examples)
+
+    def build_prompt(self, header, footer, text, k=None):
+        """Per-request prompt holding only the examples closest to text"""
+        start = time.monotonic()
+        prompt, example_count = self.compact_prompt(header, footer, text, k)
+        self.timings.record('build', time.monotonic() - start)
+
+        full_tokens = self._full_tokens.get((header, footer))
+        if full_tokens is None:
+            full_tokens = self._full_tokens[(header, footer)] = estimate_tokens(self.full_prompt(header, footer))
+        with self._lock:
+            self._stats['prompts'] += 1
+            self._stats['examples_sent'] += example_count
+            self._stats['prompt_tokens'] += estimate_tokens(prompt)
+            self._stats['full_prompt_tokens'] += full_tokens
+        return prompt
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        prompts = stats['prompts']
+        saved = stats['full_prompt_tokens'] - stats['prompt_tokens']
+        stats.update({
+            'k': self.k,
+            'examples': len(self.examples),
+            'prompt_tokens_saved': saved,
+            'saved_ratio': round(saved / stats['full_prompt_tokens'], 3) if stats['full_prompt_tokens'] else None,
+            'avg_prompt_tokens': round(stats['prompt_tokens'] / prompts, 1) if prompts else None,
+            'timings': self.timings.summary(),
+        })
+        return stats
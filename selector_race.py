@@ -0,0 +1,126 @@
+"""
+Single-round-trip selector racing.
+
+The automation keeps lists of fallback selectors for every button it clicks.
+Trying them one by one behind separate WebDriverWaits means a stale first
+selector costs its full timeout. race_selectors() ships the whole candidate
+list to the page in one execute_async_script call; a MutationObserver re-checks
+all candidates on every DOM change and resolves with the first one (in list
+order) that matches.
+"""
+
+from selenium.common.exceptions import WebDriverException
+
+# Selenium script timeout (seconds) set on first use, comfortably above any single race
+MIN_SCRIPT_TIMEOUT = 60
+
+# arguments: [selectors], condition, timeoutMs, callback
+# Each selector is [kind, expression] with kind "xpath" or "css".
+RACE_SELECTORS_JS = """
+var selectors = arguments[0];
+var condition = arguments[1];
+var timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var finished = false;
+var observer = null;
+var timer = null;
+var interval = null;
+
+function lookup(selector) {
+    try {
+        if (selector[0] === 'xpath') {
+            return document.evaluate(selector[1], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return document.querySelector(selector[1]);
+    } catch (e) {
+        return null;
+    }
+}
+
+function accepts(el) {
+    if (!el) { return false; }
+    if (condition === 'present') { return true; }
+    var style = window.getComputedStyle(el);
+    var visible = el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    if (condition === 'visible') { return visible; }
+    return visible && !el.disabled && style.pointerEvents !== 'none';
+}
+
+function check() {
+    var matched = [];
+    var winner = null;
+    for (var i = 0; i < selectors.length; i++) {
+        var el = lookup(selectors[i]);
+        if (accepts(el)) {
+            matched.push(i);
+            if (winner === null) { winner = [i, el]; }
+        }
+    }
+    return winner ? [winner[0], winner[1], matched] : null;
+}
+
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    clearInterval(interval);
+    done(result);
+}
+
+var hit = check();
+if (hit) {
+    finish(hit);
+} else {
+    observer = new MutationObserver(function () {
+        var result = check();
+        if (result) { finish(result); }
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    // Visibility can change through CSS alone (transitions), which no mutation reports
+    interval = setInterval(function () {
+        var result = check();
+        if (result) { finish(result); }
+    }, 200);
+    timer = setTimeout(function () { finish(null); }, timeoutMs);
+}
+"""
+
+
+def selector_kind(selector):
+    """XPath expressions start with '/' or '('; anything else is treated as CSS"""
+    return 'xpath' if selector.lstrip().startswith(('/', '(')) else 'css'
+
+
+def ensure_script_timeout(driver, seconds):
+    """
+    Make sure Selenium's async script timeout is at least `seconds`.
+    Raised once per driver (and only when a longer wait needs it) so later calls stay a single round trip.
+    """
+    if getattr(driver, '_race_script_timeout', 0) < seconds:
+        script_timeout = max(seconds, MIN_SCRIPT_TIMEOUT)
+        driver.set_script_timeout(script_timeout)
+        driver._race_script_timeout = script_timeout
+
+
+def race_selectors(driver, selectors, timeout=10, condition='clickable', with_matches=False):
+    """
+    Wait (inside the page) until any selector matches.
+
+    condition is 'present', 'visible' or 'clickable'.
+    Returns (element, index) of the first matching selector in list order, or (None, -1) on timeout.
+    With with_matches=True a third value lists every index that matched at that moment.
+    """
+    candidates = [[selector_kind(selector), selector] for selector in selectors]
+    try:
+        # Give the in-page timeout room to fire before Selenium's own script timeout does
+        ensure_script_timeout(driver, timeout + 5)
+        result = driver.execute_async_script(RACE_SELECTORS_JS, candidates, condition, int(timeout * 1000))
+    except WebDriverException:
+        # Script timeout, or the document was replaced mid-race (navigation)
+        result = None
+
+    if not result:
+        return (None, -1, []) if with_matches else (None, -1)
+    element, index, matched = result[1], result[0], result[2]
+    return (element, index, matched) if with_matches else (element, index)
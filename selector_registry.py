@@ -0,0 +1,131 @@
+"""
+Adaptive selector ordering with persisted hit statistics.
+
+Blinkit's generated class names change with site deploys. The registry keeps,
+per automation step (fake search bar, search input, cart button, ...), a
+hit/miss/latency record for every selector it has tried, and orders the
+candidates so the selector that currently works is tried first. Scores decay
+exponentially, so a selector that stops working drops down after a few misses
+even if it had a long history of hits.
+
+Counts are persisted to a JSON file so the ordering survives restarts.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+# Score given to a selector that has never been tried (between a fresh hit and a fresh miss)
+UNSEEN_SCORE = 0.5
+
+
+class SelectorRegistry:
+    def __init__(self, path=None, decay=0.7, save_interval=5.0):
+        self.path = path
+        self.decay = decay
+        self.save_interval = save_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._steps = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    def load(self):
+        """Load persisted stats; a missing or corrupt file starts empty"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._steps = data.get('steps', {})
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not load selector stats from {self.path}: {e}")
+
+    def save(self, force=False):
+        """Write stats to disk (atomically); skipped if nothing changed"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty and not force:
+                return
+            payload = json.dumps({'version': 1, 'steps': self._steps}, indent=2)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not save selector stats to {self.path}: {e}")
+
+    def _entry(self, step, selector):
+        return self._steps.setdefault(step, {}).setdefault(selector, {
+            'hits': 0, 'misses': 0, 'score': UNSEEN_SCORE, 'total_latency': 0.0, 'last_hit': None
+        })
+
+    def score(self, step, selector):
+        with self._lock:
+            entry = self._steps.get(step, {}).get(selector)
+            return entry['score'] if entry else UNSEEN_SCORE
+
+    def ordered(self, step, candidates):
+        """Candidates sorted by decayed success score; ties keep the hard-coded order"""
+        with self._lock:
+            known = self._steps.get(step, {})
+            scores = [known[c]['score'] if c in known else UNSEEN_SCORE for c in candidates]
+        order = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))
+        return [candidates[i] for i in order]
+
+    def record(self, step, selector, hit, latency=None):
+        with self._lock:
+            entry = self._entry(step, selector)
+            entry['score'] = self.decay * entry['score'] + (1 - self.decay) * (1.0 if hit else 0.0)
+            if hit:
+                entry['hits'] += 1
+                entry['last_hit'] = time.time()
+                if latency is not None:
+                    entry['total_latency'] += latency
+            else:
+                entry['misses'] += 1
+            self._dirty = True
+            due = time.time() - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def record_race(self, step, candidates, winner_index, matched, latency):
+        """
+        Record the outcome of race_selectors(): the winner gets the latency, other candidates
+        that matched count as hits and the rest as misses. A timeout (-1) is a miss for all.
+        """
+        matched = set(matched or [])
+        for i, selector in enumerate(candidates):
+            if i == winner_index:
+                self.record(step, selector, True, latency)
+            else:
+                self.record(step, selector, i in matched)
+
+    def stats(self):
+        """Per-step summary for /health and debugging"""
+        with self._lock:
+            summary = {}
+            for step, selectors in self._steps.items():
+                summary[step] = []
+                for selector, entry in sorted(selectors.items(), key=lambda kv: -kv[1]['score']):
+                    summary[step].append({
+                        'selector': selector,
+                        'hits': entry['hits'],
+                        'misses': entry['misses'],
+                        'score': round(entry['score'], 3),
+                        'avg_latency': round(entry['total_latency'] / entry['hits'], 3) if entry['hits'] else None,
+                    })
+            return summary
+
+
+# Shared registry used by every BlinkitAutomation instance (pooled browsers included)
+selector_registry = SelectorRegistry(os.getenv('SELECTOR_STATS_PATH', 'selector_stats.json'))
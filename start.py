@@ -4,9 +4,10 @@ Startup script for Kirana Tap - Production Ready
 """
 
 import os
-from app import app, socketio
+from app import app, socketio, prepare_server
 
-if __name__ == '__main__':
+
+def main():
     # Get port from environment variable (Render sets this)
     port = int(os.environ.get('PORT', 5000))
     
@@ -18,5 +19,10 @@ if __name__ == '__main__':
     print(f"🌐 Chat interface at: http://localhost:{port}/")
     print(f"🔧 Debug mode: {debug_mode}")
     
-    # Start the application
+    # Recover interrupted orders and pre-launch pooled browsers, then start the application
+    prepare_server(debug_mode)
     socketio.run(app, debug=debug_mode, host='0.0.0.0', port=port)
+
+
+if __name__ == '__main__':
+    main()
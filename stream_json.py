@@ -0,0 +1,75 @@
+"""
+Incremental extraction of objects from a streamed JSON array.
+
+The AI parser answers with a JSON array of grocery items. When the completion
+is streamed, JSONArrayStream is fed the text as it arrives and hands back each
+item object as soon as its closing brace has been seen, so the first items can
+be shown long before the whole completion is finished.
+
+Text before the opening '[' (prose, ```json fences) and after the closing ']'
+is ignored. Braces and brackets inside strings are handled.
+"""
+
+import json
+
+
+class JSONArrayStream:
+    def __init__(self):
+        self.started = False
+        self.closed = False
+        self.errors = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current = []
+
+    def feed(self, chunk):
+        """Consume a chunk of text; returns the objects completed by it (possibly none)"""
+        completed = []
+        for char in chunk:
+            if self.closed:
+                break
+            if not self.started:
+                if char == '[':
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._depth >= 2:
+                self._current.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 2:
+                    # Start of a top-level element
+                    self._current = [char]
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    item = self._finish()
+                    if item is not None:
+                        completed.append(item)
+                elif self._depth == 0:
+                    self.closed = True
+        return completed
+
+    def _finish(self):
+        text = ''.join(self._current)
+        self._current = []
+        try:
+            item = json.loads(text)
+        except ValueError:
+            self.errors += 1
+            return None
+        return item if isinstance(item, dict) else None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the Socket.IO server async mode setting
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+import conftest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Imports the app in a fresh interpreter (green-thread patching is process-wide) and chats once
+PROBE = """
+import json, app
+client = app.socketio.test_client(app.app)
+client.emit('chat_message', {'message': 'yes'})
+replies = [event['name'] for event in client.get_received()]
+print(json.dumps({'mode': app.SOCKETIO_ASYNC_MODE, 'server': app.socketio.async_mode, 'replies': replies}))
+"""
+
+
+def probe(mode):
+    env = dict(os.environ, **dict(conftest.TEST_ENV, SOCKETIO_ASYNC_MODE=mode))
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True,
+                            text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_unknown_mode_falls_back_to_threading():
+    result = probe('asyncio')
+    assert result['mode'] == result['server'] == 'threading'
+    assert result['replies'] == ['session', 'status', 'chat_response']
+    print("✅ Unknown async modes fall back to threading")
+
+
+def test_eventlet_mode_serves_chat():
+    pytest.importorskip('eventlet')
+    result = probe('eventlet')
+    assert result['mode'] == result['server'] == 'eventlet'
+    assert result['replies'] == ['session', 'status', 'chat_response']
+    print("✅ The app runs on eventlet green threads")
+
+
+def test_gunicorn_eventlet_worker_boots_and_recovers_orders(tmp_path):
+    pytest.importorskip('eventlet')
+    pytest.importorskip('gunicorn')
+    from order_state import PENDING, QUEUED
+    from order_store import open_order_store
+
+    path = str(tmp_path / 'orders.sqlite3')
+    store = open_order_store(path)
+    store.create("queued", [{"name": "milk", "quantity": 1, "unit": "packet", "category": "dairy"}])
+    store.transition("queued", QUEUED)
+    store.close()
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    # The README's production command; gunicorn.conf.py is picked up from the working directory
+    env = dict(os.environ, **dict(conftest.TEST_ENV, SOCKETIO_ASYNC_MODE='eventlet', ORDER_STORE_PATH=path))
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-k', 'eventlet', '-w', '1',
+                               '-b', f'127.0.0.1:{port}', 'app:app'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        health = None
+        deadline = time.monotonic() + 60
+        while health is None and time.monotonic() < deadline and server.poll() is None:
+            try:
+                health = requests.get(f"http://127.0.0.1:{port}/health", timeout=1).json()
+            except (requests.RequestException, ValueError):
+                time.sleep(0.2)
+    finally:
+        server.terminate()
+        server.wait(10)
+    assert health is not None and health['async_mode'] == 'eventlet'
+    store = open_order_store(path)
+    assert store.get("queued")['status'] == PENDING
+    store.close()
+    print("✅ gunicorn's eventlet worker boots and recovers interrupted orders")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm browser pool (no Chrome needed - uses a fake automation)
+"""
+
+import threading
+
+from browser_pool import BrowserPool, BrowserPoolError
+
+
+class FakeAutomation:
+    """Stands in for BlinkitAutomation's session API"""
+
+    def __init__(self, profile_dir):
+        self.profile_dir = profile_dir
+        self.alive = False
+        self.setup_calls = 0
+        self.resets = 0
+
+    def setup_driver(self):
+        self.setup_calls += 1
+        self.alive = True
+        return True
+
+    def navigate_to_blinkit(self):
+        return True
+
+    def is_browser_alive(self):
+        return self.alive
+
+    def reset_to_home(self):
+        self.resets += 1
+        return True
+
+    def close(self):
+        self.alive = False
+
+
+def make_pool(tmp_path, **kwargs):
+    created = []
+
+    def factory(profile_dir):
+        automation = FakeAutomation(profile_dir)
+        created.append(automation)
+        return automation
+
+    pool = BrowserPool(base_profile_dir=str(tmp_path / "chrome-profile"), factory=factory, **kwargs)
+    return pool, created
+
+
+def test_browser_is_reused_between_orders(tmp_path):
+    """Second checkout gets the same warm browser, reset to the homepage"""
+    pool, created = make_pool(tmp_path, size=1, max_uses=5)
+
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    assert first.setup_calls == 1
+    assert first.resets == 2
+    assert pool.stats()['warm_checkouts'] == 1
+    print("✅ Warm browser reused between orders")
+
+
+def test_browser_retired_after_max_uses(tmp_path):
+    """A browser is quit and replaced once it reaches max_uses"""
+    pool, created = make_pool(tmp_path, size=1, max_uses=2)
+
+    for _ in range(3):
+        with pool.session():
+            pass
+
+    assert len(created) == 2
+    assert created[0].alive is False
+    assert pool.stats()['retired_max_uses'] == 1
+    print("✅ Browser retired after max uses")
+
+
+def test_dead_browser_replaced_on_checkout(tmp_path):
+    """A browser that crashed while idle fails the health check and is relaunched"""
+    pool, created = make_pool(tmp_path, size=1, max_uses=10)
+    pool.warm()
+    created[0].alive = False
+
+    with pool.session() as automation:
+        assert automation is created[1]
+
+    assert pool.stats()['retired_unhealthy'] == 1
+    print("✅ Dead browser replaced on checkout")
+
+
+def test_failed_order_retires_browser(tmp_path):
+    """An exception inside the session marks the browser unhealthy"""
+    pool, created = make_pool(tmp_path, size=1, max_uses=10)
+
+    try:
+        with pool.session():
+            raise RuntimeError("automation blew up")
+    except RuntimeError:
+        pass
+
+    assert created[0].alive is False
+    assert pool.stats()['idle'] == 0
+    print("✅ Failed order retires its browser")
+
+
+def test_slots_get_separate_profiles(tmp_path):
+    """Concurrent checkouts never share a Chrome profile directory"""
+    pool, created = make_pool(tmp_path, size=2, max_uses=10)
+    (tmp_path / "chrome-profile").mkdir()
+    (tmp_path / "chrome-profile" / "Preferences").write_text("{}")
+    (tmp_path / "chrome-profile" / "SingletonLock").write_text("")
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    assert first.automation.profile_dir != second.automation.profile_dir
+    assert (tmp_path / "chrome-profile-pool-1" / "Preferences").exists()
+    assert not (tmp_path / "chrome-profile-pool-1" / "SingletonLock").exists()
+    pool.release(first)
+    pool.release(second)
+    print("✅ Pool slots use separate profiles")
+
+
+def test_acquire_waits_for_release(tmp_path):
+    """When every browser is busy, acquire blocks until one comes back"""
+    pool, _ = make_pool(tmp_path, size=1, max_uses=10)
+    browser = pool.acquire()
+
+    try:
+        pool.acquire(timeout=0.1)
+        assert False, "acquire should time out while the only browser is checked out"
+    except BrowserPoolError:
+        pass
+
+    threading.Timer(0.1, pool.release, args=(browser,)).start()
+    assert pool.acquire(timeout=2) is browser
+    print("✅ Acquire waits for a released browser")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    print("🧪 Testing Browser Pool...")
+    print("=" * 50)
+    for test in [
+        test_browser_is_reused_between_orders,
+        test_browser_retired_after_max_uses,
+        test_dead_browser_replaced_on_checkout,
+        test_failed_order_retires_browser,
+        test_slots_get_separate_profiles,
+        test_acquire_waits_for_release,
+    ]:
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
+    print("=" * 50)
+    print("🎉 Browser pool tests passed!")
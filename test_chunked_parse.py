@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for chunked parallel AI parsing of long grocery lists
+"""
+
+import threading
+import time
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import app
+
+# Free-text lines so none are resolved by the local parser
+LINES = [f"need the usual brand number {n} thing" for n in range(1, 31)]
+
+
+def fake_single(calls, fail_first=(), fail_always=(), delay=0.2):
+    """AI stand-in: one item per line named after the line's number; chosen chunks fail"""
+    lock = threading.Lock()
+    attempts = {}
+
+    def request_ai_parse_single(text):
+        chunk = text.split('\n')
+        first = chunk[0]
+        with lock:
+            calls.append(len(chunk))
+            attempts[first] = attempts.get(first, 0) + 1
+        time.sleep(delay)
+        if first in fail_always or (first in fail_first and attempts[first] == 1):
+            raise RuntimeError("LLM hiccup")
+        return [{"name": line.split()[5], "quantity": 1, "unit": "pieces", "category": "general", "line": n}
+                for n, line in enumerate(chunk, start=1)]
+    return request_ai_parse_single
+
+
+# 30 lines in chunks of up to 12, one retry per chunk
+CHUNKING = {'PARSE_CHUNK_LINES': 12, 'PARSE_CHUNK_RETRIES': 1}
+
+
+def test_chunks_are_even_and_line_aligned():
+    assert app.split_into_chunks(30, 12) == [(0, 10), (10, 20), (20, 30)]
+    assert app.split_into_chunks(5, 12) == [(0, 5)]
+    assert app.split_into_chunks(13, 12) == [(0, 7), (7, 13)]
+    print("✅ Long lists split into even line-aligned chunks")
+
+
+def test_chunks_parsed_in_parallel_and_merged_in_order(parse_app):
+    calls = []
+    parse_app(request_ai_parse_single=fake_single(calls), **CHUNKING)
+
+    start = time.monotonic()
+    items = app.parse_grocery_list('\n'.join(LINES))
+    elapsed = time.monotonic() - start
+
+    assert sorted(calls) == [10, 10, 10]
+    assert [item['name'] for item in items] == [str(n) for n in range(1, 31)]
+    # Three 0.2s chunks in parallel take about one round trip, not three
+    assert elapsed < 0.5
+    print(f"✅ 30 lines parsed as 3 parallel chunks in {elapsed:.2f}s, order preserved")
+
+
+def test_failed_chunk_is_retried(parse_app):
+    calls = []
+    parse_app(request_ai_parse_single=fake_single(calls, fail_first=(LINES[10],), delay=0), **CHUNKING)
+    items = app.parse_grocery_list('\n'.join(LINES))
+
+    assert len(calls) == 4
+    assert [item['name'] for item in items] == [str(n) for n in range(1, 31)]
+    assert app.chunk_timings.summary()['retry']['count'] == 1
+    print("✅ Failed chunk retried once and merged")
+
+
+def test_chunk_that_keeps_failing_falls_back_alone(parse_app):
+    calls = []
+    parse_app(request_ai_parse_single=fake_single(calls, fail_always=(LINES[20],), delay=0), **CHUNKING)
+    items = app.parse_grocery_list('\n'.join(LINES))
+
+    assert [item['name'] for item in items[:20]] == [str(n) for n in range(1, 21)]
+    # The last chunk's lines come from the fallback parser; other chunks keep their AI items
+    assert (items[20]['name'], items[20]['quantity']) == ("the usual brand number thing", 21)
+    assert app.line_cache.get(LINES[0]) is not None
+    assert app.line_cache.get(LINES[20]) is None
+    print("✅ Only the failing chunk used the fallback parser")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-box entity extractor and the AI parse log it trains on
+"""
+
+import json
+import os
+
+from conftest import SKIP_LOCAL_PARSER  # isolated test environment, also when run as a script
+
+import pytest
+
+import app
+from entity_extractor import EntityExtractor, ParseExampleLog, align, evaluate, load_examples, load_model, split_examples
+
+RECORDINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'corpus', 'llm_responses_v1.json')
+
+
+def item(name, quantity, unit, category):
+    return {'name': name, 'quantity': quantity, 'unit': unit, 'category': category}
+
+
+def test_alignment_labels_translated_lines():
+    tags, lessons = align(['aadha', 'kilo', 'pyaaz'], item('onions', 0.5, 'kg', 'vegetables'))
+    assert tags == ['Q', 'U', 'N']
+    assert ('quantity', 'aadha', 0.5) in lessons and ('phrase', 'pyaaz', 'onions') in lessons
+
+    tags, lessons = align(['3', 'packets', 'of', 'bread'], item('bread', 3, 'packets', 'bakery'))
+    assert tags == ['Q', 'U', 'O', 'N'] and lessons == []
+    assert align(['milk'], item('', 1, 'pieces', 'dairy')) is None
+    print("✅ AI parses are turned into token tags and lexicon entries")
+
+
+def test_model_parses_unseen_lines_and_reports_confidence():
+    examples = load_examples([RECORDINGS_PATH])
+    model = EntityExtractor.train(examples)
+
+    items, confidence = model.parse_line("4 kg basmati rice")
+    assert [(i['name'], i['quantity'], i['unit'], i['category']) for i in items] == [('basmati rice', 4, 'kg', 'grains')]
+    assert confidence >= 0.8
+    items, confidence = model.parse_line("ek packet doodh aur 2 kilo aloo")
+    assert [(i['name'], i['quantity'], i['unit']) for i in items] == [('milk', 1, 'packet'), ('potatoes', 2, 'kg')]
+
+    # Sentences and untranslated Hindi words are left to the AI
+    assert model.parse_line("please get me a few apples")[1] < 0.8
+    assert model.parse_line("1 kg namak")[1] < 0.8
+    print("✅ Model parses lines, translates learned words and flags what it doesn't know")
+
+
+def test_held_out_evaluation_and_round_trip(tmp_path):
+    train_set, held_out = split_examples(load_examples([RECORDINGS_PATH]), 0.2)
+    assert not {line for line, _ in train_set} & {line for line, _ in held_out}
+    model = EntityExtractor.train(train_set)
+    report = evaluate(model, held_out, thresholds=(0.8,))
+    assert report['lines'] == len(held_out)
+    assert report['thresholds'][0.8]['coverage'] >= 0.6 and report['thresholds'][0.8]['accuracy'] >= 0.9
+    assert report['max_us'] < 1000
+
+    path = str(tmp_path / 'entity_model.json')
+    model.save(path)
+    loaded = load_model(path)
+    assert all(loaded.parse_line(line) == model.parse_line(line) for line, _ in held_out)
+    assert load_model(str(tmp_path / 'missing.json')) is None
+    print(f"✅ Held-out accuracy {report['thresholds'][0.8]['accuracy']} at {report['thresholds'][0.8]['coverage']} coverage, model round-trips")
+
+
+def test_ai_parses_are_logged_and_model_skips_the_ai(tmp_path, parse_app):
+    log_path = str(tmp_path / 'parse_examples.jsonl')
+    calls = []
+    reply = json.dumps([dict(item('milk', 1, 'packet', 'dairy'), line=1)])
+    parse_app(parse_example_log=ParseExampleLog(log_path), entity_model=None,
+              call_ai=lambda *args, **kwargs: calls.append(args) or reply, **SKIP_LOCAL_PARSER)
+
+    assert app.parse_grocery_list("ek packet doodh", deadline=0)[0]['name'] == 'milk'
+    assert load_examples([log_path]) == [("ek packet doodh", [item('milk', 1, 'packet', 'dairy')])]
+    assert len(calls) == 1
+
+    parse_app(entity_model=EntityExtractor.train(load_examples([RECORDINGS_PATH])))
+    items = app.parse_grocery_list("3 kg basmati rice", deadline=0)
+    assert items == [item('basmati rice', 3, 'kg', 'grains')]
+    assert len(calls) == 1
+    print("✅ AI parses feed the training log and confident model answers skip the AI")
+
+
+def test_model_answers_hinglish_before_the_local_parser(parse_app, monkeypatch):
+    parse_app(entity_model=EntityExtractor.train(load_examples([RECORDINGS_PATH])),
+              call_ai=lambda *args, **kwargs: pytest.fail("AI should not be called"))
+    local_lines = []
+    parse_line = app.local_parser.parse_line
+    monkeypatch.setattr(app.local_parser, 'parse_line', lambda line: local_lines.append(line) or parse_line(line))
+
+    line = "2 kilo aloo"
+    assert app.entity_model.parse_line(line)[1] >= app.ENTITY_MODEL_THRESHOLD
+    items = app.parse_grocery_list(line, deadline=0)
+    assert [(item['name'], item['quantity'], item['unit']) for item in items] == [('potatoes', 2, 'kg')]
+    assert local_lines == []
+    assert app.parse_tier_summary()['tiers']['model']['count'] == 1
+    print("✅ The entity model answers Hinglish lines before the local parser can misread them")
+
+
+def test_chat_and_untranslated_hinglish_skip_the_model_tier(parse_app):
+    model = EntityExtractor.train(load_examples([RECORDINGS_PATH]))
+    for line in ("hi", "thanks", "ok"):
+        assert model.parse_line(line) == ([], 0.0), line
+    for line in ("delete", "what is the price of milk", "dudh", "2 kg chawal", "6 kele", "1 kg gobi"):
+        assert model.parse_line(line)[1] < app.ENTITY_MODEL_THRESHOLD, line
+    # Learned translations and structured lines still pass
+    assert model.parse_line("2 kg of rice")[1] >= app.ENTITY_MODEL_THRESHOLD
+
+    calls = []
+    parse_app(entity_model=model, request_ai_parse=lambda text: calls.append(text) or [])
+    app.parse_grocery_list("hi\ndudh\n2 kg chawal\nwhat is the price of milk")
+    assert calls == ["hi\ndudh\n2 kg chawal\nwhat is the price of milk"]
+    assert 'model' not in app.parse_tier_summary()['tiers']
+    print("✅ Chat, questions and untranslated Hinglish go past the model to the AI")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the local fake OpenAI server
+"""
+
+import json
+import random
+
+from conftest import SKIP_LOCAL_PARSER  # isolated test environment, also when run as a script
+
+import pytest
+
+import app
+from fake_openai_server import FakeOpenAIServer, generate_reply, parse_latency
+from llm_client import LLMClient, LLMError
+
+MESSAGES = [{"role": "system", "content": "parse"}, {"role": "user", "content": "2 kg potatoes\nbanana"}]
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+    assert parse_latency('fixed:0.25')(rng) == 0.25
+    assert 0.1 <= parse_latency('uniform:0.1:0.2')(rng) <= 0.2
+    assert parse_latency('normal:0:0.001')(rng) >= 0
+    assert parse_latency('lognormal:0.5:0.3')(rng) > 0
+    for bad in ('gamma:1', 'uniform:1', 'fixed:x'):
+        with pytest.raises(ValueError):
+            parse_latency(bad)
+    print("✅ Latency distributions parsed")
+
+
+def test_generated_replies_match_parse_prompt_format():
+    items = json.loads(generate_reply("2 kg potatoes\nbanana"))
+    assert [(item['name'], item['line']) for item in items] == [("potatoes", 1), ("banana", 2)]
+    batch = json.loads(generate_reply("### LIST 1\n1 dozen eggs\n\n### LIST 2\nmilk\nbread"))
+    assert [item['name'] for item in batch['1']] == ["eggs"]
+    assert [item['line'] for item in batch['2']] == [1, 2]
+    print("✅ Single and batched replies in the parse prompt's format")
+
+
+def test_client_round_trip_recorded_and_streamed():
+    recordings = {"2 KG potatoes\nbanana": '[{"name": "aloo", "line": 1}]'}
+    with FakeOpenAIServer(recordings=recordings) as server:
+        client = LLMClient(api_key='fake', base_url=server.base_url)
+        assert json.loads(client.chat(MESSAGES)) == [{"name": "aloo", "line": 1}]
+        streamed = ''.join(client.stream_chat([{"role": "user", "content": "3 packets bread"}]))
+        assert json.loads(streamed)[0]['name'] == "bread"
+        client.close()
+    assert server.stats['recorded'] == 1 and server.stats['streamed'] == 1
+    print("✅ Recorded and streamed completions over the wire")
+
+
+def test_injected_faults_are_seeded():
+    with FakeOpenAIServer(error_rate=0.5, rate_limit_rate=0.5, seed=7) as server:
+        client = LLMClient(api_key='fake', base_url=server.base_url, max_retries=0)
+        for _ in range(4):
+            with pytest.raises(LLMError) as excinfo:
+                client.chat(MESSAGES)
+            assert excinfo.value.status in (500, 429)
+        client.close()
+    assert server.stats['errors'] + server.stats['rate_limited'] == 4
+    print("✅ Error and rate-limit injection")
+
+
+def test_parse_grocery_list_against_fake_server(parse_app):
+    with FakeOpenAIServer(latency='fixed:0.01') as server:
+        client = LLMClient(api_key='fake', base_url=server.base_url)
+        parse_app(llm_client=client, **SKIP_LOCAL_PARSER)
+        items = app.parse_grocery_list("2 kg potatoes\none packet amul toned milk")
+        client.close()
+    assert [(item['name'], item['quantity']) for item in items] == [("potatoes", 2), ("amul toned milk", 1)]
+    assert server.stats['generated'] == 1
+    print("✅ parse_grocery_list runs offline against the fake server")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
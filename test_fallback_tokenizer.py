@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass fallback tokenizer
+"""
+
+from local_parser import tokenize_items
+
+
+def names(text):
+    return [(item['quantity'], item['unit'], item['name']) for item in tokenize_items(text)]
+
+
+def test_commas_and_conjunctions_split_items():
+    assert names("2 kg onions, 1 kg tomatoes and 6 eggs") == [
+        (2, 'kg', 'onions'), (1, 'kg', 'tomatoes'), (6, 'pieces', 'eggs')]
+    assert names("I need 2 kg potatoes, 1 dozen eggs, and 3 packets of bread") == [
+        (2, 'kg', 'potatoes'), (1, 'dozen', 'eggs'), (3, 'packets', 'bread')]
+    print("✅ Commas and 'and' split items")
+
+
+def test_line_formats():
+    assert names("one packet amul toned milk\nbanana") == [(1, 'packet', 'amul toned milk'), (1, 'pieces', 'banana')]
+    assert names("milk 1 liter, bananas 5 pieces") == [(1, 'liter', 'milk'), (5, 'pieces', 'bananas')]
+    assert names("2kg atta") == [(2, 'kg', 'atta')]
+    assert names("1.5 kg Basmati Rice!") == [(1.5, 'kg', 'basmati rice')]
+    assert names("a dozen eggs") == [(1, 'dozen', 'eggs')]
+    print("✅ Number words, units and trailing quantities recognised")
+
+
+def test_filler_and_empty_segments():
+    assert names("please get me some bread") == [(1, 'pieces', 'bread')]
+    assert names("milk,, and\n\n") == [(1, 'pieces', 'milk')]
+    assert tokenize_items("") == []
+    print("✅ Filler words and empty segments dropped")
+
+
+def test_categories_guessed():
+    assert [item['category'] for item in tokenize_items("2 kg onions, 1 dozen eggs, detergent")] == \
+        ['vegetables', 'dairy', 'household']
+    print("✅ Categories guessed from keywords")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Fallback Tokenizer...")
+    print("=" * 50)
+    test_commas_and_conjunctions_split_items()
+    test_line_formats()
+    test_filler_and_empty_segments()
+    test_categories_guessed()
+    print("=" * 50)
+    print("🎉 Fallback tokenizer tests passed!")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged parsing: local answer at the deadline, late AI upgrades
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import app
+from order_state import QUEUED, PROCESSING
+from order_store import MemoryOrderStore
+from parse_queue import ParseQueue, PARSE_OK
+
+MESSAGE = "get the usual atta\n2 kg potatoes"
+AI_ITEMS = [{"name": "aashirvaad atta", "quantity": 1, "unit": "packet", "category": "grains", "line": 1}]
+
+
+def slow_ai(delay):
+    def request_ai_parse(text):
+        time.sleep(delay)
+        return [dict(item) for item in AI_ITEMS]
+    return request_ai_parse
+
+
+def test_fast_ai_answers_within_deadline(parse_app):
+    parse_app(request_ai_parse=slow_ai(0.05))
+    items = app.parse_grocery_list(MESSAGE, deadline=1.0)
+    assert [item['name'] for item in items] == ["aashirvaad atta", "potatoes"]
+    assert app.hedge_timings.summary()['parse']['errors'] == 0
+    print("✅ AI inside the deadline wins")
+
+
+def test_slow_ai_returns_local_parse_at_deadline(parse_app):
+    parse_app(request_ai_parse=slow_ai(0.6))
+    upgrades = []
+    upgraded = threading.Event()
+
+    start = time.monotonic()
+    items = app.parse_grocery_list(MESSAGE, deadline=0.1, on_upgrade=lambda late: upgrades.append(late) or upgraded.set())
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.4
+    assert [item['name'] for item in items] == ["the usual atta", "potatoes"]
+    assert upgraded.wait(2)
+    assert [item['name'] for item in upgrades[0]] == ["aashirvaad atta", "potatoes"]
+    # The late result is still cached for next time
+    assert app.parse_cache.get(MESSAGE) == upgrades[0]
+    print("✅ Deadline answers locally, late AI result upgrades")
+
+
+def test_zero_deadline_waits_for_ai(parse_app):
+    parse_app(request_ai_parse=slow_ai(0.2))
+    items = app.parse_grocery_list(MESSAGE, deadline=0)
+    assert items[0]['name'] == "aashirvaad atta"
+    assert 'parse' not in app.hedge_timings.summary()
+    print("✅ Deadline 0 disables hedging")
+
+
+def stall_ai(parse_app, workers, max_pending):
+    """An LLM that hangs until released, behind an AI pool of the given size; returns (calls, release, pool)"""
+    calls = []
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def stalled_ai(text):
+        calls.append(text)
+        release.wait(5)
+        return []
+    parse_app(request_ai_parse=stalled_ai, ai_executor=executor, PARSE_AI_MAX_PENDING=max_pending,
+              ai_slots=threading.BoundedSemaphore(max_pending))
+    return calls, release, executor
+
+
+def test_stalled_ai_backlog_does_not_grow(parse_app):
+    calls, release, executor = stall_ai(parse_app, workers=2, max_pending=2)
+    start = time.monotonic()
+    for name in ("atta", "rice", "dal", "oil", "sugar", "tea"):
+        items = app.parse_grocery_list(f"get the usual {name}", deadline=0.05, on_upgrade=lambda late: None)
+        assert items[0]['name'] == f"the usual {name}"
+    # Two parses waited for their deadline; the rest answered at once instead of queueing more LLM calls
+    assert time.monotonic() - start < 0.5
+    assert len(calls) == 2 and executor._work_queue.qsize() == 0
+    assert app.hedge_timings.summary()['shed']['count'] == 4
+
+    release.set()
+    executor.shutdown(wait=True)
+    assert app.ai_slots.acquire(blocking=False)
+    print("✅ A stalled LLM can't build an AI backlog")
+
+
+def test_unneeded_late_ai_is_cancelled_before_it_starts(parse_app):
+    calls, release, executor = stall_ai(parse_app, workers=1, max_pending=3)
+    app.parse_grocery_list("get the usual atta", deadline=0.05, on_upgrade=lambda late: None)
+    # Queued behind the stalled call and nobody takes a late result: cancelled at the deadline
+    items = app.parse_grocery_list("get the usual rice", deadline=0.05)
+    assert items[0]['name'] == "the usual rice"
+    assert app.hedge_timings.summary()['cancelled']['count'] == 1
+
+    release.set()
+    executor.shutdown(wait=True)
+    assert calls == ["get the usual atta"]
+    print("✅ Late AI parses nobody needs are dropped before they call the LLM")
+
+
+def test_queue_delivers_upgrade_after_answer():
+    events = []
+    done = threading.Event()
+
+    def parse(text, on_upgrade=None):
+        # Late result lands before the worker has answered the job
+        on_upgrade(['late'])
+        return ['early']
+
+    queue = ParseQueue(parse, workers=1, timeout=5)
+    queue.submit("x", lambda items, status: events.append(('answer', items, status)),
+                 upgrade=lambda items: events.append(('upgrade', items)) or done.set())
+    assert done.wait(2)
+    assert events == [('answer', ['early'], PARSE_OK), ('upgrade', ['late'])]
+    assert queue.stats()['upgraded'] == 1
+    queue.shutdown()
+    print("✅ Upgrades always follow the answer")
+
+
+def test_upgrade_replaces_pending_order_only(monkeypatch):
+    monkeypatch.setattr(app, 'order_store', MemoryOrderStore())
+    response = app.build_chat_response([{"name": "atta", "quantity": 1, "unit": "pieces", "category": "general"}])
+    order_id = response['order_id']
+    late = [{"name": "aashirvaad atta", "quantity": 1, "unit": "packet", "category": "grains"}]
+
+    upgrade = app.build_upgrade_response(order_id, late)
+    assert upgrade['upgraded'] and upgrade['order_id'] == order_id
+    assert app.order_store.get(order_id)['items'] == late
+
+    app.order_store.transition(order_id, QUEUED)
+    app.order_store.transition(order_id, PROCESSING)
+    assert app.build_upgrade_response(order_id, [{"name": "other"}]) is None
+    assert app.order_store.get(order_id)['items'] == late
+
+    # Nothing parsed locally: the late result becomes a new order
+    fresh = app.build_upgrade_response(None, late)
+    assert app.order_store.get(fresh['order_id']) is not None and fresh['upgraded']
+    print("✅ Upgrades only touch orders that are still pending")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
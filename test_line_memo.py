@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for per-line parse memoization (the AI call is replaced by a recorder)
+"""
+
+
+from conftest import SKIP_LOCAL_PARSER  # isolated test environment, also when run as a script
+
+
+def fake_ai(calls):
+    """Parses 'N unit name' lines and tags each item with its line number, like the prompt asks"""
+    def request_ai_parse(text):
+        calls.append(text)
+        items = []
+        for n, line in enumerate(text.split('\n'), start=1):
+            quantity, unit, name = line.split(' ', 2)
+            items.append({"name": name, "quantity": int(quantity), "unit": unit, "category": "general", "line": n})
+        return items
+    return request_ai_parse
+
+
+def test_only_new_lines_sent_to_ai(parse_app):
+    calls = []
+    app = parse_app(request_ai_parse=fake_ai(calls), **SKIP_LOCAL_PARSER)
+    app.parse_grocery_list("2 kg potatoes\n1 dozen eggs\n3 packets bread")
+    items = app.parse_grocery_list("2 kg potatoes\n1 kg onions\n3 packets bread")
+
+    assert calls[1] == "1 kg onions"
+    assert [item['name'] for item in items] == ["potatoes", "onions", "bread"]
+    assert all('line' not in item for item in items)
+    print("✅ Only the changed line went to the AI, order preserved")
+
+
+def test_fully_known_list_skips_ai(parse_app):
+    calls = []
+    app = parse_app(request_ai_parse=fake_ai(calls), **SKIP_LOCAL_PARSER)
+    app.parse_grocery_list("2 kg potatoes\n1 dozen eggs")
+    app.parse_grocery_list("1 dozen eggs")
+    app.parse_grocery_list("1 dozen  EGGS\n2 kg potatoes")
+    assert len(calls) == 1
+    print("✅ Reordered and partial lists answered from the line memo")
+
+
+def test_items_without_line_numbers(parse_app):
+    """One item per line can still be attributed when the AI drops the line field"""
+    def ai(text):
+        return [{"name": line, "quantity": 1, "unit": "pieces", "category": "general"} for line in text.split('\n')]
+
+    app = parse_app(request_ai_parse=ai, **SKIP_LOCAL_PARSER)
+    items = app.parse_grocery_list("milk\nbread")
+    assert [item['name'] for item in items] == ["milk", "bread"]
+    assert app.line_cache.get("bread") == [items[1]]
+    print("✅ Items without line numbers mapped one per line")
+
+
+def test_unattributable_items_not_memoized(parse_app):
+    def ai(text):
+        return [{"name": "a", "quantity": 1, "unit": "pieces", "category": "general"}]
+
+    app = parse_app(request_ai_parse=ai, **SKIP_LOCAL_PARSER)
+    items = app.parse_grocery_list("milk\nbread")
+    assert len(items) == 1
+    assert app.line_cache.get("milk") is None
+    print("✅ Unattributable items returned but not memoized")
+
+
+def test_ai_failure_keeps_known_lines(parse_app):
+    app = parse_app(request_ai_parse=fake_ai([]), **SKIP_LOCAL_PARSER)
+    app.parse_grocery_list("2 kg basmati rice")
+
+    def broken(text):
+        raise RuntimeError("LLM down")
+    parse_app(request_ai_parse=broken)
+
+    items = app.parse_grocery_list("2 kg basmati rice\nbanana")
+    assert items[0] == {"name": "basmati rice", "quantity": 2, "unit": "kg", "category": "general"}
+    assert items[1]['name'] == "banana"
+    # A partly fallback result is not cached as a whole
+    assert app.parse_cache.get("2 kg basmati rice\nbanana") is None
+    print("✅ AI failure falls back only for new lines")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled LLM client against a local stand-in server
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_client import LLMClient, LLMError, RetryBudget
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers /chat/completions from the server's scripted responses"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        with server.lock:
+            server.requests.append(body)
+            server.ports.add(self.client_address[1])
+            status, delay, content = server.script.pop(0) if server.script else (200, 0, "ok")
+        time.sleep(delay)
+
+        if status != 200:
+            payload = json.dumps({'error': {'message': content}}).encode()
+            self.send_response(status)
+            if status == 429:
+                self.send_header('Retry-After', '0')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        elif body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for piece in content:
+                chunk = {'choices': [{'index': 0, 'delta': {'content': piece}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+        else:
+            payload = json.dumps({'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.ports = set()
+    httpd.script = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault('backoff_base', 0.01)
+    return LLMClient(api_key='test-key', base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", **kwargs)
+
+
+MESSAGES = [{"role": "user", "content": "2 kg potatoes"}]
+
+
+def test_chat_reuses_pooled_connection(server):
+    server.script = [(200, 0, " [1] "), (200, 0, "[2]"), (200, 0, "[3]")]
+    client = make_client(server)
+    assert [client.chat(MESSAGES) for _ in range(3)] == ["[1]", "[2]", "[3]"]
+    # Keep-alive: all three requests came in over one connection
+    assert len(server.ports) == 1
+    assert server.requests[0]['model'] == 'gpt-3.5-turbo'
+    stats = client.stats()
+    assert stats['calls'] == 3 and stats['retries'] == 0
+    assert stats['histogram']['call']['+Inf'] == 3
+    client.close()
+    print("✅ Completions reuse one keep-alive connection")
+
+
+def test_retries_on_server_errors_then_succeeds(server):
+    server.script = [(500, 0, "boom"), (429, 0, "slow down"), (200, 0, "[]")]
+    client = make_client(server)
+    assert client.chat(MESSAGES) == "[]"
+    stats = client.stats()
+    assert stats['attempts'] == 3 and stats['retries'] == 2 and stats['failures'] == 0
+    client.close()
+    print("✅ 500 and 429 are retried with backoff")
+
+
+def test_client_errors_are_not_retried(server):
+    server.script = [(400, 0, "bad request")]
+    client = make_client(server)
+    with pytest.raises(LLMError) as excinfo:
+        client.chat(MESSAGES)
+    assert excinfo.value.status == 400
+    assert len(server.requests) == 1
+    client.close()
+    print("✅ 4xx errors fail straight away")
+
+
+def test_read_timeout_bounds_a_hung_request(server):
+    server.script = [(200, 1.0, "late"), (200, 1.0, "late")]
+    client = make_client(server, read_timeout=0.2, max_retries=1)
+    start = time.monotonic()
+    with pytest.raises(LLMError) as excinfo:
+        client.chat(MESSAGES)
+    assert 'timed out' in str(excinfo.value)
+    assert time.monotonic() - start < 0.9
+    assert client.stats()['attempts'] == 2
+    client.close()
+    print("✅ Read timeout fails a hung request")
+
+
+def test_retry_budget_caps_retries(server):
+    server.script = [(503, 0, "down")] * 10
+    client = make_client(server, max_retries=5, retry_budget=RetryBudget(ratio=0, min_retries=2))
+    with pytest.raises(LLMError):
+        client.chat(MESSAGES)
+    # One attempt plus the two retries the budget allows, not six
+    assert len(server.requests) == 3
+    assert client.stats()['retry_budget']['exhausted'] == 1
+    client.close()
+    print("✅ Retry budget stops a retry storm")
+
+
+def test_missing_api_key_fails_fast(server):
+    client = LLMClient(api_key=None, base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+    with pytest.raises(LLMError):
+        client.chat(MESSAGES)
+    assert server.requests == []
+    client.close()
+    print("✅ Missing API key fails without a request")
+
+
+def test_stream_yields_deltas(server):
+    server.script = [(503, 0, "warming up"), (200, 0, ['[{"name"', ': "milk"}', ']'])]
+    client = make_client(server)
+    deltas = list(client.stream_chat(MESSAGES))
+    assert deltas == ['[{"name"', ': "milk"}', ']']
+    assert server.requests[-1]['stream'] is True
+    assert client.stats()['retries'] == 1
+    client.close()
+    print("✅ Streamed deltas arrive, errors before the first delta are retried")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
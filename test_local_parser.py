@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the confidence-tiered local parser
+"""
+
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import app
+import local_parser
+
+
+def test_structured_lines_are_confident():
+    cases = {
+        "2 kg potatoes": ("potatoes", 2, "kg"),
+        "one packet amul toned milk": ("amul toned milk", 1, "packet"),
+        "milk 1 liter": ("milk", 1, "liter"),
+        "1.5 kg basmati rice": ("basmati rice", 1.5, "kg"),
+        "three bananas": ("bananas", 3, "pieces"),
+    }
+    for line, (name, quantity, unit) in cases.items():
+        items, confidence = local_parser.parse_line(line)
+        assert confidence >= local_parser.DEFAULT_THRESHOLD, line
+        assert (items[0]['name'], items[0]['quantity'], items[0]['unit']) == (name, quantity, unit), line
+    assert local_parser.parse_line("2 kg potatoes")[0][0]['category'] == 'vegetables'
+    print("✅ Structured lines parsed locally with high confidence")
+
+
+def test_ambiguous_lines_are_escalated():
+    for line in ["I need 2 kg potatoes", "2 kg onions, 1 kg tomatoes", "eggs and bread",
+                 "amul milk 2", "get me the cheapest toor dal available"]:
+        items, confidence = local_parser.parse_line(line)
+        assert confidence < local_parser.DEFAULT_THRESHOLD, line
+    print("✅ Free text and multi-item lines escalated")
+
+
+def test_hinglish_unknown_units_and_bare_names_are_escalated():
+    for line in ["2 kilo aloo", "ek packet doodh", "aadha kilo pyaaz", "do dozen ande", "teen packet maggi",
+                 "1 kg aloo", "a dozen eggs", "Banana", "amul butter"]:
+        items, confidence = local_parser.parse_line(line)
+        assert items and confidence < local_parser.DEFAULT_THRESHOLD, line
+    # Bare names keep their guess for the no-AI fallback
+    assert local_parser.parse_line("Banana")[0] == [
+        {"name": "banana", "quantity": 1, "unit": "pieces", "category": "fruits"}]
+    for line in ["hi", "thanks", "ok thank you"]:
+        assert local_parser.parse_line(line) == ([], 0.2), line
+    print("✅ Hinglish, unknown units, bare names and greetings escalated")
+
+
+def test_only_ambiguous_lines_reach_ai(parse_app):
+    calls = []
+
+    def request_ai_parse(text):
+        calls.append(text)
+        return [{"name": "onions", "quantity": 2, "unit": "kg", "category": "vegetables", "line": 1},
+                {"name": "tomatoes", "quantity": 1, "unit": "kg", "category": "vegetables", "line": 1},
+                {"name": "potatoes", "quantity": 2, "unit": "kg", "category": "vegetables", "line": 2}]
+
+    parse_app(request_ai_parse=request_ai_parse)
+
+    items = app.parse_grocery_list("one packet amul toned milk\n2 kg onions, 1 kg tomatoes\nthree bananas\n2 kilo aloo")
+    assert calls == ["2 kg onions, 1 kg tomatoes\n2 kilo aloo"]
+    assert [item['name'] for item in items] == ["amul toned milk", "onions", "tomatoes", "bananas", "potatoes"]
+
+    summary = app.parse_tier_summary()
+    assert summary['tiers']['local']['count'] == 2
+    assert summary['tiers']['ai']['count'] == 2
+    assert summary['escalation_rate'] == round(2 / 4, 4)
+    print("✅ Only the ambiguous line was escalated to the AI")
+
+
+def test_simple_list_never_calls_ai(parse_app):
+    def request_ai_parse(text):
+        raise AssertionError("AI should not be called")
+
+    parse_app(request_ai_parse=request_ai_parse)
+    items = app.parse_grocery_list("2 kg potatoes\n1 dozen eggs\n3 packets bread")
+    assert len(items) == 3
+    print("✅ Simple list parsed without the AI")
+
+
+def test_one_hinglish_lexicon_and_prompt_categories():
+    import entity_extractor
+    import prompt_examples
+    # Every tier reads Hinglish from the same set, so they can't drift apart
+    assert prompt_examples.HINGLISH_WORDS is entity_extractor.HINGLISH_WORDS is local_parser.HINGLISH_WORDS
+    assert local_parser.HINGLISH_NUMBERS <= local_parser.HINGLISH_WORDS
+    # Local and AI results share the prompt's category set, unknown products included
+    for category in local_parser.CATEGORIES:
+        assert category in app.GROCERY_PARSE_FOOTER
+    assert local_parser.parse_line("2 kg quinoa")[0][0]['category'] == local_parser.DEFAULT_CATEGORY
+    assert local_parser.tokenize_items("2 kg quinoa")[0]['category'] in local_parser.CATEGORIES
+    print("✅ One Hinglish lexicon; local categories are the prompt's")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
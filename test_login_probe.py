@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-call login-state probe (no Chrome needed - uses a fake driver)
+"""
+
+import time
+
+from selenium.common.exceptions import JavascriptException
+
+from blinkit_automation_clean import (
+    BlinkitAutomation, LOGGED_IN, LOGGED_OUT, LOGIN_UNKNOWN, LOGIN_PROBE_JS, WAIT_FOR_LOGIN_JS,
+    LOGIN_BUTTON_INDICATORS, LOGGED_IN_INDICATORS
+)
+
+
+class FakeDriver:
+    def __init__(self, probe=None, cookies=None, login_waits=None):
+        self.probe = probe or {}
+        self.cookies = cookies or []
+        # Results of successive wait-for-login chunks (an exception is raised instead of returned)
+        self.login_waits = list(login_waits or [])
+        self.wait_args = []
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append('probe' if script == LOGIN_PROBE_JS else 'script')
+        if script == LOGIN_PROBE_JS:
+            return self.probe
+        return 'complete'
+
+    def execute_async_script(self, script, *args):
+        assert script == WAIT_FOR_LOGIN_JS
+        self.calls.append('wait')
+        self.wait_args.append(args)
+        result = self.login_waits.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get_cookies(self):
+        self.calls.append('cookies')
+        return self.cookies
+
+    def set_script_timeout(self, seconds):
+        pass
+
+
+def make_automation(monkeypatch, tmp_path, driver):
+    monkeypatch.chdir(tmp_path)
+    automation = BlinkitAutomation(profile_dir=str(tmp_path / "chrome-profile"))
+    automation.driver = driver
+    return automation
+
+
+def test_dom_indicator_means_logged_in(monkeypatch, tmp_path):
+    driver = FakeDriver(probe={'logged_in_index': 2, 'login_button_index': -1, 'session_cookie': None})
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    assert automation.probe_login_state() == LOGGED_IN
+    assert driver.calls == ['probe']
+    print("✅ DOM indicator detected in one round trip")
+
+
+def test_login_button_means_logged_out(monkeypatch, tmp_path):
+    driver = FakeDriver(probe={'logged_in_index': -1, 'login_button_index': 0, 'session_cookie': None})
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    assert automation.probe_login_state() == LOGGED_OUT
+    assert automation.is_user_logged_in() is False
+    print("✅ Login button means logged out")
+
+
+def test_httponly_session_cookie(monkeypatch, tmp_path):
+    """An ambiguous page falls back to get_cookies, which sees HttpOnly cookies"""
+    driver = FakeDriver(probe={'logged_in_index': -1, 'login_button_index': -1, 'session_cookie': None},
+                        cookies=[{'name': 'gr_1_deviceId'}, {'name': 'gr_1_accessToken'}])
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    assert automation.probe_login_state() == LOGGED_IN
+    assert driver.calls == ['probe', 'cookies']
+    print("✅ HttpOnly session cookie detected")
+
+
+def test_anonymous_session_cookies_are_not_a_login(monkeypatch, tmp_path):
+    """Visitors get session and device cookies before logging in; only the auth token counts"""
+    driver = FakeDriver(probe={'logged_in_index': -1, 'login_button_index': -1, 'session_cookie': None},
+                        cookies=[{'name': 'gr_1_deviceId'}, {'name': '__pr_session'}, {'name': 'auth_state'}])
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    assert automation.probe_login_state() == LOGIN_UNKNOWN
+    print("✅ Anonymous session cookies don't count as logged in")
+
+
+def test_ambiguous_page_is_unknown(monkeypatch, tmp_path):
+    driver = FakeDriver(probe={'logged_in_index': -1, 'login_button_index': -1, 'session_cookie': None},
+                        cookies=[{'name': 'gr_1_deviceId'}])
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    start = time.monotonic()
+    assert automation.probe_login_state() == LOGIN_UNKNOWN
+    assert automation.is_user_logged_in() is False
+    assert time.monotonic() - start < 1
+    print("✅ Ambiguous page answered quickly as unknown")
+
+
+def test_wait_for_login_survives_navigation(monkeypatch, tmp_path):
+    """A reload during OTP login re-arms the wait instead of failing it"""
+    driver = FakeDriver(probe={'logged_in_index': -1, 'login_button_index': -1, 'session_cookie': None},
+                        login_waits=[JavascriptException("document unloaded"), True])
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    assert automation.wait_for_login(timeout=5, chunk=1) is True
+    assert driver.calls.count('wait') == 2
+    # The in-page wait checks the Login button before the cookie, like probe_login_state
+    logged_in, login_buttons, hints = driver.wait_args[-1][:3]
+    assert (logged_in, login_buttons, hints) == (LOGGED_IN_INDICATORS, LOGIN_BUTTON_INDICATORS, ['accesstoken'])
+    print("✅ Login wait re-arms after navigation")
+
+
+def test_wait_for_login_times_out(monkeypatch, tmp_path):
+    driver = FakeDriver(probe={'logged_in_index': -1, 'login_button_index': -1, 'session_cookie': None})
+    automation = make_automation(monkeypatch, tmp_path, driver)
+    # Each chunk comes back "not yet" after a short wait
+    monkeypatch.setattr(driver, 'execute_async_script',
+                        lambda *args: driver.calls.append('wait') or time.sleep(0.05) or False)
+    assert automation.wait_for_login(timeout=0.2, chunk=0.1) is False
+    print("✅ Login wait times out")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded order-execution queue
+"""
+
+import threading
+import time
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import pytest
+
+import app
+from order_queue import OrderQueue, OrderQueueFull
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.005)
+
+
+def test_orders_run_fifo_on_bounded_workers():
+    queue = OrderQueue(workers=2, max_pending=10)
+    lock = threading.Lock()
+    running = []
+    peak = []
+    started = []
+
+    def task(n):
+        with lock:
+            running.append(n)
+            started.append(n)
+            peak.append(len(running))
+        time.sleep(0.03)
+        with lock:
+            running.remove(n)
+
+    for n in range(6):
+        queue.submit(f"order-{n}", lambda n=n: task(n))
+    wait_for(lambda: queue.stats()['completed'] == 6)
+    assert max(peak) == 2
+    assert [set(started[k:k + 2]) for k in (0, 2, 4)] == [{0, 1}, {2, 3}, {4, 5}]
+    queue.shutdown()
+    print("✅ Orders placed first come first served, never more than the worker count at once")
+
+
+def test_admission_limit_rejects_bursts():
+    queue = OrderQueue(workers=1, max_pending=2)
+    release = threading.Event()
+    queue.submit("a", release.wait)
+    queue.submit("b", release.wait)
+    with pytest.raises(OrderQueueFull):
+        queue.submit("c", release.wait)
+    assert queue.stats()['rejected'] == 1
+    release.set()
+    wait_for(lambda: queue.stats()['completed'] == 2)
+    queue.submit("d", lambda: None)
+    queue.shutdown()
+    print("✅ Confirmations beyond the admission limit are turned away")
+
+
+def test_waiting_orders_hear_position_and_eta():
+    queue = OrderQueue(workers=1, max_pending=10, estimate_seconds=60)
+    release = threading.Event()
+    updates = []
+
+    def on_update(job, position, eta_seconds):
+        updates.append((job.order_id, position, eta_seconds))
+
+    queue.submit("first", release.wait, on_update=on_update)
+    wait_for(lambda: queue.stats()['running'] == 1)
+    queue.submit("second", lambda: None, on_update=on_update)
+    queue.submit("third", lambda: None, on_update=on_update)
+    assert [update[:2] for update in updates] == [("second", 1), ("third", 2)]
+    assert 55 <= updates[0][2] <= 60 and 115 <= updates[1][2] <= 120
+
+    release.set()
+    wait_for(lambda: queue.stats()['completed'] == 3)
+    # The line moved up when "second" started
+    assert ("third", 1) in [update[:2] for update in updates]
+    # Finished orders replace the initial estimate
+    assert queue.average_order_seconds() < 60
+    queue.shutdown()
+    print("✅ Queued orders get their place in line and estimated start time")
+
+
+def test_queue_update_message():
+    update = app.build_queue_update("abc123", 3, 150)
+    assert update['status'] == 'queued' and update['position'] == 3
+    assert update['message'] == "2 orders ahead of yours. Expected to start in about 2 minutes."
+    assert app.build_queue_update("abc123", 1, 10)['message'].startswith("Your order is next")
+    print("✅ Queue updates are phrased for the user")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for idempotent order confirmation and the order status state machine
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import app
+from order_queue import OrderQueue
+from order_state import PENDING, QUEUED, PROCESSING, COMPLETED, FAILED, CANCELLED
+from order_store import MemoryOrderStore
+
+ITEMS = [{"name": "milk", "quantity": 1, "unit": "packet", "category": "dairy"}]
+
+
+class FakeBlinkit:
+    def __init__(self, runs, release):
+        self.runs = runs
+        self.release = release
+
+    def place_order(self, items, keep_browser=False):
+        self.runs.append(items)
+        self.release.wait(2)
+        return True, "Order placed"
+
+
+class FakePool:
+    def __init__(self, release):
+        self.runs = []
+        self.release = release
+
+    @contextmanager
+    def session(self):
+        yield FakeBlinkit(self.runs, self.release)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.005)
+
+
+def setup_app(monkeypatch):
+    release = threading.Event()
+    pool = FakePool(release)
+    monkeypatch.setattr(app, 'order_store', MemoryOrderStore())
+    monkeypatch.setattr(app, 'order_queue', OrderQueue(workers=1, max_pending=10))
+    monkeypatch.setattr(app, 'browser_pool', pool)
+    order_id = app.build_chat_response(list(ITEMS))['order_id']
+    return pool, release, order_id, app.socketio.test_client(app.app)
+
+
+def order_updates(client):
+    return [event['args'][0] for event in client.get_received() if event['name'] == 'order_update']
+
+
+def test_only_allowed_transitions_happen():
+    store = MemoryOrderStore()
+    store.create("o1", ITEMS)
+    assert store.transition("o1", PROCESSING) == (False, PENDING)
+    assert store.transition("o1", QUEUED) == (True, PENDING)
+    assert store.transition("o1", QUEUED) == (False, QUEUED)
+    assert store.transition("o1", PROCESSING) == (True, QUEUED)
+    assert store.transition("o1", CANCELLED) == (False, PROCESSING)
+    assert store.transition("o1", FAILED, message="boom") == (True, PROCESSING)
+    assert store.get("o1")['message'] == "boom"
+    # A failed order may be retried, a completed one never runs again
+    assert store.transition("o1", QUEUED) == (True, FAILED)
+    store.transition("o1", PROCESSING)
+    store.transition("o1", COMPLETED)
+    assert store.transition("o1", QUEUED) == (False, COMPLETED)
+    assert store.transition("missing", QUEUED) == (False, None)
+    assert not store.update_if("o1", PENDING, items=[])
+    print("✅ Order statuses only move along allowed edges")
+
+
+def test_concurrent_confirmations_claim_once():
+    store = MemoryOrderStore()
+    store.create("o1", ITEMS)
+    barrier = threading.Barrier(16)
+    wins = []
+
+    def confirm():
+        barrier.wait()
+        wins.append(store.transition("o1", QUEUED)[0])
+
+    threads = [threading.Thread(target=confirm) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wins.count(True) == 1
+    assert store.stats()['rejected'] == 15
+    print("✅ Racing confirmations: exactly one wins")
+
+
+def test_double_confirm_and_yes_run_the_browser_once(monkeypatch):
+    pool, release, order_id, client = setup_app(monkeypatch)
+    client.emit('confirm_order', {'order_id': order_id})
+    client.emit('confirm_order', {'order_id': order_id})
+    client.emit('chat_message', {'message': 'yes'})
+    wait_for(lambda: app.order_store.get(order_id)['status'] == PROCESSING)
+    client.emit('confirm_order', {'order_id': order_id})
+    release.set()
+    wait_for(lambda: app.order_store.get(order_id)['status'] == COMPLETED)
+
+    # Retrying a placed order is absorbed as well
+    client.emit('confirm_order', {'order_id': order_id})
+    assert len(pool.runs) == 1
+    updates = order_updates(client)
+    duplicates = [update['order_status'] for update in updates if update['status'] == 'duplicate']
+    # The second click may land before or after a worker picked the order up
+    assert duplicates[0] in (QUEUED, PROCESSING) and duplicates[1:] == [PROCESSING, COMPLETED]
+    client.disconnect()
+    print("✅ Double clicks, 'yes' and retries never start a second browser run")
+
+
+def test_cancel_while_queued_skips_the_browser(monkeypatch):
+    pool, release, first_id, client = setup_app(monkeypatch)
+    second_id = app.build_chat_response(list(ITEMS))['order_id']
+    client.emit('confirm_order', {'order_id': first_id})
+    wait_for(lambda: app.order_store.get(first_id)['status'] == PROCESSING)
+    client.emit('confirm_order', {'order_id': second_id})
+    client.emit('cancel_order', {'order_id': second_id})
+    assert app.order_store.get(second_id)['status'] == CANCELLED
+    client.emit('cancel_order', {'order_id': first_id})
+    assert app.order_store.get(first_id)['status'] == PROCESSING
+
+    release.set()
+    wait_for(lambda: app.order_queue.stats()['completed'] == 2)
+    assert len(pool.runs) == 1
+    assert app.order_store.get(second_id)['status'] == CANCELLED
+    client.disconnect()
+    print("✅ Orders cancelled in line never reach a browser")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
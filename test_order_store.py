@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test script for the indexed order store (memory and SQLite)
+"""
+
+import json
+import os
+import runpy
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import conftest
+
+from order_state import PENDING, QUEUED, PROCESSING, COMPLETED, FAILED
+from order_store import EXPIRE_EVERY, MemoryOrderStore, SQLiteOrderStore, open_order_store
+
+ITEMS = [{"name": "milk", "quantity": 1, "unit": "packet", "category": "dairy"}]
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Imports the app against a given order store, then runs its startup step as the server would
+RECOVERY_PROBE = """
+import json, app
+before = app.order_store.get('queued')['status']
+recovered = app.prepare_server()
+print(json.dumps({'before': before, 'recovered': recovered, 'after': app.order_store.get('queued')['status']}))
+"""
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        if request.param == 'memory':
+            store = MemoryOrderStore(**kwargs)
+        else:
+            store = SQLiteOrderStore(str(tmp_path / 'orders.sqlite3'), **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_orders_are_indexed_by_id_status_and_session(make_store):
+    clock = Clock()
+    store = make_store(clock=clock)
+    for n, session in enumerate(("alice", "bob", "alice")):
+        clock.now += 1
+        store.create(f"o{n}", ITEMS, session=session)
+
+    assert store.get("o1")['session'] == "bob" and store.get("o1")['items'] == ITEMS
+    assert store.get("missing") is None
+    assert store.latest(PENDING, session="alice")['id'] == "o2"
+    assert store.latest(PENDING)['id'] == "o2"
+    store.transition("o2", QUEUED)
+    assert store.latest(PENDING, session="alice")['id'] == "o0"
+    assert store.latest(QUEUED, session="bob") is None
+    assert store.latest(PENDING, session="carol") is None
+    with pytest.raises(ValueError):
+        store.create("o0", ITEMS)
+    with pytest.raises(ValueError):
+        store.transition("o0", QUEUED, timestamp="now")
+    assert store.stats()['by_status'] == {PENDING: 2, QUEUED: 1}
+    print("✅ Orders looked up by id, status and session")
+
+
+def test_status_changes_are_compare_and_set(make_store):
+    store = make_store()
+    store.create("o1", ITEMS)
+    barrier = threading.Barrier(8)
+    wins = []
+
+    def confirm():
+        barrier.wait()
+        wins.append(store.transition("o1", QUEUED)[0])
+
+    threads = [threading.Thread(target=confirm) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wins.count(True) == 1
+    assert not store.update_if("o1", PENDING, items=[])
+    assert store.transition("o1", PROCESSING) == (True, QUEUED)
+    assert store.transition("o1", COMPLETED, message="Order placed") == (True, PROCESSING)
+    assert store.get("o1")['message'] == "Order placed"
+    print("✅ Concurrent transitions: exactly one wins")
+
+
+def test_abandoned_drafts_and_old_orders_expire(make_store):
+    clock = Clock()
+    store = make_store(clock=clock, draft_ttl=60, retention=600)
+    store.create("draft", ITEMS)
+    store.create("done", ITEMS)
+    store.create("running", ITEMS)
+    for status in (QUEUED, PROCESSING, COMPLETED):
+        store.transition("done", status)
+    store.transition("running", QUEUED)
+
+    clock.now += 61
+    assert store.get("draft") is None
+    assert store.transition("draft", QUEUED) == (False, None)
+    assert store.get("done") is not None
+    clock.now += 600
+    assert store.get("done") is None
+    # In-flight orders never expire
+    assert store.get("running")['status'] == QUEUED
+
+    for n in range(EXPIRE_EVERY):
+        store.create(f"new{n}", ITEMS)
+    assert store.stats()['expired'] == 2
+    print("✅ Abandoned drafts and old finished orders expire")
+
+
+def test_sqlite_store_survives_restart(tmp_path):
+    path = str(tmp_path / 'orders.sqlite3')
+    store = open_order_store(path)
+    assert isinstance(store, SQLiteOrderStore)
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    for order_id in ("kept", "queued", "running"):
+        store.create(order_id, ITEMS, session="alice")
+    store.transition("queued", QUEUED)
+    store.transition("running", QUEUED)
+    store.transition("running", PROCESSING)
+    store.close()
+
+    store = open_order_store(path)
+    assert store.recover() == 2
+    assert store.get("kept")['items'] == ITEMS
+    assert store.get("queued")['status'] == PENDING
+    assert store.get("running")['status'] == FAILED and "restart" in store.get("running")['message']
+    plan = ' '.join(row[-1] for row in store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM orders WHERE session = ? AND status = ? ORDER BY status_at DESC LIMIT 1",
+        ("alice", PENDING)))
+    assert 'orders_session' in plan
+    store.close()
+    assert isinstance(open_order_store(''), MemoryOrderStore)
+    print("✅ SQLite orders survive restarts; interrupted ones are recovered")
+
+
+def test_importing_the_app_leaves_stored_orders_alone(tmp_path):
+    path = str(tmp_path / 'orders.sqlite3')
+    store = open_order_store(path)
+    store.create("queued", ITEMS)
+    store.transition("queued", QUEUED)
+    store.close()
+
+    env = dict(os.environ, **dict(conftest.TEST_ENV, ORDER_STORE_PATH=path))
+    result = subprocess.run([sys.executable, '-c', RECOVERY_PROBE], cwd=ROOT, env=env, capture_output=True,
+                            text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe == {'before': QUEUED, 'recovered': 1, 'after': PENDING}
+    print("✅ Interrupted orders are recovered when the server starts, not on import")
+
+
+def test_every_entry_point_recovers_and_warms_up(tmp_path, monkeypatch):
+    import app
+    import start
+    warmups = []
+    monkeypatch.setattr(app, 'start_browser_pool_warmup', lambda debug_mode=False: warmups.append(debug_mode))
+    monkeypatch.setattr(app.socketio, 'run', lambda *args, **kwargs: None)
+
+    def interrupted_store(name):
+        store = SQLiteOrderStore(str(tmp_path / name))
+        store.create("queued", ITEMS)
+        store.transition("queued", QUEUED)
+        monkeypatch.setattr(app, 'order_store', store)
+        monkeypatch.setattr(app, '_server_prepared', False)
+        return store
+
+    # start.py
+    store = interrupted_store('start.sqlite3')
+    start.main()
+    assert store.get("queued")['status'] == PENDING and len(warmups) == 1
+    # Startup work runs once per process
+    assert app.prepare_server() == 0 and len(warmups) == 1
+    store.close()
+
+    # gunicorn, which never runs app.py's __main__ block
+    store = interrupted_store('gunicorn.sqlite3')
+    hooks = runpy.run_path(os.path.join(ROOT, 'gunicorn.conf.py'))
+    hooks['post_worker_init'](None)
+    assert store.get("queued")['status'] == PENDING and len(warmups) == 2
+    store.close()
+    print("✅ start.py and gunicorn recover orders and warm browsers like python app.py")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the event-driven wait primitives (no Chrome needed - uses a fake driver)
+"""
+
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+import page_waits
+from page_waits import (
+    WaitStats, wait_until, wait_for_url_change, wait_for_element_count_change,
+    wait_for_cart_increment, wait_for_search_change, wait_stats
+)
+
+
+class FakeDriver:
+    """Returns scripted values; each entry in a list is consumed by one call"""
+
+    def __init__(self, urls=None, element_counts=None, cart_counts=None):
+        self.urls = list(urls or [])
+        self.element_counts = list(element_counts or [])
+        self.cart_counts = list(cart_counts or [])
+
+    @staticmethod
+    def _next(values):
+        return values.pop(0) if len(values) > 1 else values[0]
+
+    @property
+    def current_url(self):
+        return self._next(self.urls)
+
+    def find_elements(self, by, selector):
+        return [object()] * self._next(self.element_counts)
+
+    def execute_script(self, script, *args):
+        if script == page_waits.CART_COUNT_JS:
+            return self._next(self.cart_counts)
+        return None
+
+
+def test_wait_returns_as_soon_as_condition_holds():
+    """A satisfied condition returns immediately instead of sleeping"""
+    wait_stats.reset()
+    start = time.monotonic()
+    assert wait_until('instant', lambda: 'ready', timeout=5, replaces=2) == 'ready'
+    assert time.monotonic() - start < 0.5
+
+    summary = wait_stats.summary()['instant']
+    assert summary['count'] == 1
+    assert summary['timeouts'] == 0
+    assert summary['saved_vs_fixed_sleep'] > 1.5
+    print("✅ Satisfied wait returns immediately and records savings")
+
+
+def test_wait_times_out_and_records_it():
+    wait_stats.reset()
+    assert wait_until('never', lambda: False, timeout=0.1) is None
+    assert wait_stats.summary()['never']['timeouts'] == 1
+    print("✅ Timed-out wait returns None and is counted")
+
+
+def test_condition_exceptions_are_retried():
+    """Stale elements during re-render count as 'not yet', not as failure"""
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("stale element")
+        return True
+
+    assert wait_until('flaky', flaky, timeout=2, poll=0.01) is True
+    assert len(calls) == 3
+    print("✅ Condition exceptions are retried")
+
+
+def test_url_change():
+    driver = FakeDriver(urls=["https://blinkit.com/", "https://blinkit.com/", "https://blinkit.com/s/"])
+    assert wait_for_url_change(driver, "https://blinkit.com/", timeout=2) == "https://blinkit.com/s/"
+    print("✅ URL change detected")
+
+
+def test_element_count_change_to_zero():
+    """A change down to zero elements is still reported"""
+    driver = FakeDriver(element_counts=[3, 3, 0])
+    assert wait_for_element_count_change(driver, 'css selector', 'div', 3, timeout=2) == 0
+    print("✅ Element count change detected")
+
+
+def test_cart_increment():
+    driver = FakeDriver(cart_counts=[None, 2, 2, 3])
+    assert wait_for_cart_increment(driver, 2, timeout=2) == 3
+
+    # Empty cart before the first item: any count counts as an increment
+    driver = FakeDriver(cart_counts=[None, None, 1])
+    assert wait_for_cart_increment(driver, None, timeout=2) == 1
+    print("✅ Cart badge increment detected")
+
+
+class FakeResult:
+    """A search result that is detached from the page after `live_checks` checks"""
+
+    def __init__(self, live_checks=10 ** 6):
+        self.live_checks = live_checks
+
+    def is_enabled(self):
+        self.live_checks -= 1
+        if self.live_checks < 0:
+            raise StaleElementReferenceException("element is not attached to the page document")
+        return True
+
+
+def test_search_change_ignores_settled_old_results():
+    """Old results that are still attached and an unchanged URL are not the new search"""
+    old_url = "https://blinkit.com/s/?q=milk"
+    driver = FakeDriver(urls=[old_url])
+    assert wait_for_search_change(driver, old_url, FakeResult(), "bread", lambda: object(), timeout=0.2) is None
+
+    # The URL moving to the new query counts, but not to some other one
+    driver = FakeDriver(urls=["https://blinkit.com/s/?q=eggs", "https://blinkit.com/s/?q=amul+bread"])
+    assert wait_for_search_change(driver, old_url, FakeResult(), "Amul  Bread", lambda: None, timeout=2) == 'url'
+    print("✅ A search only counts as done once something tied to it changed")
+
+
+def test_search_change_sees_old_results_detached():
+    old_url = "https://blinkit.com/s/?q=milk"
+    driver = FakeDriver(urls=[old_url])
+    assert wait_for_search_change(driver, old_url, FakeResult(live_checks=2), "bread", lambda: None, timeout=2) == 'stale'
+
+    # Nothing on screen before: the first result appearing is the new search
+    results = [None, None, object()]
+    assert wait_for_search_change(driver, "https://blinkit.com/s/", None, "bread",
+                                  lambda: results.pop(0), timeout=2) == 'rendered'
+    print("✅ Old results going stale or first results appearing end the wait")
+
+
+def test_stats_are_per_wait_name():
+    stats = WaitStats()
+    stats.record('a', 0.2, True, replaces=1)
+    stats.record('a', 0.4, True, replaces=1)
+    stats.record('b', 5.0, False)
+
+    summary = stats.summary()
+    assert summary['a']['count'] == 2
+    assert summary['a']['avg_waited'] == 0.3
+    assert summary['a']['saved_vs_fixed_sleep'] == 1.4
+    assert summary['b']['timeouts'] == 1
+    print("✅ Wait stats aggregated per wait")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Page Waits...")
+    print("=" * 50)
+    test_wait_returns_as_soon_as_condition_holds()
+    test_wait_times_out_and_records_it()
+    test_condition_exceptions_are_retried()
+    test_url_change()
+    test_element_count_change_to_zero()
+    test_cart_increment()
+    test_search_change_ignores_settled_old_results()
+    test_search_change_sees_old_results_detached()
+    test_stats_are_per_wait_name()
+    print("=" * 50)
+    print("🎉 Page wait tests passed!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for micro-batching of AI parse requests
+"""
+
+import threading
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import app
+from parse_batcher import ParseBatcher
+
+
+def run_concurrently(batcher, texts):
+    results = {}
+
+    def worker(text):
+        try:
+            results[text] = batcher.submit(text)
+        except Exception as e:
+            results[text] = e
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_requests_share_one_call():
+    batches = []
+
+    def send_batch(texts):
+        batches.append(list(texts))
+        return [text.upper() for text in texts]
+
+    batcher = ParseBatcher(send_batch, window=0.2, max_batch=8, prompt_tokens=600)
+    results = run_concurrently(batcher, ["milk", "bread", "eggs"])
+
+    assert results == {"milk": "MILK", "bread": "BREAD", "eggs": "EGGS"}
+    assert len(batches) == 1 and sorted(batches[0]) == ["bread", "eggs", "milk"]
+    stats = batcher.stats()
+    assert stats['prompt_tokens_saved'] == 1200
+    assert stats['prompt_tokens_saved_per_batch'] == 1200
+    print("✅ Concurrent requests sent as one batch")
+
+
+def test_full_batch_is_sent_without_waiting():
+    batches = []
+    batcher = ParseBatcher(lambda texts: batches.append(texts) or list(texts), window=5, max_batch=2)
+    results = run_concurrently(batcher, ["a", "b"])
+    assert results == {"a": "a", "b": "b"}
+    assert batcher.stats()['timings']['batch']['max'] < 1
+    print("✅ Full batch sent before the window ends")
+
+
+def test_window_zero_disables_batching():
+    batches = []
+    batcher = ParseBatcher(lambda texts: batches.append(texts) or list(texts), window=0)
+    assert batcher.submit("milk") == "milk"
+    assert batches == [["milk"]]
+    print("✅ Zero window sends each request on its own")
+
+
+def test_batch_error_reaches_every_caller():
+    def send_batch(texts):
+        raise RuntimeError("LLM down")
+
+    batcher = ParseBatcher(send_batch, window=0.1, max_batch=8)
+    results = run_concurrently(batcher, ["milk", "bread"])
+    assert all(isinstance(result, RuntimeError) for result in results.values())
+    assert batcher.stats()['failed_batches'] == 1
+    print("✅ Batch failure raised to every caller")
+
+
+def test_tagged_response_split_per_list(monkeypatch):
+    prompts = []
+
+    def call_ai(system_prompt, user_content, max_tokens=500):
+        prompts.append(user_content)
+        return ('{"1": [{"name": "onions", "quantity": 2, "unit": "kg", "category": "vegetables", "line": 1}],'
+                ' "2": [{"name": "eggs", "quantity": 6, "unit": "pieces", "category": "dairy", "line": 1}]}')
+
+    monkeypatch.setattr(app, 'call_ai', call_ai)
+    results = app.request_ai_parse_batch(["2 kg onions please", "half a dozen eggs", "something odd"])
+
+    assert "### LIST 1\n2 kg onions please" in prompts[0] and "### LIST 3\nsomething odd" in prompts[0]
+    assert results[0][0]['name'] == "onions"
+    assert results[1][0]['name'] == "eggs"
+    # A list missing from the answer gets None, which sends it to the fallback parser
+    assert results[2] is None
+    print("✅ Batched answer split back per list")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
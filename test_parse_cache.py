@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the two-level parse cache
+"""
+
+import time
+
+from parse_cache import ParseCache, normalize_message
+
+ITEMS = [{"name": "onions", "quantity": 2, "unit": "kg", "category": "vegetables"}]
+
+
+def test_normalized_keys():
+    assert normalize_message("  2 KG  Onions \n\n 1 kg tomatoes ") == "2 kg onions\n1 kg tomatoes"
+    # Line breaks are kept - each line is a separate item
+    assert normalize_message("milk\nbread") != normalize_message("milk bread")
+    print("✅ Messages normalized into cache keys")
+
+
+def test_memory_hit_returns_copy():
+    cache = ParseCache()
+    assert cache.get("2 kg onions") is None
+    cache.put("2 kg onions", ITEMS)
+
+    hit = cache.get("2 KG onions ")
+    assert hit == ITEMS
+    hit[0]['quantity'] = 99
+    assert cache.get("2 kg onions") == ITEMS
+
+    stats = cache.stats()
+    assert stats['memory_hits'] == 2 and stats['misses'] == 1
+    print("✅ Memory hit returns a fresh copy")
+
+
+def test_disk_store_survives_restart(tmp_path):
+    path = str(tmp_path / "parse_cache.sqlite3")
+    cache = ParseCache(path)
+    cache.put("2 kg onions", ITEMS)
+    cache.close()
+
+    restarted = ParseCache(path)
+    assert restarted.get("2 kg onions") == ITEMS
+    assert restarted.stats()['disk_hits'] == 1
+    # Promoted into memory on the way out
+    assert restarted.get("2 kg onions") == ITEMS
+    assert restarted.stats()['memory_hits'] == 1
+    restarted.close()
+    print("✅ Disk cache survives restart")
+
+
+def test_ttl_expiry(tmp_path):
+    cache = ParseCache(str(tmp_path / "parse_cache.sqlite3"), ttl=0.05)
+    cache.put("milk", ITEMS)
+    time.sleep(0.1)
+    assert cache.get("milk") is None
+    assert cache.stats()['expired'] >= 1
+    cache.close()
+    print("✅ Expired entries are not served")
+
+
+def test_size_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr('parse_cache.TRIM_EVERY', 1)
+    cache = ParseCache(str(tmp_path / "parse_cache.sqlite3"), memory_size=2, max_entries=3)
+    for i in range(6):
+        cache.put(f"item {i}", ITEMS)
+        time.sleep(0.001)
+
+    stats = cache.stats()
+    assert stats['memory_entries'] == 2
+    assert stats['disk_entries'] == 3
+    assert cache.get("item 5") == ITEMS
+    assert cache.get("item 0") is None
+    cache.close()
+    print("✅ Memory and disk levels evict least recently used entries")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for background grocery-list parsing
+"""
+
+import threading
+import time
+
+from parse_queue import ParseQueue, ParseQueueFull, PARSE_OK, PARSE_TIMEOUT, PARSE_ERROR
+
+
+class Collector:
+    """Records callback results and lets the test wait for them"""
+
+    def __init__(self):
+        self.results = []
+        self.event = threading.Event()
+
+    def __call__(self, items, status):
+        self.results.append((items, status))
+        self.event.set()
+
+    def wait(self, timeout=2):
+        assert self.event.wait(timeout), "callback was never called"
+        return self.results[0]
+
+
+def test_result_delivered_to_callback():
+    queue = ParseQueue(lambda text: [{'name': text}], workers=2, timeout=5)
+    done = Collector()
+    queue.submit("milk", done)
+    assert done.wait() == ([{'name': 'milk'}], PARSE_OK)
+    assert queue.stats()['completed'] == 1
+    queue.shutdown()
+    print("✅ Parse result delivered to callback")
+
+
+def test_submit_does_not_block():
+    """A slow LLM must not hold up the caller (the Socket.IO handler)"""
+    release = threading.Event()
+    queue = ParseQueue(lambda text: release.wait(2) and [], workers=1, timeout=5)
+    start = time.monotonic()
+    queue.submit("milk", Collector())
+    assert time.monotonic() - start < 0.1
+    release.set()
+    queue.shutdown()
+    print("✅ Submit returns immediately")
+
+
+def test_timeout_uses_fallback_once():
+    release = threading.Event()
+    queue = ParseQueue(lambda text: release.wait(2) and [{'name': 'llm'}],
+                       fallback=lambda text: [{'name': 'fallback'}], workers=1, timeout=0.1)
+    done = Collector()
+    queue.submit("milk", done)
+    assert done.wait() == ([{'name': 'fallback'}], PARSE_TIMEOUT)
+
+    # The late LLM result is dropped, not delivered a second time
+    release.set()
+    time.sleep(0.1)
+    assert len(done.results) == 1
+    assert queue.stats()['timed_out'] == 1
+    queue.shutdown()
+    print("✅ Slow parse answered by fallback exactly once")
+
+
+def test_parse_error_uses_fallback():
+    def broken(text):
+        raise RuntimeError("LLM down")
+
+    queue = ParseQueue(broken, fallback=lambda text: [{'name': text}], workers=1, timeout=5)
+    done = Collector()
+    queue.submit("bread", done)
+    assert done.wait() == ([{'name': 'bread'}], PARSE_ERROR)
+    queue.shutdown()
+    print("✅ Parse error answered by fallback")
+
+
+def test_queue_depth_limit():
+    release = threading.Event()
+    queue = ParseQueue(lambda text: release.wait(2) and [], workers=1, max_pending=2, timeout=5)
+    queue.submit("one", Collector())
+    queue.submit("two", Collector())
+    try:
+        queue.submit("three", Collector())
+        assert False, "third parse should be rejected"
+    except ParseQueueFull:
+        pass
+    assert queue.stats()['rejected'] == 1
+    release.set()
+    queue.shutdown()
+    print("✅ Queue depth limit enforced")
+
+
+def test_progress_muted_after_timeout():
+    release = threading.Event()
+    seen = []
+
+    def parse(text, progress):
+        progress(["first"])
+        release.wait(2)
+        progress(["late"])
+        return ["done"]
+
+    queue = ParseQueue(parse, fallback=lambda text: [], workers=1, timeout=0.1)
+    done = Collector()
+    queue.submit("milk", done, progress=seen.append)
+    assert done.wait() == ([], PARSE_TIMEOUT)
+    release.set()
+    time.sleep(0.1)
+    assert seen == [["first"]]
+    queue.shutdown()
+    print("✅ Partial results delivered until the job is answered")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Parse Queue...")
+    print("=" * 50)
+    test_result_delivered_to_callback()
+    test_submit_does_not_block()
+    test_timeout_uses_fallback_once()
+    test_parse_error_uses_fallback()
+    test_queue_depth_limit()
+    test_progress_muted_after_timeout()
+    print("=" * 50)
+    print("🎉 Parse queue tests passed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark corpus and its recorded AI answers
+"""
+
+import json
+import os
+
+from conftest import SKIP_LOCAL_PARSER  # isolated test environment, also when run as a script
+
+import app
+from fake_openai_server import FakeOpenAIServer, generate_items, load_line_recordings
+from llm_client import LLMClient
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'corpus')
+CORPUS_PATH = os.path.join(CORPUS_DIR, 'grocery_corpus_v1.json')
+RECORDINGS_PATH = os.path.join(CORPUS_DIR, 'llm_responses_v1.json')
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_corpus_is_versioned_and_covers_every_kind():
+    corpus = load_corpus()
+    assert corpus['version'] == 1
+    messages = corpus['messages']
+    assert len({message['id'] for message in messages}) == len(messages)
+    assert {message['kind'] for message in messages} == {'single', 'multi', 'hinglish', 'long'}
+    assert any(len(message['expected']) >= 50 for message in messages if message['kind'] == 'long')
+    for message in messages:
+        for item in message['expected']:
+            assert set(item) == {'name', 'quantity', 'unit', 'category'}
+    print("✅ Corpus is versioned and covers single, multi-line, Hinglish and 50+ item lists")
+
+
+def test_every_corpus_line_has_a_recorded_answer():
+    recordings = load_line_recordings(RECORDINGS_PATH)
+    for message in load_corpus()['messages']:
+        for line in message['text'].split('\n'):
+            assert line.strip() in recordings, line
+    print("✅ Recorded AI answers cover every corpus line")
+
+
+def test_recorded_answers_replay_through_parse(parse_app):
+    message = next(message for message in load_corpus()['messages'] if message['id'] == 'hinglish-06')
+    recordings = load_line_recordings(RECORDINGS_PATH)
+    assert [item['line'] for item in generate_items(message['text'], recordings)] == [1, 2, 3, 4]
+
+    with FakeOpenAIServer(line_recordings=recordings) as server:
+        client = LLMClient(api_key='fake', base_url=server.base_url)
+        parse_app(llm_client=client, **SKIP_LOCAL_PARSER)
+        items = app.parse_grocery_list(message['text'], deadline=0)
+        client.close()
+    assert items == message['expected']
+    print("✅ Recorded answers replay offline through parse_grocery_list")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for per-request few-shot example selection in the parse prompt
+"""
+
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import app
+from prompt_examples import EXAMPLES, ExampleIndex, message_features
+
+
+def selected(index, text):
+    return [example[0] for example in index.select(text)]
+
+
+def test_features_describe_the_message():
+    assert {'lines:1', 'unit:kg', 'digits'} <= message_features("2 kg potatoes")
+    assert 'no_quantity' in message_features("banana")
+    assert {'multiline', 'lines:4+'} <= message_features("a\nb\nc\nd")
+    assert {'hinglish', 'number_word'} <= message_features("ek packet doodh")
+    assert 'multi_item' in message_features("milk, bread and eggs")
+    assert message_features("2 packets bread") & message_features("1 packet milk") >= {'unit:packet'}
+    print("✅ Message features extracted")
+
+
+def test_selection_follows_the_message():
+    index = ExampleIndex(k=3)
+    assert any('\n' in text for text in selected(index, "milk\nbread\neggs\nbutter"))
+    assert not any('\n' in text for text in selected(index, "banana"))
+    assert "ek packet doodh aur 2 kilo aloo" in selected(index, "2 kilo aloo")
+    assert "get the usual atta" in selected(index, "some green chutney")
+    assert len(selected(index, "anything")) == 3
+    print("✅ Closest examples chosen per message")
+
+
+def test_compact_prompt_is_smaller_and_counted():
+    index = ExampleIndex(k=2)
+    full = index.full_prompt("HEADER", "FOOTER")
+    assert all(text.split('\n')[0] in full for text, _ in EXAMPLES)
+
+    prompt = index.build_prompt("HEADER", "FOOTER", "2 kg onions")
+    assert prompt.startswith("HEADER\n\nExamples:") and prompt.endswith("FOOTER")
+    assert len(prompt) < len(full) / 2
+    stats = index.stats()
+    assert stats['prompts'] == 1 and stats['examples_sent'] == 2
+    assert stats['prompt_tokens_saved'] > 0 and 0 < stats['saved_ratio'] < 1
+    print("✅ Compact prompt saves tokens and is measured")
+
+
+def test_parse_requests_send_the_selected_examples(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(app, 'call_ai', lambda system_prompt, text, **kwargs: prompts.append(system_prompt) or "[]")
+    app.request_ai_parse_single("ek packet doodh")
+    assert "ek packet doodh aur 2 kilo aloo" in prompts[-1]
+    assert len(prompts[-1]) < len(app.GROCERY_PARSE_PROMPT)
+
+    monkeypatch.setattr(app, 'PARSE_DYNAMIC_EXAMPLES', False)
+    app.request_ai_parse_single("ek packet doodh")
+    assert prompts[-1] == app.GROCERY_PARSE_PROMPT
+    print("✅ AI requests use the per-request prompt unless disabled")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
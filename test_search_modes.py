@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the direct search-URL fast path (no Chrome needed - search steps are stubbed)
+"""
+
+from blinkit_automation_clean import BlinkitAutomation, search_timings
+from latency_stats import LatencyStats, percentile
+
+
+def make_automation(monkeypatch, tmp_path, mode, url_ok=True, click_ok=True, fallback=True):
+    # BlinkitAutomation writes automation.log to the working directory
+    monkeypatch.chdir(tmp_path)
+    automation = BlinkitAutomation(profile_dir=str(tmp_path / "chrome-profile"), search_mode=mode, search_fallback=fallback)
+    calls = []
+    monkeypatch.setattr(automation, 'search_via_url', lambda query, timeout=10: calls.append('url') or url_ok)
+    monkeypatch.setattr(automation, 'search_via_click', lambda query, timeout=20: calls.append('click') or click_ok)
+    return automation, calls
+
+
+def test_url_mode_skips_search_bar(monkeypatch, tmp_path):
+    search_timings.reset()
+    automation, calls = make_automation(monkeypatch, tmp_path, 'url')
+    assert automation.search_blinkit_item("milk") is True
+    assert calls == ['url']
+    assert search_timings.summary()['url']['count'] == 1
+    print("✅ URL mode goes straight to results")
+
+
+def test_url_mode_falls_back_to_click(monkeypatch, tmp_path):
+    search_timings.reset()
+    automation, calls = make_automation(monkeypatch, tmp_path, 'url', url_ok=False)
+    assert automation.search_blinkit_item("milk") is True
+    assert calls == ['url', 'click']
+    summary = search_timings.summary()
+    assert summary['url']['errors'] == 1
+    assert summary['click_fallback']['count'] == 1
+    print("✅ URL mode falls back to the search bar")
+
+
+def test_fallback_can_be_disabled(monkeypatch, tmp_path):
+    automation, calls = make_automation(monkeypatch, tmp_path, 'url', url_ok=False, fallback=False)
+    assert automation.search_blinkit_item("milk") is False
+    assert calls == ['url']
+    print("✅ Fallback can be disabled")
+
+
+def test_click_mode(monkeypatch, tmp_path):
+    automation, calls = make_automation(monkeypatch, tmp_path, 'click')
+    assert automation.search_blinkit_item("milk") is True
+    assert calls == ['click']
+    print("✅ Click mode uses the search bar")
+
+
+def test_unknown_mode_rejected(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    try:
+        BlinkitAutomation(profile_dir=str(tmp_path), search_mode='teleport')
+        assert False, "unknown search mode should be rejected"
+    except ValueError:
+        pass
+    print("✅ Unknown search mode rejected")
+
+
+def test_latency_percentiles():
+    stats = LatencyStats(max_samples=100)
+    for ms in range(1, 101):
+        stats.record('search', ms / 1000.0, ok=ms != 100)
+    summary = stats.summary()['search']
+    assert summary['count'] == 100
+    assert summary['errors'] == 1
+    assert summary['p50'] == 0.05
+    assert summary['p95'] == 0.095
+    assert summary['max'] == 0.1
+    assert percentile([], 50) is None
+    print("✅ Latency percentiles computed")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for single-round-trip selector racing (no Chrome needed - uses a fake driver)
+"""
+
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from selector_race import race_selectors, selector_kind
+
+
+class FakeDriver:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.script_calls = []
+        self.timeouts_set = []
+
+    def set_script_timeout(self, seconds):
+        self.timeouts_set.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        self.script_calls.append(args)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_selector_kind():
+    assert selector_kind("//div[contains(text(), 'Pay Now')]") == 'xpath'
+    assert selector_kind("(//button)[2]") == 'xpath'
+    assert selector_kind("div.CartButton__Container") == 'css'
+    print("✅ Selector kinds detected")
+
+
+def test_whole_list_sent_in_one_call():
+    """All candidates go to the page together, tagged with their kind"""
+    driver = FakeDriver(result=[2, 'element', [2, 3]])
+    element, index = race_selectors(driver, ["//a", "//b", "div.c", "//d"], timeout=4, condition='present')
+
+    assert (element, index) == ('element', 2)
+    assert len(driver.script_calls) == 1
+    candidates, condition, timeout_ms = driver.script_calls[0]
+    assert candidates == [['xpath', '//a'], ['xpath', '//b'], ['css', 'div.c'], ['xpath', '//d']]
+    assert condition == 'present'
+    assert timeout_ms == 4000
+    print("✅ Candidate list raced in a single script call")
+
+
+def test_matches_reported_on_request():
+    driver = FakeDriver(result=[0, 'element', [0, 2]])
+    assert race_selectors(driver, ["//a", "//b", "//c"], with_matches=True) == ('element', 0, [0, 2])
+    print("✅ All matching indices reported")
+
+
+def test_no_match_and_errors_return_none():
+    assert race_selectors(FakeDriver(result=None), ["//a"]) == (None, -1)
+    assert race_selectors(FakeDriver(error=TimeoutException()), ["//a"]) == (None, -1)
+    assert race_selectors(FakeDriver(error=JavascriptException("document unloaded")), ["//a"], with_matches=True) == (None, -1, [])
+    print("✅ Timeouts and navigation errors return no match")
+
+
+def test_script_timeout_raised_once():
+    """Only the first race (or a longer one) pays the extra set_script_timeout round trip"""
+    driver = FakeDriver(result=None)
+    race_selectors(driver, ["//a"], timeout=10)
+    race_selectors(driver, ["//a"], timeout=20)
+    assert len(driver.timeouts_set) == 1
+    race_selectors(driver, ["//a"], timeout=120)
+    assert driver.timeouts_set[-1] == 125
+    print("✅ Script timeout only raised when needed")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Selector Racing...")
+    print("=" * 50)
+    test_selector_kind()
+    test_whole_list_sent_in_one_call()
+    test_matches_reported_on_request()
+    test_no_match_and_errors_return_none()
+    test_script_timeout_raised_once()
+    print("=" * 50)
+    print("🎉 Selector race tests passed!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for adaptive selector ordering
+"""
+
+import json
+
+from selector_registry import SelectorRegistry
+
+CART_SELECTORS = [
+    "//div[contains(@class, 'CartButton__Container')]//div[contains(@class, 'CartButton__Button')]",
+    "//div[contains(@class, 'CartButton__Container')]",
+    "//div[contains(@class, 'CartButton__Button')]",
+]
+
+
+def test_unseen_selectors_keep_hardcoded_order():
+    registry = SelectorRegistry()
+    assert registry.ordered('cart_button', CART_SELECTORS) == CART_SELECTORS
+    print("✅ Unseen selectors keep their hard-coded order")
+
+
+def test_working_selector_moves_to_front():
+    """After a deploy kills the first selector, the one that works is tried first"""
+    registry = SelectorRegistry()
+    for _ in range(3):
+        registry.record_race('cart_button', CART_SELECTORS, 2, [2], latency=0.1)
+
+    ordered = registry.ordered('cart_button', CART_SELECTORS)
+    assert ordered[0] == CART_SELECTORS[2]
+    assert ordered[-1] in CART_SELECTORS[:2]
+    print("✅ Working selector moved to the front")
+
+
+def test_recent_failures_outweigh_old_success():
+    """Decayed scores let a long-time winner drop once it stops matching"""
+    registry = SelectorRegistry()
+    for _ in range(20):
+        registry.record('pay_now', 'old', True, 0.1)
+    for _ in range(4):
+        registry.record('pay_now', 'old', False)
+        registry.record('pay_now', 'new', True, 0.1)
+
+    assert registry.ordered('pay_now', ['old', 'new']) == ['new', 'old']
+    print("✅ Recent failures outweigh old success")
+
+
+def test_race_timeout_is_a_miss_for_everyone():
+    registry = SelectorRegistry()
+    registry.record_race('proceed_to_pay', ['a', 'b'], -1, [], latency=20)
+    stats = registry.stats()['proceed_to_pay']
+    assert all(entry['misses'] == 1 and entry['hits'] == 0 for entry in stats)
+    print("✅ Race timeout recorded as a miss for every candidate")
+
+
+def test_stats_persist_across_restarts(tmp_path):
+    path = str(tmp_path / "selector_stats.json")
+    registry = SelectorRegistry(path, save_interval=3600)
+    registry.record('search_input', "//input[@type='text']", False)
+    registry.record('search_input', "//input[contains(@placeholder, 'Search')]", True, 0.05)
+    registry.save()
+
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['version'] == 1
+
+    restarted = SelectorRegistry(path)
+    assert restarted.ordered('search_input', ["//input[@type='text']", "//input[contains(@placeholder, 'Search')]"])[0] == \
+        "//input[contains(@placeholder, 'Search')]"
+    print("✅ Selector stats persist across restarts")
+
+
+def test_corrupt_stats_file_is_ignored(tmp_path):
+    path = tmp_path / "selector_stats.json"
+    path.write_text("{not json")
+    registry = SelectorRegistry(str(path))
+    assert registry.ordered('cart_button', CART_SELECTORS) == CART_SELECTORS
+    print("✅ Corrupt stats file ignored")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    print("🧪 Testing Selector Registry...")
+    print("=" * 50)
+    test_unseen_selectors_keep_hardcoded_order()
+    test_working_selector_moves_to_front()
+    test_recent_failures_outweigh_old_success()
+    test_race_timeout_is_a_miss_for_everyone()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_stats_persist_across_restarts(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_corrupt_stats_file_is_ignored(pathlib.Path(tmp))
+    print("=" * 50)
+    print("🎉 Selector registry tests passed!")
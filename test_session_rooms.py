@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for per-session order ownership and Socket.IO rooms
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import conftest  # noqa: F401  (isolated test environment, also when run as a script)
+
+import pytest
+
+import app
+from order_queue import OrderQueue
+from order_state import PENDING, PROCESSING, COMPLETED, CANCELLED
+from order_store import MemoryOrderStore
+
+ITEMS = [{"name": "milk", "quantity": 1, "unit": "packet", "category": "dairy"}]
+ALICE = "a" * 32
+BOB = "b" * 32
+
+
+class FakeBlinkit:
+    def __init__(self, release):
+        self.release = release
+
+    def place_order(self, items, keep_browser=False):
+        self.release.wait(2)
+        return True, "Order placed"
+
+
+class FakePool:
+    def __init__(self, release):
+        self.release = release
+
+    @contextmanager
+    def session(self):
+        yield FakeBlinkit(self.release)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def release(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(app, 'order_store', MemoryOrderStore())
+    monkeypatch.setattr(app, 'order_queue', OrderQueue(workers=1, max_pending=10))
+    monkeypatch.setattr(app, 'browser_pool', FakePool(release))
+    yield release
+    release.set()
+
+
+def connect(session=None):
+    client = app.socketio.test_client(app.app, auth={'session': session} if session else None)
+    assigned = [event['args'][0]['session'] for event in client.get_received() if event['name'] == 'session']
+    return client, assigned[0]
+
+
+def order_updates(client):
+    return [event['args'][0] for event in client.get_received() if event['name'] == 'order_update']
+
+
+def test_connections_are_bound_to_a_session():
+    client, session = connect(ALICE)
+    assert session == ALICE
+    # Missing or malformed ids get a fresh session
+    other, fresh = connect("not-a-session-id")
+    assert fresh != ALICE and app.SESSION_ID.match(fresh)
+    assert set(app.connection_sessions.values()) >= {ALICE, fresh}
+    client.disconnect()
+    other.disconnect()
+    assert ALICE not in app.connection_sessions.values()
+    print("✅ Every connection is bound to a session id")
+
+
+def test_order_events_reach_only_the_owning_session(release):
+    alice, _ = connect(ALICE)
+    alice_tab, _ = connect(ALICE)
+    bob, _ = connect(BOB)
+    alice_order = app.build_chat_response(list(ITEMS), session=ALICE)['order_id']
+    bob_order = app.build_chat_response(list(ITEMS), session=BOB)['order_id']
+
+    # Bob can neither confirm nor cancel Alice's order
+    bob.emit('confirm_order', {'order_id': alice_order})
+    bob.emit('cancel_order', {'order_id': alice_order})
+    assert [update['status'] for update in order_updates(bob)] == ['error', 'error']
+    assert app.order_store.get(alice_order)['status'] == PENDING
+
+    alice.emit('confirm_order', {'order_id': alice_order})
+    wait_for(lambda: app.order_store.get(alice_order)['status'] == PROCESSING)
+    release.set()
+    wait_for(lambda: app.order_store.get(alice_order)['status'] == COMPLETED)
+    wait_for(lambda: app.order_queue.stats()['completed'] == 1)
+
+    assert [update['status'] for update in order_updates(alice)] == [PROCESSING, COMPLETED]
+    # Another tab of the same session follows the order too; Bob hears nothing
+    assert [update['status'] for update in order_updates(alice_tab)] == [PROCESSING, COMPLETED]
+    assert order_updates(bob) == []
+
+    bob.emit('cancel_order', {'order_id': bob_order})
+    assert app.order_store.get(bob_order)['status'] == CANCELLED
+    assert order_updates(alice) == []
+    for client in (alice, alice_tab, bob):
+        client.disconnect()
+    print("✅ Order updates go to the owning session's room only")
+
+
+def test_reconnecting_tab_hears_the_outcome(release):
+    client, _ = connect(ALICE)
+    order_id = app.build_chat_response(list(ITEMS), session=ALICE)['order_id']
+    client.emit('confirm_order', {'order_id': order_id})
+    wait_for(lambda: app.order_store.get(order_id)['status'] == PROCESSING)
+    client.disconnect()
+
+    client, _ = connect(ALICE)
+    release.set()
+    wait_for(lambda: app.order_store.get(order_id)['status'] == COMPLETED)
+    wait_for(lambda: any(update['status'] == COMPLETED for update in order_updates(client)))
+    client.disconnect()
+    print("✅ A reconnected tab rejoins its session and gets the result")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed AI parsing with incremental JSON item extraction
+"""
+
+import json
+import time
+
+from conftest import SKIP_LOCAL_PARSER  # isolated test environment, also when run as a script
+
+import app
+from stream_json import JSONArrayStream
+
+LINES = ["get the usual atta", "some of that green chutney", "paneer for tonight", "a few lemons maybe", "dishwash gel refill"]
+ITEMS = [{"name": name, "quantity": 1, "unit": "pieces", "category": "general", "line": n}
+         for n, name in enumerate(["atta", "green chutney", "paneer", "lemons", "dishwash gel"], start=1)]
+
+
+def chunks_of(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_objects_yielded_as_they_close():
+    text = 'Here you go:\n```json\n[{"name": "a } b", "x": [1, {"y": "]"}]}, {"name": "say \\"hi\\""},\n{"name": "c"}]\n```'
+    for size in (1, 3, 50):
+        stream = JSONArrayStream()
+        found = []
+        for chunk in chunks_of(text, size):
+            found.extend(stream.feed(chunk))
+        assert [item['name'] for item in found] == ["a } b", 'say "hi"', "c"]
+        assert stream.closed
+    print("✅ Objects extracted from any chunking, strings respected")
+
+
+def test_truncated_array_keeps_complete_objects():
+    stream = JSONArrayStream()
+    assert stream.feed('[{"name": "milk"}, {"name": "bre') == [{"name": "milk"}]
+    assert not stream.closed
+    print("✅ Truncated stream keeps finished objects")
+
+
+def fake_stream(response_text, delay=0.0):
+    """AI stream stand-in sending response_text a few characters at a time"""
+    def call_ai_stream(system_prompt, user_content, max_tokens=500):
+        for chunk in chunks_of(response_text):
+            time.sleep(delay)
+            yield chunk
+    return call_ai_stream
+
+
+def test_items_pushed_before_completion(parse_app):
+    parse_app(call_ai_stream=fake_stream(json.dumps(ITEMS), delay=0.005), **SKIP_LOCAL_PARSER)
+    updates = []
+    items = app.parse_grocery_list('\n'.join(LINES), progress=lambda partial: updates.append(len(partial)))
+
+    assert [item['name'] for item in items] == ["atta", "green chutney", "paneer", "lemons", "dishwash gel"]
+    # Nothing known before the stream, then one update per item
+    assert updates == [0, 1, 2, 3, 4, 5]
+    timings = app.stream_timings.summary()
+    assert timings['first_item']['p50'] < timings['complete']['p50'] / 2
+    print("✅ Items pushed as they stream in; first item well before completion")
+
+
+def test_cut_off_stream_falls_back_for_missing_lines(parse_app):
+    truncated = json.dumps(ITEMS)[:-60]
+    parse_app(call_ai_stream=fake_stream(truncated), **SKIP_LOCAL_PARSER)
+    items = app.parse_grocery_list('\n'.join(LINES), progress=lambda partial: None)
+
+    assert [item['name'] for item in items][:3] == ["atta", "green chutney", "paneer"]
+    assert len(items) == 5
+    # Only lines the AI actually answered are memoized
+    assert app.line_cache.get(LINES[0]) is not None
+    assert app.line_cache.get(LINES[4]) is None
+    print("✅ Cut-off stream falls back for lines it never reached")
+
+
+def test_short_lists_are_not_streamed(parse_app):
+    calls = []
+    parse_app(call_ai_stream=fake_stream(""), request_ai_parse=lambda text: calls.append(text) or [dict(ITEMS[0])],
+              **SKIP_LOCAL_PARSER)
+    app.parse_grocery_list(LINES[0], progress=lambda partial: None)
+    assert calls == [LINES[0]]
+    print("✅ Short lists use the regular (batched) request")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))